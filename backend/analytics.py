@@ -0,0 +1,114 @@
+"""
+Cohort Analytics
+================
+
+Aggregates for the admin dashboard: averages and risk-level counts per
+subject, per age and per USN batch (the USN without its serial number,
+e.g. 1CR23AD for 1CR23AD106).
+
+The numbers come from the analytics_* tables, which triggers keep up to
+date as students and scores change (see ANALYTICS_SCHEMA in database.py).
+A read costs one row per subject or group, whatever the number of
+students. Scores and risk levels use the baseline prediction formula.
+
+Repair the tables from the command line:
+    python analytics.py --rebuild
+"""
+
+import sys
+
+from connection_pool import connection
+from database import rebuild_analytics
+
+DIMENSIONS = ("age", "batch")
+
+
+def _average(total, count):
+    return round(total / count, 2) if count else None
+
+
+def _risk(low, medium, high):
+    return {"Low": low, "Medium": medium, "High": high}
+
+
+def get_summary():
+    """Student count, average score and risk distribution for everyone"""
+    with connection() as conn:
+        row = conn.execute("""
+            SELECT students, scored, sum_score, low, medium, high
+            FROM analytics_groups WHERE dimension = 'all'
+        """).fetchone()
+        subjects = conn.execute("SELECT count(*) FROM analytics_subjects").fetchone()[0]
+
+    students, scored, sum_score, low, medium, high = row or (0, 0, 0, 0, 0, 0)
+    return {
+        "students": students,
+        "scored_students": scored,
+        "subjects": subjects,
+        "avg_score": _average(sum_score, scored),
+        "risk": _risk(low, medium, high),
+        "at_risk": high,
+    }
+
+
+def get_subject_stats():
+    """Per subject: entries, average marks and score, risk counts"""
+    with connection() as conn:
+        rows = conn.execute("""
+            SELECT a.subject_code, s.name, a.entries, a.sum_attendance, a.sum_internal,
+                   a.sum_assignment, a.sum_score, a.low, a.medium, a.high
+            FROM analytics_subjects a
+            LEFT JOIN subjects s ON s.code = a.subject_code
+            ORDER BY a.subject_code
+        """).fetchall()
+
+    return [{
+        "code": code,
+        "name": name,
+        "students": entries,
+        "avg_attendance": _average(attendance, entries),
+        "avg_internal": _average(internal, entries),
+        "avg_assignment": _average(assignment, entries),
+        "avg_score": _average(score, entries),
+        "risk": _risk(low, medium, high),
+        "at_risk": high,
+    } for code, name, entries, attendance, internal, assignment, score, low, medium, high in rows]
+
+
+def get_group_stats(dimension):
+    """
+    Per age or per USN batch: students, average score, risk counts
+
+    Risk is per student, from their average score over all subjects;
+    students without scores are counted in "students" only.
+    """
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension: {dimension}")
+    with connection() as conn:
+        rows = conn.execute("""
+            SELECT key, students, scored, sum_score, low, medium, high
+            FROM analytics_groups WHERE dimension = ?
+            ORDER BY key
+        """, (dimension,)).fetchall()
+
+    return [{
+        dimension: key,
+        "students": students,
+        "scored_students": scored,
+        "avg_score": _average(sum_score, scored),
+        "risk": _risk(low, medium, high),
+        "at_risk": high,
+    } for key, students, scored, sum_score, low, medium, high in rows]
+
+
+def rebuild():
+    """Recompute the analytics tables from scratch"""
+    with connection() as conn:
+        rebuild_analytics(conn)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["--rebuild"]:
+        sys.exit("Usage: python analytics.py --rebuild")
+    rebuild()
+    print(f"✅ Rebuilt analytics: {get_summary()}")
@@ -0,0 +1,230 @@
+"""
+Async Student Database Operations
+=================================
+
+Awaitable versions of the functions in student_operations.py for use in
+FastAPI's async endpoints. sqlite3 calls block, so each operation runs on
+a bounded, dedicated thread pool instead of the event loop:
+
+- reads run on a pool of reader threads (WAL lets them run concurrently)
+- writes go to the single writer thread of write_queue.py, so they never
+  queue up on SQLite's database lock behind each other; adds, updates
+  and deletes arriving together are committed in one transaction
+
+Single-student lookups and the writes that change them go through
+student_cache.py. A lookup reads the current table versions first (one
+primary-key lookup); an entry in the local cache read under the same
+versions is then answered without another trip to a reader thread.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import analytics
+import auth
+import bulk_students
+import change_feed
+import student_cache
+import student_operations
+import thumbnails
+import write_queue
+from connection_pool import POOL_SIZE
+from picture_store import read_picture
+from subject_scores import PERFORMANCE_TABLES
+
+# One pooled connection is left for the writer thread
+READ_WORKERS = int(os.environ.get("STUDENTS_DB_READ_WORKERS", max(1, POOL_SIZE - 1)))
+
+_readers = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="db-read")
+
+
+async def _run(executor, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def _write(future):
+    try:
+        return await asyncio.wrap_future(future)
+    finally:
+        # Let this process's change feed pick the write up without waiting
+        change_feed.broadcaster.notify()
+
+
+async def _picture(profile_picture, profile_picture_path):
+    """Picture bytes for a write; files are read on a reader thread"""
+    if isinstance(profile_picture, (bytes, bytearray, memoryview)) or (
+            profile_picture is None and not profile_picture_path):
+        return read_picture(profile_picture)
+    return await _run(_readers, student_operations.picture_bytes,
+                      profile_picture, profile_picture_path)
+
+
+def shutdown(wait=True):
+    """Stop the reader threads, commit queued writes and stop the writer"""
+    _readers.shutdown(wait=wait)
+    write_queue.writer.close(wait=wait)
+
+
+# ============= CREATE OPERATIONS =============
+
+async def add_student(usn, name, age, profile_picture_path=None, profile_picture=None):
+    """Add a new student (see student_operations.add_student)"""
+    data = await _picture(profile_picture, profile_picture_path)
+    return await _write(write_queue.add_student(usn, name, age, data))
+
+
+async def import_students_file(fileobj, fmt="csv", upsert=False):
+    """
+    Bulk import a CSV/Parquet file (see bulk_students.import_students_file)
+    
+    The file is read and parsed on a reader thread, a batch ahead; each
+    batch is then written as its own item on the writer thread, so other
+    writes are committed between batches instead of after the whole file.
+    """
+    result = bulk_students.new_import_result()
+    batches = bulk_students.iter_batches(bulk_students.iter_rows(fileobj, fmt))
+    batch = await _run(_readers, next, batches, None)
+    while batch is not None:
+        written = asyncio.ensure_future(_write(write_queue.writer.call(
+            student_cache.import_batch, batch, upsert, result)))
+        try:
+            batch = await _run(_readers, next, batches, None)
+        finally:
+            await written
+    return bulk_students.finish_import_result(result)
+
+
+async def load_demo_data():
+    """Seed the demo students (see subject_scores.load_demo_data)"""
+    return await _write(write_queue.writer.call(student_cache.load_demo_data))
+
+
+# ============= READ OPERATIONS =============
+
+async def get_all_students():
+    """Get all students (see student_operations.get_all_students)"""
+    return await _run(_readers, student_operations.get_all_students)
+
+
+async def get_students_page(limit=50, cursor=None):
+    """Get one page of students (see student_operations.get_students_page)"""
+    return await _run(_readers, student_operations.get_students_page, limit, cursor)
+
+
+async def _cached(kind, usn, read, versions):
+    """A student_cache entry from the local LRU if its versions are current, else read()"""
+    versions = tuple(versions)
+    found, entry = student_cache.peek(kind, usn)
+    if found and entry[0] == versions:
+        return entry[1]
+    return await _run(_readers, read, usn, versions)
+
+
+async def get_student_by_usn(usn):
+    """Get a specific student (see student_operations.get_student_by_usn)"""
+    versions = await get_table_versions("students")
+    return await _cached("student", usn, student_cache.get_student_by_usn, versions)
+
+
+async def get_student_profile_picture(usn, save_path=None):
+    """Get a profile picture (see student_operations.get_student_profile_picture)"""
+    return await _run(_readers, student_operations.get_student_profile_picture,
+                      usn, save_path)
+
+
+async def get_student_picture_info(usn):
+    """Get picture metadata (see student_operations.get_student_picture_info)"""
+    versions = await get_table_versions("students")
+    return await _cached("picture", usn, student_cache.get_student_picture_info, versions)
+
+
+async def get_picture_bytes(sha256, start=0, length=None):
+    """Read a picture or a range of it (see student_operations.get_picture_bytes)"""
+    return await _run(_readers, student_operations.get_picture_bytes, sha256, start, length)
+
+
+async def get_picture_thumbnail(sha256, size):
+    """Get (data, content_type) of a thumbnail (see thumbnails.get_thumbnail)"""
+    return await _run(_readers, thumbnails.get_thumbnail, sha256, size)
+
+
+async def get_student_performance_json(usn, versions=None):
+    """Get a student's performance document (see student_cache.get_student_performance_json)"""
+    if versions is None:
+        versions = await get_table_versions(*PERFORMANCE_TABLES)
+    return await _cached("performance", usn, student_cache.get_student_performance_json, versions)
+
+
+async def get_table_versions(*tables):
+    """Change counters of tables (see student_operations.get_table_versions)"""
+    return await _run(_readers, student_operations.get_table_versions, *tables)
+
+
+# ============= UPDATE OPERATIONS =============
+
+async def update_student(usn, name=None, age=None, profile_picture_path=None, profile_picture=None):
+    """Update a student (see student_operations.update_student)"""
+    data = await _picture(profile_picture, profile_picture_path)
+    return await _write(write_queue.update_student(usn, name, age, data))
+
+
+async def begin_picture(size):
+    """Start writing a streamed picture (see picture_store.begin_picture); its rowid"""
+    return await asyncio.wrap_future(write_queue.begin_picture(size))
+
+
+async def write_picture_chunk(rowid, offset, data):
+    """Write the next chunk of a streamed picture (see picture_store.write_picture_chunk)"""
+    await asyncio.wrap_future(write_queue.write_picture_chunk(rowid, offset, data))
+
+
+def discard_picture(rowid):
+    """Drop a streamed picture that won't be attached (queued, not awaited)"""
+    return write_queue.discard_picture(rowid)
+
+
+async def attach_picture(usn, rowid, sha256, content_type, size, tail=b""):
+    """Make a streamed picture usn's picture (see student_operations.attach_picture)"""
+    return await _write(write_queue.attach_picture(usn, rowid, sha256, content_type, size, tail))
+
+
+# ============= DELETE OPERATIONS =============
+
+async def delete_student(usn):
+    """Delete a student (see student_operations.delete_student)"""
+    return await _write(write_queue.delete_student(usn))
+
+
+# ============= SEARCH OPERATIONS =============
+
+async def search_students_by_name(name_pattern, limit=None, fuzzy=True):
+    """Search students by name (see student_operations.search_students_by_name)"""
+    return await _run(_readers, student_operations.search_students_by_name,
+                      name_pattern, limit, fuzzy)
+
+
+# ============= ANALYTICS =============
+
+async def get_analytics_summary():
+    """Totals and risk distribution (see analytics.get_summary)"""
+    return await _run(_readers, analytics.get_summary)
+
+
+async def get_subject_analytics():
+    """Per-subject aggregates (see analytics.get_subject_stats)"""
+    return await _run(_readers, analytics.get_subject_stats)
+
+
+async def get_group_analytics(dimension):
+    """Per-age or per-batch aggregates (see analytics.get_group_stats)"""
+    return await _run(_readers, analytics.get_group_stats, dimension)
+
+
+# ============= AUTHENTICATION =============
+
+async def check_password(role, login, password):
+    """Verify a login, returning a token or None (see auth.check_password)"""
+    return await _run(_readers, auth.check_password, role, login, password)
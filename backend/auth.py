@@ -0,0 +1,237 @@
+"""
+Authentication
+==============
+
+Password logins for students (USN) and admins (email), and stateless
+session tokens for the endpoints that need them:
+
+- passwords are stored as salted PBKDF2-SHA256 hashes in the accounts
+  table, never in plain text
+- a successful login returns a token: "<payload>.<signature>", where the
+  payload is role, login and expiry time and the signature is an
+  HMAC-SHA256 of it. Checking one needs no database round-trip
+- verified tokens are kept in a small LRU, so a request carrying a token
+  seen before costs a dictionary lookup
+
+The signing key comes from AUTH_SECRET, or else from the auth_keys table
+(created with a random key), so every worker process accepts the tokens
+of the others.
+
+Settings:
+    AUTH_SECRET                 signing key (default: stored in the database)
+    AUTH_TOKEN_TTL              token lifetime in seconds (default 900)
+    AUTH_TOKEN_CACHE_ENTRIES    verified tokens kept in the LRU (default 4096)
+    AUTH_HASH_ITERATIONS        PBKDF2 iterations for new hashes (default 200000)
+
+Usage:
+    python auth.py admin admin@example.com     # set a password (prompts)
+    python auth.py student 1CR23AD106
+"""
+
+import base64
+import functools
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import sys
+import time
+from collections import namedtuple
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from connection_pool import connection
+from student_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+AUTH_SECRET = os.environ.get("AUTH_SECRET")
+AUTH_TOKEN_TTL = int(os.environ.get("AUTH_TOKEN_TTL", 900))
+AUTH_TOKEN_CACHE_ENTRIES = int(os.environ.get("AUTH_TOKEN_CACHE_ENTRIES", 4096))
+AUTH_HASH_ITERATIONS = int(os.environ.get("AUTH_HASH_ITERATIONS", 200_000))
+
+ROLES = ("student", "admin")
+
+Principal = namedtuple("Principal", "role login expires")
+
+
+# ============= PASSWORD HASHES =============
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def hash_password(password, iterations=AUTH_HASH_ITERATIONS):
+    """Salted hash to store, as pbkdf2_sha256$<iterations>$<salt>$<hash>"""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+def verify_password(password, stored):
+    """Whether password matches a hash_password() value (constant-time compare)"""
+    try:
+        algorithm, iterations, salt, digest = stored.split("$")
+        iterations = int(iterations)
+    except (AttributeError, ValueError):
+        return False
+    if algorithm != "pbkdf2_sha256":
+        return False
+    actual = hashlib.pbkdf2_hmac("sha256", password.encode(), _b64decode(salt), iterations)
+    return hmac.compare_digest(actual, _b64decode(digest))
+
+
+@functools.lru_cache(maxsize=1)
+def _dummy_hash():
+    """Checked when a login doesn't exist, so it takes as long as a wrong password"""
+    return hash_password(secrets.token_urlsafe())
+
+
+# ============= ACCOUNTS =============
+
+def set_password(role, login, password):
+    """Create an account or replace its password"""
+    if role not in ROLES:
+        raise ValueError(f"Unknown role {role!r}")
+    password_hash = hash_password(password)
+    with connection() as conn:
+        conn.execute("""
+            INSERT INTO accounts (role, login, password_hash) VALUES (?, ?, ?)
+            ON CONFLICT (role, login) DO UPDATE
+            SET password_hash = excluded.password_hash, updated_at = CURRENT_TIMESTAMP
+        """, (role, login, password_hash))
+        conn.commit()
+    logger.info("Password set for %s %s", role, login)
+
+
+def check_password(role, login, password):
+    """
+    Verify a login; returns a new token, or None for a wrong login/password
+
+    Runs PBKDF2, which is deliberately slow: call it off the event loop.
+    """
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT password_hash FROM accounts WHERE role = ? AND login = ?", (role, login)
+        ).fetchone()
+    if not verify_password(password, row[0] if row else _dummy_hash()) or row is None:
+        logger.info("Failed %s login for %s", role, login)
+        return None
+    return issue_token(role, login)
+
+
+def load_demo_accounts():
+    """Create the demo admin and student logins unless accounts already exist"""
+    with connection() as conn:
+        if conn.execute("SELECT 1 FROM accounts LIMIT 1").fetchone():
+            return 0
+    from seed_data import ADMIN_CREDENTIALS, STUDENT_DATA
+    rows = [("admin", email, hash_password(password))
+            for email, password in ADMIN_CREDENTIALS.items()]
+    rows += [("student", usn, hash_password(student["password"]))
+             for usn, student in STUDENT_DATA.items()]
+    with connection() as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO accounts (role, login, password_hash) VALUES (?, ?, ?)", rows
+        )
+        conn.commit()
+    return len(rows)
+
+
+# ============= TOKENS =============
+
+_secret = None
+_verified = LRUCache(max_entries=AUTH_TOKEN_CACHE_ENTRIES, ttl=AUTH_TOKEN_TTL)
+
+
+def signing_key():
+    """AUTH_SECRET, or the key stored in the database (read once)"""
+    global _secret
+    if _secret is None:
+        if AUTH_SECRET:
+            _secret = AUTH_SECRET.encode()
+        else:
+            with connection() as conn:
+                _secret = conn.execute("SELECT secret FROM auth_keys WHERE id = 1").fetchone()[0]
+    return _secret
+
+
+def _sign(payload):
+    return _b64encode(hmac.new(signing_key(), payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(role, login, ttl=AUTH_TOKEN_TTL):
+    """Signed token for role/login, valid for ttl seconds"""
+    payload = _b64encode(f"{role}|{int(time.time()) + ttl}|{login}".encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_token(token):
+    """The Principal of a valid, unexpired token, else None"""
+    found, principal = _verified.get(token, count_miss=False)
+    if not found:
+        payload, _, signature = token.partition(".")
+        if not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+            return None
+        try:
+            role, expires, login = _b64decode(payload).decode().split("|", 2)
+            principal = Principal(role, login, int(expires))
+        except ValueError:
+            return None
+        _verified.set(token, principal)
+    if principal.expires <= time.time():
+        return None
+    return principal
+
+
+# ============= FASTAPI DEPENDENCIES =============
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail):
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+async def current_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+):
+    """Dependency: the Principal of the request's bearer token (401 without one)"""
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    principal = verify_token(credentials.credentials)
+    if principal is None:
+        raise _unauthorized("Invalid or expired token")
+    return principal
+
+
+async def require_student_access(usn: str, principal: Principal = Depends(current_principal)):
+    """Dependency for /.../{usn} routes: that student, or any admin"""
+    if principal.role != "admin" and principal.login != usn.upper():
+        raise HTTPException(status_code=403, detail="Not allowed to view this student")
+    return principal
+
+
+async def require_admin(principal: Principal = Depends(current_principal)):
+    """Dependency for admin-only routes"""
+    if principal.role != "admin":
+        raise HTTPException(status_code=403, detail="Admins only")
+    return principal
+
+
+if __name__ == "__main__":
+    import getpass
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ROLES:
+        sys.exit("Usage: python auth.py admin|student LOGIN")
+    role, login = sys.argv[1], sys.argv[2]
+    set_password(role, login.upper() if role == "student" else login,
+                 getpass.getpass(f"New password for {login}: "))
+    print(f"✅ Password set for {role} {login}")
@@ -0,0 +1,22 @@
+"""
+Backend Benchmarks
+==================
+
+One-off scripts (bench_*.py, load_*.py) measure a single change against
+the behaviour it replaced. The suite measures everything at once, so two
+runs can be compared:
+
+    python -m benchmarks.suite --output before.json
+    ... change something ...
+    python -m benchmarks.suite --output after.json
+    python -m benchmarks.compare before.json after.json --threshold 0.10
+
+- datagen.py   synthetic students, subject scores and pictures
+- suite.py     micro-benchmarks for every CRUD function and /predict, plus
+               end-to-end load scenarios against the FastAPI apps in-process
+- results.py   the JSON results format and the regression comparison
+- compare.py   command-line comparison of two result files
+
+Run everything from the backend directory; every run uses a fresh
+database in a temporary directory.
+"""
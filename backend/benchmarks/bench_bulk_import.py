@@ -0,0 +1,114 @@
+"""
+Benchmark: bulk student import
+==============================
+
+Reports rows per second for loading a generated intake:
+- add_student, one connect/INSERT/commit per row (the only option before
+  bulk import); run on --single-rows rows only, it is slow
+- bulk_students.import_students_file from CSV and from Parquet (if pyarrow
+  is installed), each into an empty database
+- POST /students/bulk with the CSV file
+- upsert of the same CSV over the loaded rows
+- GET /students/export as CSV
+
+Run from the backend directory:
+    python benchmarks/bench_bulk_import.py --rows 100000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def make_csv(rows):
+    lines = ["usn,name,age"]
+    lines.extend(f"1BM{i:07d},Student {i},{18 + i % 8}" for i in range(rows))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def make_parquet(csv_data):
+    try:
+        import pyarrow.csv as pacsv
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    buffer = io.BytesIO()
+    pq.write_table(pacsv.read_csv(io.BytesIO(csv_data)), buffer)
+    return buffer.getvalue()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--single-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fastapi.testclient import TestClient
+        import main as server
+        from bulk_students import import_students_file
+        from connection_pool import connection
+        from student_operations import add_student
+
+    def clear():
+        with connection() as conn:
+            conn.execute("DELETE FROM students")
+            conn.commit()
+
+    csv_data = make_csv(args.rows)
+    parquet_data = make_parquet(csv_data)
+    results = {}
+
+    clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds, _ = timed(lambda: [
+            add_student(f"1BM{i:07d}", f"Student {i}", 18 + i % 8) for i in range(args.single_rows)
+        ])
+    results["add_student per row"] = args.single_rows / seconds
+
+    clear()
+    seconds, result = timed(lambda: import_students_file(io.BytesIO(csv_data), "csv"))
+    assert result["inserted"] == args.rows, result
+    results["import CSV"] = args.rows / seconds
+
+    if parquet_data is not None:
+        clear()
+        seconds, result = timed(lambda: import_students_file(io.BytesIO(parquet_data), "parquet"))
+        assert result["inserted"] == args.rows, result
+        results["import Parquet"] = args.rows / seconds
+
+    clear()
+    client = TestClient(server.app)
+    seconds, response = timed(lambda: client.post(
+        "/students/bulk", content=csv_data, headers={"content-type": "text/csv"}))
+    assert response.json()["inserted"] == args.rows, response.text
+    results["POST /students/bulk"] = args.rows / seconds
+
+    seconds, result = timed(lambda: import_students_file(io.BytesIO(csv_data), "csv", upsert=True))
+    assert result["updated"] == args.rows, result
+    results["upsert CSV"] = args.rows / seconds
+
+    seconds, response = timed(lambda: client.get("/students/export"))
+    results["GET /students/export"] = args.rows / seconds
+
+    print(f"Importing {args.rows} students")
+    for label, rows_per_second in results.items():
+        print(f"  {label:<22} {rows_per_second:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
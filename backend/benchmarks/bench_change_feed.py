@@ -0,0 +1,178 @@
+"""
+Benchmark: dashboards polling GET /students vs. the change feed
+===============================================================
+
+Loads --students synthetic students and starts serve.py (one worker).
+For each dashboard count, one client registers --rate students per
+second for --duration seconds, while the dashboards follow the roster
+in one of two ways:
+
+- polling   GET /students every --poll-interval seconds, with
+            If-None-Match, so an unchanged listing costs only a 304
+- feed      one GET /students/changes stream each (Server-Sent Events)
+
+Reports the server's CPU time (from /proc/<pid>/stat, Linux only), the
+(decompressed) bytes the dashboards received, and how long after a
+registration was sent a dashboard saw it (median and p99 over
+dashboards and registrations).
+
+Run from the backend directory:
+    python benchmarks/bench_change_feed.py --dashboards 1 10 100
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from benchmarks.bench_workers import free_port, wait_ready  # noqa: E402
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+async def register(client, args, sent, prefix):
+    """Add --rate students per second; records when each was sent"""
+    for i in range(int(args.rate * args.duration)):
+        usn = f"{prefix}{i:06d}"
+        sent[usn] = time.perf_counter()
+        await client.post("/students", json={"usn": usn, "name": "Feed Student", "age": 20})
+        await asyncio.sleep(1 / args.rate)
+
+
+async def poll_dashboard(client, args, seen, stop):
+    """GET /students every poll interval; seen gets (usn, time of the first listing with it)"""
+    import httpx
+
+    etag = None
+    received = 0
+    known = set()
+    while not stop.is_set():
+        headers = {"If-None-Match": etag} if etag else {}
+        try:
+            response = await client.get("/students", headers=headers)
+        except httpx.TransportError:
+            # An overloaded server dropped the connection: try again next poll
+            await asyncio.sleep(args.poll_interval)
+            continue
+        received += len(response.content)
+        if response.status_code == 200:
+            etag = response.headers.get("etag")
+            now = time.perf_counter()
+            usns = {s["usn"] for s in response.json()["students"]}
+            for usn in usns - known:
+                seen.append((usn, now))
+            known = usns
+        await asyncio.sleep(args.poll_interval)
+    return received
+
+
+async def feed_dashboard(client, args, seen, stop, connected):
+    """Follow GET /students/changes; seen gets (usn, time) per insert event"""
+    received = 0
+    async with client.stream("GET", "/students/changes", timeout=None) as response:
+        connected.release()
+        event = None
+        async for line in response.aiter_lines():
+            received += len(line) + 1
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: ") and event == "insert":
+                seen.append((line.split('"usn":"', 1)[1].split('"', 1)[0], time.perf_counter()))
+            if stop.is_set():
+                break
+    return received
+
+
+async def run(base_url, mode, dashboards, args, pid, prefix):
+    import httpx
+
+    sent, seen = {}, []
+    stop = asyncio.Event()
+    connected = asyncio.Semaphore(0)
+    limits = httpx.Limits(max_connections=dashboards + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        if mode == "polling":
+            tasks = [asyncio.create_task(poll_dashboard(client, args, seen, stop))
+                     for _ in range(dashboards)]
+        else:
+            tasks = [asyncio.create_task(feed_dashboard(client, args, seen, stop, connected))
+                     for _ in range(dashboards)]
+            for _ in range(dashboards):
+                await connected.acquire()
+        start_cpu = cpu_seconds(pid)
+        await register(client, args, sent, prefix)
+        await asyncio.sleep(args.poll_interval + 0.5)  # let the last change arrive
+        server_cpu = cpu_seconds(pid) - start_cpu
+        stop.set()
+        # One more write wakes the streams so they notice stop
+        await client.post("/students", json={"usn": f"{prefix}END", "name": "End", "age": 20})
+        received = sum(await asyncio.gather(*tasks))
+
+    latencies = [at - sent[usn] for usn, at in seen if usn in sent]
+    return server_cpu, received, latencies, len(latencies) / (len(sent) * dashboards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--dashboards", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--rate", type=float, default=5, help="registrations per second")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ, STUDENTS_DB=os.path.join(workdir, "bench.db"), LOG_LEVEL="WARNING")
+    os.environ.update(env)
+    with contextlib.redirect_stdout(io.StringIO()):
+        from benchmarks import datagen
+        datagen.populate(args.students)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1", "--port", str(port)],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(base_url)
+        print(f"{args.students} students; {args.rate:g} registrations/s for {args.duration:g}s; "
+              f"polling every {args.poll_interval:g}s")
+        print(f"  {'dashboards':>10} {'mode':<8} {'server CPU s':>12} {'received KiB':>13} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'seen':>6}")
+        for dashboards in args.dashboards:
+            for mode in ("polling", "feed"):
+                prefix = f"{mode[0].upper()}{dashboards}X"
+                cpu, received, latencies, seen = asyncio.run(
+                    run(base_url, mode, dashboards, args, server.pid, prefix))
+                print(f"  {dashboards:>10} {mode:<8} {cpu:12.2f} {received / 1024:13.0f} "
+                      f"{statistics.median(latencies) * 1000:8.0f} "
+                      f"{percentile(latencies, 99) * 1000:8.0f} {seen:6.0%}")
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
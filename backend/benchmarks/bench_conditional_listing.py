@@ -0,0 +1,71 @@
+"""
+Benchmark: polling GET /students with compression and ETags
+===========================================================
+
+Reports, for a listing of --students students:
+- bytes on the wire without compression, with gzip and with brotli
+  (when the brotli package is installed)
+- latency of a full response vs. an unchanged poll (If-None-Match -> 304)
+
+Run from the backend directory:
+    python benchmarks/bench_conditional_listing.py --students 10000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fastapi.testclient import TestClient
+        import compression
+        import main as server
+        from bulk_students import import_students
+
+    import_students((i + 2, f"1BM{i:07d}", f"Student {i}", 18 + i % 8)
+                    for i in range(args.students))
+    client = TestClient(server.app)
+
+    def wire_bytes(encoding):
+        with client.stream("GET", "/students", headers={"accept-encoding": encoding}) as response:
+            return len(b"".join(response.iter_raw()))
+
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli else [])
+    print(f"GET /students with {args.students} students")
+    for encoding in encodings:
+        print(f"  {encoding:<9} {wire_bytes(encoding) / 1024:10.1f} KB  "
+              f"{median_ms(lambda: client.get('/students', headers={'accept-encoding': encoding}), args.repeat):7.2f} ms")
+
+    etag = client.get("/students").headers["etag"]
+    poll = median_ms(lambda: client.get("/students", headers={"if-none-match": etag}),
+                     args.repeat)
+    print(f"  unchanged poll (304)        {poll:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: connection pool vs. connect-per-call
+================================================
+
+Measures requests per second on GET /students/{usn} with the old
+open/close-per-call behaviour and with the pooled connection manager.
+
+Run from the backend directory:
+    python benchmarks/bench_connection_pool.py --students 10000 --requests 5000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@contextlib.contextmanager
+def connect_per_call():
+    """The pre-pool behaviour: a fresh connection for every operation"""
+    import database
+    conn = database.get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def seed(conn, n):
+    conn.executemany(
+        "INSERT INTO students (usn, name, age) VALUES (?, ?, ?)",
+        ((f"1BM{i:07d}", f"Student {i}", 18 + i % 6) for i in range(n)),
+    )
+    conn.commit()
+
+
+def run(client, usns, n_requests):
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        response = client.get(f"/students/{random.choice(usns)}")
+        assert response.status_code == 200
+    return n_requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["STUDENTS_DB"] = os.path.join(tmp, "bench.db")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import database
+        import student_operations
+        from fastapi.testclient import TestClient
+        from main import app
+
+    conn = database.get_connection()
+    seed(conn, args.students)
+    conn.close()
+
+    usns = [f"1BM{i:07d}" for i in range(args.students)]
+    client = TestClient(app)
+    pooled_connection = student_operations.connection
+
+    results = {}
+    for label, factory in (("connect-per-call", connect_per_call),
+                           ("pooled", pooled_connection)):
+        student_operations.connection = factory
+        with contextlib.redirect_stdout(io.StringIO()):
+            run(client, usns, min(200, args.requests))  # warm-up
+            results[label] = run(client, usns, args.requests)
+    student_operations.connection = pooled_connection
+
+    print(f"GET /students/{{usn}} over {args.students} students, "
+          f"{args.requests} requests")
+    for label, rps in results.items():
+        print(f"  {label:<18} {rps:10.1f} req/s")
+    print(f"  speedup            {results['pooled'] / results['connect-per-call']:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
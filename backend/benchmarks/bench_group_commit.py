@@ -0,0 +1,101 @@
+"""
+Benchmark: student registrations per second, per-row vs. group commit
+=====================================================================
+
+--concurrency registrants (asyncio tasks) each add students one after
+another for --duration seconds, through:
+
+- per-row: student_operations.add_student (then invalidating the cache)
+  on a single writer thread, one transaction per student (the old
+  async_operations path)
+- group commit: async_operations.add_student, i.e. write_queue batching
+  the adds that arrive together into one transaction
+
+Every --duplicate-every'th add reuses a USN, to show that a failing row
+only fails its own caller. Also reports the mean batch size.
+
+Run from the backend directory:
+    python benchmarks/bench_group_commit.py --concurrency 1 10 100
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+async def registrants(add, concurrency, duration, prefix, duplicate_every):
+    """Run concurrency add loops; returns (added, rejected duplicates)"""
+    deadline = time.perf_counter() + duration
+    counts = [0, 0]
+
+    async def registrant(worker):
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            duplicate = duplicate_every and n % duplicate_every == 0
+            usn = f"{prefix}{worker:03d}{(n - 1 if duplicate else n):07d}"
+            student_id = await add(usn, "Bench Student", 20)
+            counts[student_id is None] += 1
+
+    await asyncio.gather(*(registrant(worker) for worker in range(concurrency)))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--duplicate-every", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import async_operations
+        import student_cache
+        import student_operations
+        import write_queue
+
+    single_writer = ThreadPoolExecutor(max_workers=1)
+
+    def add_and_invalidate(usn, name, age):
+        try:
+            return student_operations.add_student(usn, name, age)
+        finally:
+            student_cache.invalidate(usn)
+
+    async def per_row(usn, name, age):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(single_writer, add_and_invalidate, usn, name, age)
+
+    print(f"Registrations per second ({args.duration}s per run, "
+          f"window {write_queue.WRITE_BATCH_WINDOW_MS} ms, max batch {write_queue.WRITE_BATCH_MAX})")
+    for run, concurrency in enumerate(args.concurrency):
+        results = {}
+        for label, add in (("per-row", per_row), ("group", async_operations.add_student)):
+            batches = write_queue.WRITE_BATCH_SIZE.count()
+            added, rejected = asyncio.run(registrants(
+                add, concurrency, args.duration, f"{label[0].upper()}{run}", args.duplicate_every))
+            batches = write_queue.WRITE_BATCH_SIZE.count() - batches
+            results[label] = (added + rejected) / args.duration
+            detail = f"  mean batch {(added + rejected) / batches:6.1f}" if batches else ""
+            print(f"  {concurrency:4d} registrants  {label:<8} {results[label]:9,.0f} writes/s  "
+                  f"({rejected} duplicates rejected){detail}")
+        print(f"  {concurrency:4d} registrants  speed-up {results['group'] / results['per-row']:6.1f}x")
+
+    single_writer.shutdown()
+    async_operations.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: CPU cost of serializing student listings
+===================================================
+
+Measures process CPU time per GET /students of --students rows:
+- dict per row returned to FastAPI (jsonable_encoder + json.dumps, the
+  old path)
+- FastJSONResponse returned directly (json_responses.dumps: orjson if
+  installed)
+and the same two paths for the Student rows alone, without HTTP.
+
+Run from the backend directory:
+    python benchmarks/bench_json_listing.py --students 10000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def cpu_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        times.append(time.process_time() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fastapi.encoders import jsonable_encoder
+        from fastapi.testclient import TestClient
+        import json_responses
+        import main as server
+        from bulk_students import import_students
+        from student_operations import get_all_students
+
+    import_students((i + 2, f"1BM{i:07d}", f"Student {i}", 18 + i % 8)
+                    for i in range(args.students))
+    students = get_all_students()
+
+    @server.app.get("/bench/students-encoder")
+    async def old_listing():
+        rows = get_all_students()
+        return {"success": True, "total": len(rows),
+                "students": [{"id": s[0], "usn": s[1], "name": s[2], "age": s[3],
+                              "created_at": s[4]} for s in rows]}
+
+    client = TestClient(server.app)
+
+    def old_dumps():
+        content = {"students": [{"id": s[0], "usn": s[1], "name": s[2], "age": s[3],
+                                 "created_at": s[4]} for s in students]}
+        json.dumps(jsonable_encoder(content)).encode()
+
+    results = {
+        "GET /students, encoder path": cpu_ms(
+            lambda: client.get("/bench/students-encoder"), args.repeat),
+        "GET /students, FastJSONResponse": cpu_ms(lambda: client.get("/students"), args.repeat),
+        "rows only, encoder + json": cpu_ms(old_dumps, args.repeat),
+        "rows only, _asdict + dumps": cpu_ms(
+            lambda: json_responses.dumps({"students": [s._asdict() for s in students]}),
+            args.repeat),
+        "get_all_students (fetch)": cpu_ms(get_all_students, args.repeat),
+    }
+
+    renderer = "orjson" if json_responses.orjson else "json"
+    print(f"CPU per listing of {len(students)} students (renderer: {renderer})")
+    for label, ms in results.items():
+        print(f"  {label:<34} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: listing and search latency vs. per-row output
+========================================================
+
+Times get_all_students() and a broad search_students_by_name() over
+--students rows. stdout goes to os.devnull, so any print() calls still
+make real write syscalls as they would under uvicorn; logging is set
+up as the server does it (app_logging.configure_logging, LOG_LEVEL).
+
+Run from the backend directory:
+    python benchmarks/bench_listing_logging.py --students 10000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import student_operations
+        from bulk_students import import_students
+        try:
+            import app_logging
+            app_logging.configure_logging()
+        except ImportError:  # trees from before app_logging existed
+            pass
+
+    import_students((i + 2, f"1BM{i:07d}", f"Student {i}", 18 + i % 8)
+                    for i in range(args.students))
+
+    def median_ms(func):
+        times = []
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000
+
+    print(f"{args.students} students, median of {args.repeat} calls")
+    print(f"  get_all_students()            {median_ms(student_operations.get_all_students):9.2f} ms")
+    print(f"  search_students_by_name('Stu') "
+          f"{median_ms(lambda: student_operations.search_students_by_name('Stu')):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: cost of the metrics instrumentation
+==============================================
+
+Reports:
+- an @instrumented call vs. the bare function (get_student_by_usn)
+- Histogram.observe on its own
+- GET /students/{usn} requests/s with and without MetricsMiddleware
+
+Run from the backend directory:
+    python benchmarks/bench_metrics_overhead.py --calls 50000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def per_call_us(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        import metrics
+        import student_operations
+        from bulk_students import import_students
+
+    import_students([(2, "1BM0000001", "Student", 20)])
+    instrumented = student_operations.get_student_by_usn
+    bare = instrumented.__wrapped__
+    histogram = metrics.Histogram("bench_seconds", "benchmark only", ("label",))
+
+    print(f"Per call, {args.calls} calls")
+    print(f"  get_student_by_usn (bare)          {per_call_us(lambda: bare('1BM0000001'), args.calls):7.2f} us")
+    print(f"  get_student_by_usn (@instrumented) {per_call_us(lambda: instrumented('1BM0000001'), args.calls):7.2f} us")
+    print(f"  Histogram.observe                  {per_call_us(lambda: histogram.observe(0.003, 'x'), args.calls):7.2f} us")
+
+    def requests_per_second(with_middleware):
+        app = FastAPI()
+        if with_middleware:
+            app.add_middleware(metrics.MetricsMiddleware)
+
+        @app.get("/students/{usn}")
+        def get_student(usn: str):
+            return {"student": bare(usn)}
+
+        client = TestClient(app)
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            client.get("/students/1BM0000001")
+        return args.requests / (time.perf_counter() - start)
+
+    print(f"GET /students/{{usn}}, {args.requests} requests")
+    print(f"  without MetricsMiddleware {requests_per_second(False):9,.0f} req/s")
+    print(f"  with MetricsMiddleware    {requests_per_second(True):9,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: LIKE scan vs. trigram FTS5 index for name search
+============================================================
+
+Compares the old `name LIKE '%pattern%'` query with
+student_operations.search_students_by_name at several table sizes.
+
+Run from the backend directory:
+    python benchmarks/bench_name_search.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun",
+               "Kavya", "Rohan", "Isha", "Karthik", "Meera", "Aditya", "Divya"]
+SYLLABLES = ["sha", "rma", "ku", "mar", "pa", "tel", "red", "dy", "iy", "er",
+             "na", "ir", "gup", "ta", "sin", "gh", "ra", "o", "me", "non",
+             "jo", "shi", "heg", "de", "shet", "ty", "bha", "t", "van", "kat"]
+# Prefix, multi-word, selective and misspelt queries
+QUERIES = ["pri", "kumar", "sneha shaku", "rohan heg", "shetty", "Karthk Redd", "avya"]
+
+
+def random_name(rng):
+    surname = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return f"{rng.choice(FIRST_NAMES)} {surname.capitalize()}"
+
+
+def seed(conn, n):
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO students (usn, name, age) VALUES (?, ?, ?)",
+        ((f"1BM{i:07d}", random_name(rng), 18 + i % 6) for i in range(n)),
+    )
+    conn.commit()
+
+
+def like_search(conn, pattern, limit):
+    return conn.execute("""
+        SELECT id, usn, name, age
+        FROM students
+        WHERE name LIKE ?
+        ORDER BY name
+        LIMIT ?
+    """, (f"%{pattern}%", limit)).fetchall()
+
+
+def time_queries(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            func(query)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["STUDENTS_DB"] = os.path.join(tmp, "bench.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import database
+        import connection_pool
+        import student_operations
+
+    print(f"{'rows':>9} {'LIKE ms/query':>14} {'index ms/query':>15} {'speedup':>8}")
+    for size in args.sizes:
+        database.DB_FILE = Path(tmp) / f"bench_{size}.db"
+        with contextlib.redirect_stdout(io.StringIO()):
+            database.init_database()
+        connection_pool.pool = connection_pool.ConnectionPool()
+
+        with connection_pool.connection() as conn:
+            seed(conn, size)
+            with contextlib.redirect_stdout(io.StringIO()):
+                like_ms = time_queries(lambda q: like_search(conn, q, args.limit), args.repeat)
+                fts_ms = time_queries(
+                    lambda q: student_operations.search_students_by_name(q, limit=args.limit),
+                    args.repeat)
+        print(f"{size:>9} {like_ms:>14.3f} {fts_ms:>15.3f} {like_ms / fts_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
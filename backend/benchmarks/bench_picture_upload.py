@@ -0,0 +1,125 @@
+"""
+Benchmark: profile picture upload memory and latency
+====================================================
+
+Uploads pictures (5 MB by default) through three paths and reports
+latency and peak RSS growth. Each path runs in its own process so the
+peak RSS numbers don't contaminate each other.
+
+- tempfile:  the old path - base64 JSON, decoded, written to a
+             NamedTemporaryFile, re-read by add_student
+- bytes:     base64 JSON, decoded bytes passed straight to add_student
+- multipart: PUT /students/{usn}/picture, parsed as it arrives and
+             written into the BLOB a chunk at a time (no temporary file)
+
+The test client runs in the same process and builds each request body
+in memory, so every path's RSS growth includes a few copies of the
+upload on the client side; compare the paths with each other.
+
+Run from the backend directory:
+    python benchmarks/bench_picture_upload.py --size-mb 5 --uploads 20
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MODES = ("tempfile", "bytes", "multipart")
+
+
+def add_legacy_route(app, add_student):
+    """Register the pre-streaming upload handler for comparison"""
+    from pydantic import BaseModel
+
+    class LegacyStudent(BaseModel):
+        usn: str
+        name: str
+        age: int
+        profile_picture_base64: str
+
+    @app.post("/bench/legacy-students")
+    async def legacy_create(student: LegacyStudent):
+        picture_data = base64.b64decode(student.profile_picture_base64)
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
+        temp_file.write(picture_data)
+        temp_file.close()
+        try:
+            return {"id": await add_student(student.usn, student.name, student.age,
+                                            temp_file.name)}
+        finally:
+            os.unlink(temp_file.name)
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode, size_mb, uploads):
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fastapi.testclient import TestClient
+        import main as server
+        from async_operations import add_student
+
+    add_legacy_route(server.app, add_student)
+    client = TestClient(server.app)
+    pictures = [os.urandom(size_mb * 1024 * 1024) for _ in range(2)]
+    encoded = [base64.b64encode(p).decode() for p in pictures]
+    baseline = max_rss_mb()
+
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(uploads):
+            usn = f"1BM{i:07d}"
+            start = time.perf_counter()
+            if mode == "tempfile":
+                response = client.post("/bench/legacy-students", json={
+                    "usn": usn, "name": "Bench", "age": 20,
+                    "profile_picture_base64": encoded[i % 2]})
+            elif mode == "bytes":
+                response = client.post("/students", json={
+                    "usn": usn, "name": "Bench", "age": 20,
+                    "profile_picture_base64": encoded[i % 2]})
+            else:
+                client.post("/students", json={"usn": usn, "name": "Bench", "age": 20})
+                response = client.put(f"/students/{usn}/picture", files={
+                    "picture": ("avatar.jpg", pictures[i % 2], "image/jpeg")})
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    print(f"  {mode:<10} p50={statistics.median(latencies) * 1000:8.1f} ms "
+          f"max={max(latencies) * 1000:8.1f} ms "
+          f"peak RSS growth={max_rss_mb() - baseline:7.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=5)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--mode", choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.size_mb, args.uploads)
+        return
+
+    print(f"{args.uploads} uploads of {args.size_mb} MB")
+    for mode in MODES:
+        subprocess.run([sys.executable, __file__, "--mode", mode,
+                        "--size-mb", str(args.size_mb),
+                        "--uploads", str(args.uploads)], check=True)
+
+
+if __name__ == "__main__":
+    main()
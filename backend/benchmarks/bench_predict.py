@@ -0,0 +1,84 @@
+"""
+Benchmark: single vs. batch performance prediction
+==================================================
+
+Reports rows per second for:
+- POST /predict, one row per request (the only option before /predict/batch)
+- POST /predict/batch with a JSON columnar payload
+- POST /predict/batch with a CSV upload
+- the NumPy kernel on its own
+
+Run from the backend directory:
+    python benchmarks/bench_predict.py --rows 250000
+    MODELS_DIR=models python benchmarks/bench_predict.py --model v2
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=250000)
+    parser.add_argument("--single-requests", type=int, default=2000)
+    parser.add_argument("--model", default="baseline", help="registered model to score with")
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fastapi.testclient import TestClient
+        import main as server
+        import model_registry
+
+    rng = np.random.default_rng(42)
+    attendance = rng.uniform(40, 100, args.rows).round(1)
+    internal = rng.uniform(0, 25, args.rows).round(1)
+    assignment = rng.uniform(0, 25, args.rows).round(1)
+    model_registry.load_models()
+    model = model_registry.get_model(args.model)
+    client = TestClient(server.app)
+    query = f"?model={args.model}"
+
+    def single():
+        for i in range(args.single_requests):
+            client.post(f"/predict{query}", json={"attendance": attendance[i],
+                                          "internal": internal[i],
+                                          "assignment": assignment[i]})
+
+    payload = {"attendance": attendance.tolist(), "internal": internal.tolist(),
+               "assignment": assignment.tolist()}
+    csv_body = "attendance,internal,assignment\n" + "\n".join(
+        f"{a},{b},{c}" for a, b, c in zip(attendance, internal, assignment))
+
+    results = {
+        "single /predict": args.single_requests / timed(single),
+        "batch JSON": args.rows / timed(lambda: client.post(f"/predict/batch{query}", json=payload)),
+        "batch CSV": args.rows / timed(lambda: client.post(
+            f"/predict/batch{query}", content=csv_body.encode(),
+            headers={"content-type": "text/csv"})),
+        "kernel only": args.rows / timed(lambda: model.predict(attendance, internal, assignment)),
+    }
+
+    print(f"Scoring {args.rows} rows with model {model.name} ({model.version})")
+    for label, rows_per_second in results.items():
+        print(f"  {label:<16} {rows_per_second:14,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark: roster snapshot memory per worker
+============================================
+
+Loads --students students with --subjects scores each, then starts
+--workers worker processes per mode. Each worker loads the whole roster
+and every score, predicts every student's score, and waits while the
+memory it holds is read from /proc/<pid>/smaps_rollup (Linux only):
+
+- baseline   imports only (subtracted from the other modes)
+- rows       get_all_students() plus the scores as STUDENT_DATA-shaped
+             dicts, scored in Python (the way the roster was held before)
+- snapshot   roster_snapshot.current(), mapped read-only, scored with
+             NumPy views of the mapping
+
+RSS counts the mapped file pages in every worker; PSS splits shared
+pages between the processes mapping them, so it is the better "memory
+per worker" figure when several workers share one snapshot.
+
+Run from the backend directory:
+    python benchmarks/bench_roster_snapshot.py --students 100000 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+WORKER_SCRIPT = """
+import sys, time
+import model_registry, roster_snapshot, student_operations
+from connection_pool import connection
+
+mode = sys.argv[1]
+model = model_registry.get_model("baseline")
+start = time.perf_counter()
+if mode == "rows":
+    students = student_operations.get_all_students()
+    with connection() as conn:
+        rows = conn.execute(
+            "SELECT sc.usn, sc.subject_code, sub.name, attendance, internal, assignment, total_classes "
+            "FROM student_subject_scores sc JOIN subjects sub ON sub.code = sc.subject_code"
+        ).fetchall()
+    roster = {s.usn: {"usn": s.usn, "name": s.name, "age": s.age, "subjects": []} for s in students}
+    for usn, code, name, attendance, internal, assignment, total in rows:
+        roster[usn]["subjects"].append({"name": name, "code": code, "attendance": attendance,
+                                        "internal": internal, "assignment": assignment,
+                                        "totalClasses": total})
+    del rows
+    loaded = time.perf_counter()
+    scores = {}
+    for usn, student in roster.items():
+        subjects = student["subjects"]
+        if subjects:
+            scores[usn] = sum(s["attendance"] * 0.4 + s["internal"] * 2 + s["assignment"] * 2
+                              for s in subjects) / len(subjects)
+elif mode == "snapshot":
+    snapshot = roster_snapshot.current()
+    loaded = time.perf_counter()
+    scores = roster_snapshot.score_students(snapshot, model)
+else:
+    loaded = time.perf_counter()
+print(loaded - start, time.perf_counter() - loaded, flush=True)
+sys.stdin.read()
+"""
+
+
+def smaps_rollup(pid):
+    """{"Rss": kB, "Pss": kB, ...} of a process"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def run_workers(mode, count, env):
+    """Start count workers in mode; (per-worker memory, load s, score s) medians"""
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER_SCRIPT, mode], cwd=BACKEND, env=env,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(count)]
+    try:
+        timings = [[float(value) for value in worker.stdout.readline().split()] for worker in workers]
+        memory = [smaps_rollup(worker.pid) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+    return (
+        {key: statistics.median(m[key] for m in memory) for key in ("Rss", "Pss")},
+        statistics.median(t[0] for t in timings),
+        statistics.median(t[1] for t in timings),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--subjects", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("Needs /proc/<pid>/smaps_rollup (Linux)")
+
+    workdir = tempfile.mkdtemp()
+    os.environ["STUDENTS_DB"] = os.path.join(workdir, "bench.db")
+    os.environ["LOG_LEVEL"] = "WARNING"
+    with contextlib.redirect_stdout(io.StringIO()):
+        from benchmarks import datagen
+        import roster_snapshot
+
+    start = time.perf_counter()
+    datagen.populate(args.students, args.subjects)
+    print(f"Loaded {args.students} students x {args.subjects} subjects "
+          f"in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    roster_snapshot.build_snapshot()
+    print(f"Built the snapshot in {time.perf_counter() - start:.2f}s: "
+          f"{os.path.getsize(roster_snapshot.SNAPSHOT_PATH) / 2**20:.1f} MiB")
+
+    baseline, _, _ = run_workers("baseline", args.workers, os.environ)
+    print(f"{args.workers} workers each; memory above an idle worker "
+          f"({baseline['Rss'] / 1024:.1f} MiB RSS)")
+    print(f"  {'':<10} {'RSS MiB':>9} {'PSS MiB':>9} {'load ms':>9} {'score ms':>9}")
+    for mode in ("rows", "snapshot"):
+        memory, load, score = run_workers(mode, args.workers, os.environ)
+        print(f"  {mode:<10} {(memory['Rss'] - baseline['Rss']) / 1024:9.1f} "
+              f"{(memory['Pss'] - baseline['Pss']) / 1024:9.1f} "
+              f"{load * 1000:9.1f} {score * 1000:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: import cost and time to first request
+================================================
+
+Reports the median over --repeat fresh interpreters of:
+
+- import main: cumulative time from `python -X importtime`, plus the
+  heaviest modules it pulls in
+- import main vs. create_app(): importing the module, then building the
+  app (routers, middleware, the numpy-backed prediction routes)
+- time to first request: from starting `serve.py --workers 1` until
+  GET /readyz answers 200 (models loaded, schema checked)
+    - new worker: the database already exists and is current
+    - cold start: a new, empty database every time, as a serverless
+      instance would see it (schema, demo data and demo logins created)
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from benchmarks.bench_workers import free_port  # noqa: E402
+
+SPLIT_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.app
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def import_times(env):
+    """{module: cumulative microseconds} for the direct imports of `import main`"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+    modules = {}
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        # A module is listed after everything it imported
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == "main":
+                modules = dict(children, main=int(cumulative))
+            children = {}
+    return modules
+
+
+def time_to_first_request(env, timeout=120):
+    """Seconds from starting serve.py until /readyz answers 200"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/readyz"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1", "--port", str(port)],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, OSError):
+                pass  # not listening yet, or 503 while starting
+            if server.poll() is not None:
+                raise RuntimeError("serve.py exited during startup")
+            time.sleep(0.005)
+        raise RuntimeError(f"{url} not ready after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="heaviest imports to list")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ, STUDENTS_DB=os.path.join(workdir, "bench.db"), LOG_LEVEL="WARNING")
+
+    runs = [import_times(env) for _ in range(args.repeat)]
+    total = statistics.median(run["main"] for run in runs)
+    print(f"import main (python -X importtime, median of {args.repeat})")
+    print(f"  {'main':<28} {total / 1000:8.1f} ms")
+    heaviest = sorted((name for name in runs[-1] if name != "main"),
+                      key=lambda name: -statistics.median(run.get(name, 0) for run in runs))
+    for name in heaviest[:args.top]:
+        print(f"    {name:<26} {statistics.median(run.get(name, 0) for run in runs) / 1000:8.1f} ms")
+
+    splits = []
+    for _ in range(args.repeat):
+        result = subprocess.run([sys.executable, "-c", SPLIT_SCRIPT], cwd=BACKEND, env=env,
+                                capture_output=True, text=True, check=True)
+        splits.append([float(value) for value in result.stdout.split()[-2:]])
+    print(f"  import main (wall clock)     {statistics.median(s[0] for s in splits) * 1000:8.1f} ms")
+    print(f"  create_app()                 {statistics.median(s[1] for s in splits) * 1000:8.1f} ms")
+
+    print("time to first request (serve.py --workers 1 until /readyz is 200)")
+    time_to_first_request(env)  # create the database once
+    warm = [time_to_first_request(env) for _ in range(args.repeat)]
+    cold = [time_to_first_request(dict(env, STUDENTS_DB=os.path.join(workdir, f"cold{i}.db")))
+            for i in range(args.repeat)]
+    for label, times in (("new worker", warm), ("cold start", cold)):
+        print(f"  {label:<28} {statistics.median(times) * 1000:8.1f} ms  "
+              f"(max {max(times) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: cached student lookups
+=================================
+
+Repeatedly looks up a hot set of USNs (as the portal does), with the
+student cache enabled and disabled (max_entries = 0), and reports
+lookups per second for:
+- async_operations.get_student_by_usn (what the endpoints await)
+- GET /students/{usn} through the FastAPI test client
+
+Run from the backend directory:
+    python benchmarks/bench_student_cache.py --students 10000 --hot 500
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--hot", type=int, default=500, help="distinct USNs looked up")
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fastapi.testclient import TestClient
+        import async_operations
+        import main as server
+        import student_cache
+        from bulk_students import import_students
+
+    import_students((i + 2, f"1BM{i:07d}", f"Student {i}", 18 + i % 8)
+                    for i in range(args.students))
+    rng = random.Random(0)
+    usns = [f"1BM{rng.randrange(args.hot):07d}" for _ in range(args.lookups)]
+    client = TestClient(server.app)
+
+    async def lookups():
+        for usn in usns:
+            await async_operations.get_student_by_usn(usn)
+
+    def run(label, func):
+        student_cache.local.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - start
+        print(f"  {label:<34} {args.lookups / seconds:12,.0f} lookups/s")
+
+    print(f"{args.lookups} lookups over {args.hot} of {args.students} students")
+    for enabled in (False, True):
+        student_cache.local.max_entries = student_cache.STUDENT_CACHE_ENTRIES if enabled else 0
+        state = "cached" if enabled else "uncached"
+        run(f"get_student_by_usn ({state})", lambda: asyncio.run(lookups()))
+        run(f"GET /students/{{usn}} ({state})",
+            lambda: [client.get(f"/students/{usn}") for usn in usns])
+    print(f"  stats: {student_cache.stats()['local']}")
+
+
+if __name__ == "__main__":
+    main()
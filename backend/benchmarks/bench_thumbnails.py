@@ -0,0 +1,79 @@
+"""
+Benchmark: avatar bytes served with and without thumbnails
+==========================================================
+
+Registers students with camera-sized JPEG pictures and compares the bytes
+(and time) needed to render an avatar grid from the original pictures and
+from ?size= thumbnails. Needs Pillow.
+
+Run from the backend directory:
+    python benchmarks/bench_thumbnails.py --students 50 --size 64
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def camera_jpeg(seed):
+    from PIL import Image
+    image = Image.effect_noise((1600, 1200), 20 + seed % 40).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=85)
+    return output.getvalue()
+
+
+def fetch_grid(client, usns, size=None):
+    query = f"?size={size}" if size else ""
+    start = time.perf_counter()
+    total = 0
+    for usn in usns:
+        response = client.get(f"/students/{usn}/picture{query}")
+        assert response.status_code == 200
+        total += len(response.content)
+    return total, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--size", type=int, default=64)
+    args = parser.parse_args()
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        from fastapi.testclient import TestClient
+        import main as server
+        import student_operations
+        import thumbnails
+
+    if not thumbnails.thumbnails_available():
+        sys.exit("Pillow is not installed")
+
+    usns = [f"1BM{i:07d}" for i in range(args.students)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, usn in enumerate(usns):
+            student_operations.add_student(usn, f"Student {i}", 20,
+                                           profile_picture=camera_jpeg(i))
+    thumbnails._workers.shutdown(wait=True)  # let background thumbnails finish
+
+    client = TestClient(server.app)
+    with contextlib.redirect_stdout(io.StringIO()):
+        original_bytes, original_time = fetch_grid(client, usns)
+        thumb_bytes, thumb_time = fetch_grid(client, usns, args.size)
+
+    print(f"Avatar grid of {args.students} students")
+    print(f"  original      {original_bytes / 1024:10.1f} KB  {original_time * 1000:8.1f} ms")
+    print(f"  ?size={args.size:<6} {thumb_bytes / 1024:10.1f} KB  {thumb_time * 1000:8.1f} ms")
+    print(f"  reduction     {original_bytes / thumb_bytes:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Benchmark: throughput of serve.py with 1 to 8 worker processes
+==============================================================
+
+Loads --students synthetic students, then for each worker count starts
+serve.py on a free port, waits for GET /readyz and drives it over real
+HTTP from --client-procs client processes (--concurrency requests in
+flight each) for --duration seconds:
+
+- reads: GET /students/{usn} and GET /student/performance/{usn} (with
+  an admin token)
+- writes (--write-ratio): POST /students, so the workers' writers
+  contend for SQLite's write lock
+
+Reports requests/s, p50/p99 latency and failed requests (a "database is
+locked" error would show up as a 5xx here). Scaling needs free cores:
+workers and clients share the machine.
+
+With more than one worker it first checks that reads are fresh across
+workers: a student is read through every worker (caching it), updated
+and then deleted through one, and must read back changed / 404 through
+each of the others straight away. The run fails otherwise.
+
+Run from the backend directory:
+    python benchmarks/bench_workers.py --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(base_url, timeout=60):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not become ready")
+
+
+async def client_loop(base_url, usns, args, seed):
+    import httpx
+
+    rng = random.Random(seed)
+    latencies = []
+    failures = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def one(client):
+        nonlocal failures
+        counter = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if rng.random() < args.write_ratio:
+                counter += 1
+                response = await client.post("/students", json={
+                    "usn": f"W{seed:04d}{counter:08d}", "name": "Worker Test", "age": 20})
+            elif rng.random() < 0.5:
+                response = await client.get(f"/students/{rng.choice(usns)}")
+            else:
+                response = await client.get(f"/student/performance/{rng.choice(usns)}",
+                                            headers=args.auth_headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 500:
+                failures += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(one(client) for _ in range(args.concurrency)))
+    return latencies, failures
+
+
+def run_client(base_url, usns, args, seed, results):
+    results.put(asyncio.run(client_loop(base_url, usns, args, seed)))
+
+
+def worker_clients(base_url, workers, attempts=200):
+    """One keep-alive client per worker process (keyed by pid)"""
+    import httpx
+
+    clients = {}
+    for _ in range(attempts):
+        client = httpx.Client(base_url=base_url, timeout=10)
+        pid = client.get("/healthz").json()["pid"]
+        if pid in clients:
+            client.close()
+        else:
+            clients[pid] = client
+        if len(clients) == workers:
+            break
+    return list(clients.values())
+
+
+def check_fresh_reads(base_url, workers, rounds=20):
+    """
+    Write through one worker, read through the others: raise
+    AssertionError on a stale read (e.g. from a per-process cache)
+    """
+    clients = worker_clients(base_url, workers)
+    if len(clients) < 2:
+        raise RuntimeError("could not reach two different workers")
+    try:
+        for i in range(rounds):
+            usn = f"FRESH{i:05d}"
+            writer = clients[i % len(clients)]
+            readers = [client for client in clients if client is not writer]
+            writer.post("/students", json={"usn": usn, "name": "Before", "age": 20})
+            for client in clients:
+                assert client.get(f"/students/{usn}").status_code == 200
+            writer.put(f"/students/{usn}", json={"name": "After"})
+            for client in readers:
+                name = client.get(f"/students/{usn}").json()["student"]["name"]
+                assert name == "After", f"stale read of {usn} after an update: {name!r}"
+            writer.delete(f"/students/{usn}")
+            for client in readers:
+                status = client.get(f"/students/{usn}").status_code
+                assert status == 404, f"deleted {usn} still read back ({status})"
+    finally:
+        for client in clients:
+            client.close()
+    return len(clients)
+
+
+def measure(workers, usns, args, env):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port)],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(base_url)
+        if workers > 1:
+            reached = check_fresh_reads(base_url, workers)
+            print(f"  {workers} worker(s): reads fresh across {reached} workers")
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=run_client,
+                                           args=(base_url, usns, args, workers * 100 + i, results))
+                   for i in range(args.client_procs)]
+        for client in clients:
+            client.start()
+        latencies, failures = [], 0
+        for _ in clients:
+            client_latencies, client_failures = results.get()
+            latencies += client_latencies
+            failures += client_failures
+        for client in clients:
+            client.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    latencies.sort()
+    return {
+        "requests_per_second": len(latencies) / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight per client")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    env = dict(os.environ, STUDENTS_DB=os.path.join(tempfile.mkdtemp(), "bench.db"),
+               LOG_LEVEL="WARNING")
+    os.environ.update(env)
+    from benchmarks.datagen import populate
+    usns = populate(args.students)
+    import auth
+    # Signed with the key in the database, which the workers share
+    args.auth_headers = {"Authorization": "Bearer " + auth.issue_token(
+        "admin", "bench@example.com", ttl=86400)}
+
+    print(f"{args.students} students, {args.client_procs}x{args.concurrency} clients, "
+          f"{args.write_ratio:.0%} writes, {args.duration}s per run, {os.cpu_count()} CPUs")
+    baseline = None
+    for workers in args.workers:
+        result = measure(workers, usns, args, env)
+        baseline = baseline or result["requests_per_second"]
+        print(f"  {workers} worker(s): {result['requests_per_second']:9,.0f} req/s "
+              f"({result['requests_per_second'] / baseline:4.1f}x)  "
+              f"p50={result['p50_ms']:7.2f} ms  p99={result['p99_ms']:8.2f} ms  "
+              f"failed={result['failures']}")
+
+
+if __name__ == "__main__":
+    main()
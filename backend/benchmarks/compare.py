@@ -0,0 +1,48 @@
+"""
+Compare two benchmark runs
+==========================
+
+Prints every result side by side and exits with status 1 if anything
+got worse by more than the threshold (so CI can fail on it).
+
+Run from the backend directory:
+    python -m benchmarks.compare before.json after.json --threshold 0.10
+"""
+
+import argparse
+import sys
+
+from benchmarks.results import compare, load, print_comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative change counted as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    for label, run in (("baseline", baseline), ("current", current)):
+        env = run["environment"]
+        print(f"{label:<9} {run['created']}  commit {env.get('commit')}  "
+              f"python {env.get('python')}  sqlite {env.get('sqlite')}")
+    if baseline["config"] != current["config"]:
+        print("warning: the runs used different settings", file=sys.stderr)
+
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: "
+              + ", ".join(regressions))
+        return 1
+    print(f"No regressions over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Synthetic Benchmark Data
+========================
+
+Deterministic (seeded) students shaped like seed_data.STUDENT_DATA, so
+two runs with the same arguments load exactly the same rows:
+
+    students = generate_students(10000, subjects=5, seed=0)
+    populate(10000, subjects=5, picture_kb=32)
+
+Pictures are a small valid JPEG padded to the requested size (decoders
+stop at the end-of-image marker), so thumbnails still work.
+"""
+
+import io
+import random
+
+FIRST_NAMES = ("Aarav", "Diya", "Ishaan", "Kavya", "Rohan", "Ananya", "Vikram",
+               "Meera", "Arjun", "Sneha", "Rahul", "Priya", "Karthik", "Nisha")
+LAST_NAMES = ("Sharma", "Iyer", "Reddy", "Nair", "Gupta", "Rao", "Patel",
+              "Menon", "Hegde", "Kulkarni", "Joshi", "Das", "Shetty", "Bhat")
+BATCHES = ("1CR23AD", "1CR23CS", "1CR22AD", "1CR22CS", "1BM23IS")
+
+
+def usn_for(index):
+    """The USN of the index-th generated student"""
+    return f"{BATCHES[index % len(BATCHES)]}{index:06d}"
+
+
+def make_subjects(count):
+    """(code, name) pairs for count subjects"""
+    return [(f"CS{301 + i}", f"Subject {301 + i}") for i in range(count)]
+
+
+def generate_students(count, subjects=5, seed=0, start=0):
+    """
+    Yield count student dicts, each with subjects score entries
+
+    Accepted by subject_scores.bulk_load_scores as is.
+    """
+    rng = random.Random(seed)
+    subject_list = make_subjects(subjects)
+    for index in range(start, start + count):
+        yield {
+            "usn": usn_for(index),
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "age": rng.randint(18, 25),
+            "subjects": [{
+                "name": name,
+                "code": code,
+                "attendance": rng.randint(40, 100),
+                "internal": rng.randint(5, 25),
+                "assignment": rng.randint(5, 25),
+                "totalClasses": 40,
+            } for code, name in subject_list],
+        }
+
+
+def _base_jpeg(seed):
+    try:
+        from PIL import Image
+    except ImportError:
+        return b"\xff\xd8\xff\xe0" + bytes(16) + b"\xff\xd9"
+    image = Image.effect_noise((64, 64), 20 + seed % 40).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=75)
+    return output.getvalue()
+
+
+def make_picture(size, seed=0):
+    """A JPEG of exactly size bytes (at least the base image), unique per seed"""
+    data = _base_jpeg(seed)
+    padding = max(0, size - len(data))
+    return data + random.Random(seed).randbytes(padding)
+
+
+def populate(students, subjects=5, picture_kb=0, seed=0, batch_size=5000):
+    """
+    Load generated students and scores into the configured database
+
+    With picture_kb, every student also gets a distinct picture of that
+    size (stored through student_operations, like an upload).
+
+    Returns:
+        The list of USNs loaded
+    """
+    import student_operations
+    from subject_scores import bulk_load_scores
+
+    usns = []
+    batch = []
+    for student in generate_students(students, subjects, seed):
+        usns.append(student["usn"])
+        batch.append(student)
+        if len(batch) == batch_size:
+            bulk_load_scores(batch)
+            batch = []
+    if batch:
+        bulk_load_scores(batch)
+
+    if picture_kb:
+        for index, usn in enumerate(usns):
+            picture = make_picture(picture_kb * 1024, seed * 1_000_003 + index)
+            student_operations.set_student_picture(usn, io.BytesIO(picture), len(picture))
+    return usns
@@ -0,0 +1,126 @@
+"""
+Load test: read latency under mixed read/write load
+===================================================
+
+Drives the FastAPI app in-process with N concurrent clients. Most clients
+read GET /students/{usn}; a fraction register students with a large
+profile picture. Reports p50/p99 read latency with the old behaviour
+(sqlite3 called directly on the event loop) and with async_operations.
+
+Run from the backend directory:
+    python benchmarks/load_mixed.py --clients 100 --duration 10
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def blocking(func):
+    """Pre-async behaviour: run the sqlite3 call directly on the event loop"""
+    async def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+
+async def client_loop(client, usns, write_ratio, picture_b64, deadline, latencies, counter):
+    while time.perf_counter() < deadline:
+        if random.random() < write_ratio:
+            counter[0] += 1
+            await client.post("/students", json={
+                "usn": f"LOAD{os.getpid()}{counter[0]:09d}",
+                "name": "Load Test",
+                "age": 20,
+                "profile_picture_base64": picture_b64,
+            })
+        else:
+            start = time.perf_counter()
+            response = await client.get(f"/students/{random.choice(usns)}")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+
+async def run(app, args, usns, picture_b64):
+    import httpx
+
+    latencies = []
+    counter = [0]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(
+            client_loop(client, usns, args.write_ratio, picture_b64,
+                        deadline, latencies, counter)
+            for _ in range(args.clients)
+        ))
+    return latencies, counter[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--picture-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["STUDENTS_DB"] = os.path.join(tmp, "bench.db")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import database
+        import student_operations
+        import main as server
+
+    conn = database.get_connection()
+    conn.executemany(
+        "INSERT INTO students (usn, name, age) VALUES (?, ?, ?)",
+        ((f"1BM{i:07d}", f"Student {i}", 18 + i % 6) for i in range(args.students)),
+    )
+    conn.commit()
+    conn.close()
+
+    usns = [f"1BM{i:07d}" for i in range(args.students)]
+    picture_b64 = base64.b64encode(os.urandom(args.picture_kb * 1024)).decode()
+
+    async_versions = {name: getattr(server, name)
+                      for name in ("add_student", "get_student_by_usn")}
+    modes = {
+        "blocking": {name: blocking(getattr(student_operations, name))
+                     for name in async_versions},
+        "async": async_versions,
+    }
+
+    print(f"{args.clients} clients, {args.duration}s, "
+          f"{args.write_ratio:.0%} writes with {args.picture_kb} KB pictures")
+    for label, functions in modes.items():
+        for name, func in functions.items():
+            setattr(server, name, func)
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, writes = asyncio.run(run(server.app, args, usns, picture_b64))
+        print(f"  {label:<9} reads={len(latencies):>7} writes={writes:>5} "
+              f"p50={percentile(latencies, 50) * 1000:7.2f} ms "
+              f"p99={percentile(latencies, 99) * 1000:7.2f} ms "
+              f"mean={statistics.mean(latencies) * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark Results
+=================
+
+A run is saved as one JSON document:
+
+    {
+      "format": 1,
+      "created": "2026-10-17T09:30:00+00:00",
+      "environment": {"python": "3.11.7", "sqlite": "3.40.1", "commit": "13b0044", ...},
+      "config": {"students": 2000, "subjects": 5, ...},
+      "results": {
+        "crud.get_student_by_usn": {"value": 81234.5, "unit": "ops/s",
+                                    "higher_is_better": true},
+        "scenario.portal.p99": {"value": 12.3, "unit": "ms",
+                                "higher_is_better": false},
+        ...
+      }
+    }
+
+compare() lines two runs up by result name and flags anything that got
+worse by more than a relative threshold.
+"""
+
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+
+FORMAT_VERSION = 1
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    """Where a run happened, so results from different machines aren't mixed up"""
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": _git_commit(),
+    }
+
+
+def new_run(config):
+    """An empty results document for a run with the given settings"""
+    return {
+        "format": FORMAT_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": dict(config),
+        "results": {},
+    }
+
+
+def record(run, name, value, unit, higher_is_better=True):
+    run["results"][name] = {
+        "value": round(value, 4),
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+    }
+
+
+def save(run, path):
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+        f.write("\n")
+
+
+def load(path):
+    with open(path) as f:
+        run = json.load(f)
+    if run.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported results format {run.get('format')!r}")
+    return run
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Compare two runs result by result
+
+    Returns:
+        A list of dicts with name, unit, baseline, current, change (relative,
+        positive = better) and status: "regression" when worse by more than
+        threshold, "improvement" when better by more than threshold, else
+        "ok"; "new" / "missing" for results only in one run.
+    """
+    rows = []
+    old_results = baseline["results"]
+    new_results = current["results"]
+    for name in sorted(set(old_results) | set(new_results)):
+        old = old_results.get(name)
+        new = new_results.get(name)
+        entry = new or old
+        row = {"name": name, "unit": entry["unit"],
+               "baseline": old and old["value"], "current": new and new["value"],
+               "change": None}
+        if old is None:
+            row["status"] = "new"
+        elif new is None:
+            row["status"] = "missing"
+        elif not old["value"]:
+            row["status"] = "ok"
+        else:
+            change = (new["value"] - old["value"]) / old["value"]
+            if not entry["higher_is_better"]:
+                change = -change
+            row["change"] = change
+            if change < -threshold:
+                row["status"] = "regression"
+            elif change > threshold:
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def print_results(run, file=sys.stdout):
+    for name, result in run["results"].items():
+        print(f"  {name:<44} {result['value']:>14,.2f} {result['unit']}", file=file)
+
+
+def print_comparison(rows, file=sys.stdout):
+    for row in rows:
+        baseline = "-" if row["baseline"] is None else f"{row['baseline']:,.2f}"
+        current = "-" if row["current"] is None else f"{row['current']:,.2f}"
+        change = "" if row["change"] is None else f"{row['change']:+.1%}"
+        print(f"  {row['name']:<44} {baseline:>14} {current:>14} {row['unit']:<6} "
+              f"{change:>8}  {row['status']}", file=file)
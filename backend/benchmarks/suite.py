@@ -0,0 +1,304 @@
+"""
+Benchmark Suite
+===============
+
+Loads --students synthetic students (datagen.py) into a fresh database,
+then measures:
+
+- crud.*       every student_operations function, plus the performance
+               query and bulk import, called directly (no cache)
+- predict.*    POST /predict, POST /predict/batch and GET /predict/students
+               (every student, from the roster snapshot) through the app
+- scenario.*   concurrent in-process clients against the FastAPI app
+               (cache, middleware and thread pool included): requests/s,
+               p50 and p99 latency
+
+Micro-benchmarks report the median of --rounds timed rounds.
+
+Run from the backend directory:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --only crud.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks import datagen
+from benchmarks.results import new_run, print_results, record, save
+
+
+def ops_per_second(func, rounds, round_seconds):
+    """Median calls per second of func over rounds timed rounds (after a warm-up round)"""
+    rates = []
+    for _ in range(rounds + 1):
+        calls = 0
+        start = time.perf_counter()
+        deadline = start + round_seconds
+        while True:
+            func()
+            calls += 1
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+        rates.append(calls / (now - start))
+    return statistics.median(rates[1:])
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+# ============= MICRO-BENCHMARKS =============
+
+def crud_benchmarks(args, usns):
+    """name -> zero-argument callable, one per CRUD function"""
+    import student_operations as ops
+    from bulk_students import import_students
+    from subject_scores import get_student_performance_json
+
+    rng = random.Random(args.seed)
+    picture = datagen.make_picture(args.picture_kb * 1024, seed=-1)
+    sha256 = ops.get_student_picture_info(usns[0])[1] if args.picture_kb else None
+    new_usns = (f"BENCH{i:09d}" for i in range(10**9))
+    added = []
+    bulk_start = [args.students + 1_000_000]
+
+    def add():
+        usn = next(new_usns)
+        ops.add_student(usn, "Bench Student", 20)
+        added.append(usn)
+
+    def delete():
+        ops.delete_student(added.pop() if added else next(new_usns))
+
+    def update():
+        ops.update_student(rng.choice(usns), name=f"Renamed {rng.randrange(1000)}")
+
+    def set_picture():
+        ops.set_student_picture(rng.choice(usns), io.BytesIO(picture), len(picture))
+
+    def bulk_import():
+        start = bulk_start[0]
+        bulk_start[0] += args.bulk_rows
+        import_students((i, f"BULK{i:09d}", "Bulk Student", 20)
+                        for i in range(start, start + args.bulk_rows))
+
+    # Reads first, so they all see exactly the generated data
+    benchmarks = {
+        "get_student_by_usn": lambda: ops.get_student_by_usn(rng.choice(usns)),
+        "get_student_picture_info": lambda: ops.get_student_picture_info(rng.choice(usns)),
+        "get_students_page": lambda: ops.get_students_page(50),
+        "get_all_students": ops.get_all_students,
+        "search_students_by_name": lambda: ops.search_students_by_name(
+            rng.choice(datagen.LAST_NAMES), limit=20),
+        "search_students_by_name.fuzzy": lambda: ops.search_students_by_name("Kulkrni", limit=20),
+        "get_student_performance_json": lambda: get_student_performance_json(rng.choice(usns)),
+    }
+    if sha256:
+        benchmarks.update({
+            "get_student_profile_picture": lambda: ops.get_student_profile_picture(rng.choice(usns)),
+            "get_picture_bytes": lambda: ops.get_picture_bytes(sha256),
+            "get_picture_bytes.range": lambda: ops.get_picture_bytes(sha256, 0, 4096),
+            "set_student_picture": set_picture,
+        })
+    benchmarks.update({
+        "add_student": add,
+        "update_student": update,
+        "delete_student": delete,
+        "bulk_import": bulk_import,
+    })
+    return benchmarks
+
+
+def run_crud(args, run, usns):
+    for name, func in crud_benchmarks(args, usns).items():
+        if not selected(args, f"crud.{name}"):
+            continue
+        rate = ops_per_second(func, args.rounds, args.round_seconds)
+        if name == "bulk_import":
+            record(run, "crud.bulk_import", rate * args.bulk_rows, "rows/s")
+        else:
+            record(run, f"crud.{name}", rate, "ops/s")
+
+
+def run_predict(args, run):
+    import numpy as np
+    from fastapi.testclient import TestClient
+
+    import main as server
+
+    client = TestClient(server.app)
+    rng = np.random.default_rng(args.seed)
+    columns = {"attendance": rng.uniform(40, 100, args.predict_rows).round(1).tolist(),
+               "internal": rng.uniform(0, 25, args.predict_rows).round(1).tolist(),
+               "assignment": rng.uniform(0, 25, args.predict_rows).round(1).tolist()}
+    single = {"attendance": 82.5, "internal": 19, "assignment": 21}
+
+    if selected(args, "predict.single"):
+        record(run, "predict.single", ops_per_second(
+            lambda: client.post("/predict", json=single), args.rounds, args.round_seconds
+        ), "req/s")
+    if selected(args, "predict.batch"):
+        rate = ops_per_second(lambda: client.post("/predict/batch", json=columns),
+                              args.rounds, args.round_seconds)
+        record(run, "predict.batch", rate * args.predict_rows, "rows/s")
+    if selected(args, "predict.students"):
+        client.get("/predict/students")  # build the roster snapshot
+        rate = ops_per_second(lambda: client.get("/predict/students"),
+                              args.rounds, args.round_seconds)
+        record(run, "predict.students", rate * args.students, "rows/s")
+
+
+# ============= LOAD SCENARIOS =============
+
+def scenarios(args, usns):
+    """name -> (app, async function(client, rng) making one request)"""
+    import main as server
+
+    import auth
+
+    new_usns = (f"LOAD{i:09d}" for i in range(10**9))
+    # Performance documents need a token; an admin's may read any student
+    admin = {"Authorization": "Bearer " + auth.issue_token("admin", "bench@example.com", ttl=86400)}
+
+    async def portal(client, rng):
+        usn = rng.choice(usns)
+        if rng.random() < 0.5:
+            return await client.get(f"/student/performance/{usn}", headers=admin)
+        return await client.get(f"/students/{usn}")
+
+    async def roster(client, rng):
+        if rng.random() < 0.8:
+            return await client.get("/students", params={"limit": 50})
+        return await client.get("/analytics/batches")
+
+    async def search(client, rng):
+        name = rng.choice(datagen.FIRST_NAMES + datagen.LAST_NAMES)
+        return await client.get(f"/students/search/{name[:rng.randint(3, len(name))]}")
+
+    async def pictures(client, rng):
+        params = {"size": 64} if rng.random() < 0.8 else {}
+        return await client.get(f"/students/{rng.choice(usns)}/picture", params=params)
+
+    async def mixed(client, rng):
+        if rng.random() < args.write_ratio:
+            return await client.post("/students", json={
+                "usn": next(new_usns), "name": "Load Student", "age": 21})
+        return await client.get(f"/students/{rng.choice(usns)}")
+
+    result = {
+        "portal": (server.app, portal),
+        "roster": (server.app, roster),
+        "search": (server.app, search),
+        "mixed": (server.app, mixed),
+    }
+    if args.picture_kb:
+        result["pictures"] = (server.app, pictures)
+    return result
+
+
+async def drive(app, request, clients, duration, seed):
+    """Run clients concurrent request loops for duration seconds"""
+    import httpx
+
+    latencies = []
+    errors = 0
+
+    async def client_loop(client, rng, deadline):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await request(client, rng)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(client_loop(client, random.Random(seed + i), deadline)
+                               for i in range(clients)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def run_scenarios(args, run, usns):
+    for name, (app, request) in scenarios(args, usns).items():
+        prefix = f"scenario.{name}"
+        if not selected(args, prefix):
+            continue
+        latencies, errors, elapsed = asyncio.run(
+            drive(app, request, args.clients, args.duration, args.seed))
+        record(run, f"{prefix}.throughput", len(latencies) / elapsed, "req/s")
+        record(run, f"{prefix}.p50", percentile(latencies, 50) * 1000, "ms", higher_is_better=False)
+        record(run, f"{prefix}.p99", percentile(latencies, 99) * 1000, "ms", higher_is_better=False)
+        if errors:
+            print(f"warning: {errors} failed requests in {prefix}", file=sys.stderr)
+
+
+# ============= COMMAND LINE =============
+
+def selected(args, name):
+    return not args.only or any(name.startswith(prefix) for prefix in args.only)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--subjects", type=int, default=5)
+    parser.add_argument("--picture-kb", type=int, default=32, help="0 = no pictures")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--round-seconds", type=float, default=0.2)
+    parser.add_argument("--bulk-rows", type=int, default=1000)
+    parser.add_argument("--predict-rows", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per scenario")
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--only", action="append", metavar="PREFIX",
+                        help="run only results starting with PREFIX (repeatable)")
+    parser.add_argument("--quick", action="store_true",
+                        help="small data set and short rounds, for a smoke test")
+    parser.add_argument("--output", help="write the results JSON here")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.students = min(args.students, 500)
+        args.picture_kb = min(args.picture_kb, 8)
+        args.rounds, args.round_seconds, args.duration = 3, 0.05, 0.5
+
+    os.environ["STUDENTS_DB"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "quick")}
+    run = new_run(config)
+
+    start = time.perf_counter()
+    usns = datagen.populate(args.students, args.subjects, args.picture_kb, args.seed)
+    print(f"Loaded {len(usns)} students x {args.subjects} subjects "
+          f"({args.picture_kb} KB pictures) in {time.perf_counter() - start:.1f}s")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_crud(args, run, usns)
+        run_predict(args, run)
+        run_scenarios(args, run, usns)
+
+    print_results(run)
+    if args.output:
+        save(run, args.output)
+        print(f"Saved {len(run['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
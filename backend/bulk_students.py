@@ -0,0 +1,375 @@
+"""
+Bulk Student Import / Export
+============================
+
+Loads whole intakes from CSV or Parquet and writes the roster back out,
+without going through add_student one row (and one commit) at a time.
+
+- rows are read as a stream and inserted with executemany, one
+  transaction per BULK_BATCH_SIZE rows
+- bad rows (missing fields, non-integer ages, duplicate USNs) are
+  reported with their line number and skipped; the rest still load
+- upsert mode updates the name and age of existing USNs instead
+
+Files need the columns usn, name and age (others are ignored). Parquet
+needs pyarrow (pip install pyarrow).
+
+Command line (format picked from the file extension):
+    python bulk_students.py import students.csv [--upsert]
+    python bulk_students.py export students.parquet
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import time
+
+from connection_pool import connection
+from database import BULK_CHANGE_LOG, BULK_INSERT_CATCHUP, DEFERRABLE_TRIGGERS
+
+BULK_COLUMNS = ("usn", "name", "age")
+EXPORT_COLUMNS = ("usn", "name", "age", "created_at")
+
+# Rows per transaction, and per batch read from the file / database
+BULK_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", 10000))
+
+# Row errors listed in an import result (all of them are counted)
+MAX_REPORTED_ERRORS = 1000
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError("Parquet files need pyarrow (pip install pyarrow)") from None
+
+
+def detect_format(content_type=None, filename=None):
+    """'parquet' or 'csv' from an upload's content type or file name"""
+    if "parquet" in (content_type or "") or (filename or "").lower().endswith((".parquet", ".pq")):
+        return "parquet"
+    return "csv"
+
+
+# ============= READING =============
+
+def iter_csv_rows(fileobj):
+    """
+    Yield (line number, usn, name, age) from a binary CSV file with a header
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("Empty CSV file")
+        header = [name.strip().lower() for name in header]
+        missing = [name for name in BULK_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+
+        usn_i, name_i, age_i = (header.index(name) for name in BULK_COLUMNS)
+        width = max(usn_i, name_i, age_i) + 1
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row += [""] * (width - len(row))
+            yield reader.line_num, row[usn_i], row[name_i], row[age_i]
+    except csv.Error as e:
+        raise ValueError(f"Malformed CSV at line {reader.line_num}: {e}") from None
+    finally:
+        text.detach()
+
+
+def iter_parquet_rows(fileobj, batch_size=BULK_BATCH_SIZE):
+    """
+    Yield (row number, usn, name, age) from a seekable Parquet file
+
+    Row numbers start at 2 so they line up with the same data as CSV.
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(fileobj)
+    missing = [name for name in BULK_COLUMNS if name not in parquet.schema_arrow.names]
+    if missing:
+        raise ValueError(f"Parquet file is missing columns: {', '.join(missing)}")
+
+    line = 2
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=list(BULK_COLUMNS)):
+        columns = [batch.column(name).to_pylist() for name in BULK_COLUMNS]
+        for usn, name, age in zip(*columns):
+            yield line, usn, name, age
+            line += 1
+
+
+def iter_rows(fileobj, fmt="csv"):
+    """Rows of a CSV or Parquet file (see iter_csv_rows)"""
+    if fmt == "parquet":
+        return iter_parquet_rows(fileobj)
+    if fmt == "csv":
+        return iter_csv_rows(fileobj)
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+def clean_row(usn, name, age):
+    """
+    Validate one input row
+
+    Returns:
+        (usn, name, age) ready to insert
+
+    Raises:
+        ValueError: with a message for the import report
+    """
+    usn = str(usn).strip() if usn is not None else ""
+    name = str(name).strip() if name is not None else ""
+    if not usn:
+        raise ValueError("Missing usn")
+    if not name:
+        raise ValueError("Missing name")
+    if isinstance(age, str):
+        age = age.strip()
+    try:
+        age_value = int(age)
+        if isinstance(age, float) and age != age_value:
+            raise ValueError
+    except (TypeError, ValueError):
+        raise ValueError(f"Age must be an integer, got {age!r}") from None
+    return usn, name, age_value
+
+
+# ============= IMPORT =============
+
+INSERT_SQL = "INSERT INTO students (usn, name, age) VALUES (?, ?, ?)"
+
+UPSERT_SQL = """
+    INSERT INTO students (usn, name, age) VALUES (?, ?, ?)
+    ON CONFLICT(usn) DO UPDATE SET name = excluded.name, age = excluded.age
+    WHERE name IS NOT excluded.name OR age IS NOT excluded.age
+"""
+
+EXISTING_SQL = "SELECT usn FROM students WHERE usn IN (SELECT value FROM json_each(?))"
+
+
+def _report(result, line, usn, error):
+    result["error_count"] += 1
+    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+        result["errors"].append({"line": line, "usn": usn, "error": error})
+
+
+def _import_batch(conn, batch, upsert, result):
+    rows = {}
+    for line, usn, name, age in batch:
+        try:
+            row = clean_row(usn, name, age)
+        except ValueError as e:
+            _report(result, line, usn, str(e))
+            continue
+        if row[0] in rows and not upsert:
+            _report(result, line, row[0], "Duplicate USN in file")
+            continue
+        rows[row[0]] = (line, row)
+    if not rows:
+        return
+
+    # Take the write lock before looking for existing USNs, so nothing
+    # can insert one between the check and the executemany
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        existing = {usn for (usn,) in conn.execute(EXISTING_SQL, (json.dumps(list(rows)),))}
+        # Replace the per-row insert triggers with one statement per batch
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM students").fetchone()[0]
+        for name in DEFERRABLE_TRIGGERS:
+            conn.execute(f"DROP TRIGGER {name}")
+        if upsert:
+            conn.executemany(UPSERT_SQL, [row for _, row in rows.values()])
+            result["updated"] += len(existing)
+            result["inserted"] += len(rows) - len(existing)
+        else:
+            for usn in existing:
+                _report(result, rows.pop(usn)[0], usn, "USN already exists")
+            conn.executemany(INSERT_SQL, [row for _, row in rows.values()])
+            result["inserted"] += len(rows)
+        for statement in BULK_INSERT_CATCHUP:
+            conn.execute(statement, (last_id,))
+        conn.execute(BULK_CHANGE_LOG)
+        for trigger in DEFERRABLE_TRIGGERS.values():
+            conn.execute(trigger)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def iter_batches(rows, batch_size=BULK_BATCH_SIZE):
+    """Lists of up to batch_size rows from an iterable of rows"""
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def new_import_result():
+    """An empty import result, for import_batch to add to"""
+    return {"rows": 0, "inserted": 0, "updated": 0, "error_count": 0, "errors": [],
+            "started": time.perf_counter()}
+
+
+def import_batch(batch, upsert, result):
+    """Insert (or upsert) one batch of rows in its own transaction, counted in result"""
+    with connection() as conn:
+        _import_batch(conn, batch, upsert, result)
+    result["rows"] += len(batch)
+
+
+def finish_import_result(result):
+    """Replace the start time in result with the duration and rate"""
+    seconds = time.perf_counter() - result.pop("started")
+    result["seconds"] = round(seconds, 3)
+    result["rows_per_second"] = round(result["rows"] / seconds) if seconds else None
+    return result
+
+
+def import_students(rows, upsert=False, batch_size=BULK_BATCH_SIZE):
+    """
+    Insert (or upsert) students in batched transactions
+
+    Args:
+        rows: Iterable of (line number, usn, name, age), e.g. from iter_rows
+        upsert: Update the name/age of existing USNs instead of reporting them
+        batch_size: Rows per transaction
+
+    Returns:
+        {"rows", "inserted", "updated", "error_count", "errors": [...],
+         "seconds", "rows_per_second"} - errors lists at most
+        MAX_REPORTED_ERRORS {"line", "usn", "error"} entries
+    """
+    result = new_import_result()
+    for batch in iter_batches(rows, batch_size):
+        import_batch(batch, upsert, result)
+    return finish_import_result(result)
+
+
+def import_students_file(fileobj, fmt="csv", upsert=False, batch_size=BULK_BATCH_SIZE):
+    """Import a binary CSV or Parquet file object (see import_students)"""
+    return import_students(iter_rows(fileobj, fmt), upsert=upsert, batch_size=batch_size)
+
+
+# ============= EXPORT =============
+
+def _iter_export_batches(batch_size):
+    with connection() as conn:
+        cursor = conn.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM students ORDER BY id")
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+
+def export_csv(batch_size=BULK_BATCH_SIZE):
+    """Yield the roster as CSV text, one chunk per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in _iter_export_batches(batch_size):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # header of an empty roster
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back out via drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_parquet(batch_size=BULK_BATCH_SIZE):
+    """Yield the roster as a Parquet file, one row group per batch of rows"""
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("usn", pa.string()),
+        ("name", pa.string()),
+        ("age", pa.int64()),
+        ("created_at", pa.string()),
+    ])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in _iter_export_batches(batch_size):
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def export_students(fmt="csv", batch_size=BULK_BATCH_SIZE):
+    """Chunks of the roster in the given format ('csv' yields str, 'parquet' bytes)"""
+    if fmt == "parquet":
+        _require_pyarrow()  # fail before the response starts
+        return export_parquet(batch_size)
+    if fmt == "csv":
+        return export_csv(batch_size)
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import/export students")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("path")
+    parser.add_argument("--upsert", action="store_true",
+                        help="update existing USNs instead of reporting them")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    args = parser.parse_args()
+    fmt = detect_format(filename=args.path)
+
+    if args.command == "import":
+        with open(args.path, "rb") as f:
+            result = import_students_file(f, fmt, upsert=args.upsert, batch_size=args.batch_size)
+        print(f"✅ Imported {result['rows']} rows in {result['seconds']}s "
+              f"({result['rows_per_second']} rows/s): "
+              f"{result['inserted']} inserted, {result['updated']} updated, "
+              f"{result['error_count']} errors")
+        for error in result["errors"][:20]:
+            print(f"❌ Line {error['line']} ({error['usn']}): {error['error']}")
+    else:
+        mode = "wb" if fmt == "parquet" else "w"
+        with open(args.path, mode, **({} if fmt == "parquet" else {"newline": ""})) as f:
+            for chunk in export_students(fmt, args.batch_size):
+                f.write(chunk)
+        print(f"✅ Exported students to {args.path}")
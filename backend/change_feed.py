@@ -0,0 +1,242 @@
+"""
+Student Change Feed
+===================
+
+Streams student inserts, updates and deletes to admin dashboards as
+Server-Sent Events (GET /students/changes), so they don't have to poll
+the whole listing to notice a registration.
+
+The changes come from the change_log table, which triggers fill in the
+same transaction as each write (see CHANGE LOG in database.py), so
+every write from any worker process is seen, in commit order. Every
+event carries its change_log seq as the SSE id:
+
+    id: 1042
+    event: insert
+    data: {"seq": 1042, "op": "insert", "id": 7, "usn": "1CR23AD106", ...}
+
+A client resumes after the last id it saw (EventSource sends it back as
+Last-Event-ID when it reconnects, or pass ?after=<seq>) and only gets the
+changes since. A new stream starts with a "sync" event carrying the
+current seq. A "reload" event (a bulk import, or the client was further
+behind than the log keeps) means: fetch the listing again.
+
+Each process has one Broadcaster. It reads new change_log rows with one
+query per poll (woken straight away by this process's own writes),
+encodes each event once and hands it to every connected stream, so the
+database work doesn't grow with the number of dashboards. Recent events
+are kept in memory for clients that reconnect.
+
+Settings:
+    CHANGE_FEED_POLL_SECONDS        how often other processes' writes are
+                                    picked up (default 0.5)
+    CHANGE_FEED_BUFFER              recent events kept for resuming (default 1000)
+    CHANGE_FEED_MAX_PENDING         events a slow client may fall behind
+                                    before it is disconnected (default 1000)
+    CHANGE_FEED_KEEPALIVE_SECONDS   comment sent on an idle stream (default 15)
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque, namedtuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from connection_pool import connection
+from json_responses import dumps
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_POLL_SECONDS = float(os.environ.get("CHANGE_FEED_POLL_SECONDS", 0.5))
+CHANGE_FEED_BUFFER = int(os.environ.get("CHANGE_FEED_BUFFER", 1000))
+CHANGE_FEED_MAX_PENDING = int(os.environ.get("CHANGE_FEED_MAX_PENDING", 1000))
+CHANGE_FEED_KEEPALIVE_SECONDS = float(os.environ.get("CHANGE_FEED_KEEPALIVE_SECONDS", 15))
+
+# change_log rows read per query
+READ_BATCH = 1000
+
+Change = namedtuple("Change", "seq op id usn name age changed_at")
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+# ============= CHANGE LOG =============
+
+def get_changes(after, limit=READ_BATCH):
+    """Changes with seq > after, oldest first"""
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = lambda _, row: Change(*row)
+        return cursor.execute("""
+            SELECT seq, op, student_id, usn, name, age, changed_at
+            FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?
+        """, (after, limit)).fetchall()
+
+
+def get_log_bounds():
+    """(oldest seq still in the log or None, newest seq ever written or 0)"""
+    with connection() as conn:
+        oldest = conn.execute("SELECT min(seq) FROM change_log").fetchone()[0]
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return oldest, row[0] if row else 0
+
+
+def encode_event(event, seq, data):
+    """One SSE message"""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (seq, event.encode(), dumps(data))
+
+
+def encode_change(change):
+    return encode_event(change.op, change.seq, change._asdict())
+
+
+# ============= BROADCASTER =============
+
+class Broadcaster:
+    """Polls the change log once per process and fans events out to streams"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._recent = deque(maxlen=CHANGE_FEED_BUFFER)  # (seq, encoded event)
+        self._wake = None
+        self._task = None
+        self._started = None
+        self.last_seq = None
+        self.polls = 0
+        self.closed = False
+
+    def notify(self):
+        """A write committed in this process: poll now (event loop thread only)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    def close(self):
+        """End every stream (clients reconnect and resume elsewhere)"""
+        for queue in list(self._subscribers):
+            self._drop(queue)
+
+    def shutdown(self):
+        """
+        The server is shutting down: end every stream, and any stream
+        opened from now on, so uvicorn doesn't wait out its graceful
+        shutdown timeout for them
+        """
+        self.closed = True
+        self.close()
+        # Let the poller see it has no subscribers left
+        self.notify()
+
+    def _drop(self, queue):
+        self._subscribers.discard(queue)
+        queue.put_nowait(None)
+
+    def _start(self):
+        """
+        Start the poller unless it is running; returns a future that is
+        done once last_seq is known
+        
+        Synchronous, so streams connecting together share one poller.
+        """
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._started = asyncio.get_running_loop().create_future()
+            self._task = asyncio.create_task(self._run())
+        return self._started
+
+    async def _run(self):
+        try:
+            _, self.last_seq = await run_in_threadpool(get_log_bounds)
+            # Changes made while no poller ran aren't in the buffer
+            self._recent.clear()
+            self._started.set_result(None)
+            while self._subscribers:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), CHANGE_FEED_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                changes = await run_in_threadpool(get_changes, self.last_seq)
+                self.polls += 1
+                while changes:
+                    self._publish(changes)
+                    if len(changes) < READ_BATCH:
+                        break
+                    changes = await run_in_threadpool(get_changes, self.last_seq)
+        except Exception as e:
+            logger.exception("Change feed stopped")
+            if not self._started.done():
+                self._started.set_exception(e)
+            self.close()
+        finally:
+            # Restarted by the next subscriber
+            self._task = None
+            self._wake = None
+
+    def _publish(self, changes):
+        for change in changes:
+            event = (change.seq, encode_change(change))
+            self._recent.append(event)
+            for queue in list(self._subscribers):
+                if queue.qsize() >= CHANGE_FEED_MAX_PENDING:
+                    # Too slow: disconnect it; it resumes from its last id
+                    self._drop(queue)
+                else:
+                    queue.put_nowait(event)
+            self.last_seq = change.seq
+
+    async def _backlog(self, after):
+        """Encoded events after seq `after`, from memory when it has them"""
+        if after >= self.last_seq:
+            return []
+        if self._recent and self._recent[0][0] <= after + 1:
+            return [event for event in self._recent if event[0] > after]
+        oldest, _ = await run_in_threadpool(get_log_bounds)
+        if oldest is None or oldest > after + 1:
+            # Pruned (or never written): the client has to start over
+            return [(self.last_seq, encode_event("reload", self.last_seq, {"seq": self.last_seq}))]
+        events = []
+        while after < self.last_seq:
+            changes = await run_in_threadpool(get_changes, after)
+            if not changes:
+                break
+            events.extend((change.seq, encode_change(change)) for change in changes)
+            after = changes[-1].seq
+        return events
+
+    async def stream(self, after=None):
+        """
+        Async iterator of SSE messages (bytes): the changes after seq
+        `after` (None: from now on), then live ones until the client
+        disconnects, falls too far behind or the server shuts down
+        """
+        if self.closed:
+            return
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            await self._start()
+            if after is None or after > self.last_seq:
+                after = self.last_seq
+                yield encode_event("sync", after, {"seq": after})
+            for seq, event in await self._backlog(after):
+                after = seq
+                yield event
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), CHANGE_FEED_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                if item is None:
+                    return
+                seq, event = item
+                # Already sent from the backlog
+                if seq > after:
+                    after = seq
+                    yield event
+        finally:
+            self._subscribers.discard(queue)
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,165 @@
+"""
+Response Compression
+====================
+
+ASGI middleware compressing text-like responses (JSON, NDJSON, CSV,
+text, SVG) for clients that accept it:
+
+- brotli when the brotli package is installed (pip install brotli),
+  gzip otherwise
+- bodies under COMPRESSION_MIN_BYTES are sent as they are
+- streamed responses are compressed chunk by chunk, and each chunk is
+  flushed (a gzip sync flush, or a brotli flush) so it reaches the client
+  when it is sent rather than when the compressor's buffer fills
+- responses that already have a Content-Encoding, images, partial
+  content (206) and event streams (each event must reach the client as
+  it is sent) are left alone
+
+Compressed responses keep their validators: a strong ETag becomes weak
+(same content, different bytes), so If-None-Match keeps matching.
+
+Settings:
+    COMPRESSION_MIN_BYTES   smallest body worth compressing (default 1024)
+    COMPRESSION_LEVEL       gzip level 1-9 (default 6); brotli uses quality 4
+"""
+
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", 1024))
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", 6))
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson",
+                      "application/javascript", "image/svg+xml")
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def accepted_encoding(accept_encoding):
+    """The best encoding we support from an Accept-Encoding header, or None"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def _compressor(coding, level):
+    """
+    (compress(chunk), sync(), finish()) functions for an encoding: sync()
+    returns everything compressed so far without ending the stream
+    """
+    if coding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    return (compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush)
+
+
+class CompressionMiddleware:
+    """Compress compressible responses over minimum_size bytes"""
+
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_BYTES, level=COMPRESSION_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        coding = accepted_encoding(accept) if accept else None
+
+        start_message = None
+        compress = sync = finish = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, compress, sync, finish
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                return await send(message)
+
+            if compress is None:
+                # First body chunk: decide and send the headers
+                headers = list(start_message.get("headers", []))
+                start_message = {**start_message, "headers": headers}
+                body = message.get("body", b"")
+                more = message.get("more_body", False)
+                if not _compressible(start_message):
+                    await send(start_message)
+                    start_message = None
+                    return await send(message)
+                _add_vary(headers)
+                if coding is None or (not more and len(body) < self.minimum_size):
+                    await send(start_message)
+                    start_message = None
+                    return await send(message)
+
+                compress, sync, finish = _compressor(coding, self.level)
+                _encode_headers(headers, coding)
+                await send(start_message)
+
+            body = compress(message.get("body", b""))
+            more = message.get("more_body", False)
+            body += sync() if more else finish()
+            if body or not more:
+                await send({"type": "http.response.body", "body": body, "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _header(headers, name):
+    for key, value in headers:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _compressible(start_message):
+    headers = start_message.get("headers", [])
+    if start_message["status"] in (204, 206, 304) or _header(headers, b"content-encoding"):
+        return False
+    content_type = (_header(headers, b"content-type") or "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(UNCOMPRESSED_TYPES)
+
+
+def _add_vary(headers):
+    for index, (key, value) in enumerate(headers):
+        if key == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[index] = (key, value + b", Accept-Encoding")
+            return
+    headers.append((b"vary", b"Accept-Encoding"))
+
+
+def _encode_headers(headers, coding):
+    """Adjust response headers for a compressed body"""
+    for index in reversed(range(len(headers))):
+        key, value = headers[index]
+        if key == b"content-length":
+            del headers[index]
+        elif key == b"etag" and not value.startswith(b"W/"):
+            headers[index] = (key, b"W/" + value)
+    headers.append((b"content-encoding", coding.encode()))
@@ -0,0 +1,139 @@
+"""
+SQLite Connection Pool
+======================
+
+Reuses SQLite connections across requests instead of opening and closing
+the database file on every call. Each connection gets the PRAGMAs from
+database.PRAGMAS applied exactly once, when it is created.
+
+Usage:
+    from connection_pool import connection
+
+    with connection() as conn:
+        conn.execute("SELECT ...")
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import database
+from metrics import POOL_WAIT_SECONDS
+
+# Maximum number of connections held by the default pool
+POOL_SIZE = int(os.environ.get("STUDENTS_DB_POOL_SIZE", 8))
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available in time"""
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of SQLite connections
+
+    Connections are created lazily up to max_size and handed to one thread
+    at a time. Idle connections are kept in LIFO order so the most recently
+    used (and therefore warmest) connection is reused first.
+    """
+
+    def __init__(self, max_size=POOL_SIZE, timeout=30.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._pid = os.getpid()
+
+    def _new_connection(self):
+        conn = database.get_connection(check_same_thread=False)
+        return database.configure_connection(conn)
+
+    def _reset_after_fork(self):
+        # Connections must never be shared between processes
+        with self._lock:
+            if self._pid != os.getpid():
+                self._idle = queue.LifoQueue()
+                self._created = 0
+                self._pid = os.getpid()
+
+    def acquire(self):
+        """Take a connection out of the pool, creating one if allowed"""
+        start = time.perf_counter()
+        try:
+            return self._acquire()
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+    def _acquire(self):
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.max_size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._new_connection()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(
+                f"No database connection available after {self.timeout}s"
+            ) from None
+
+    def release(self, conn):
+        """Return a connection to the pool"""
+        if conn.in_transaction:
+            # Never hand an open transaction to the next borrower
+            conn.rollback()
+        self._idle.put(conn)
+
+    def discard(self, conn):
+        """Close a broken connection instead of returning it to the pool"""
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._created -= 1
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Close every idle connection (connections in use are left alone)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(conn)
+
+
+# Default process-wide pool
+pool = ConnectionPool()
+
+
+def connection():
+    """Borrow a connection from the default pool"""
+    return pool.connection()
@@ -1,14 +1,401 @@
+import logging
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
-# Database file path
-DB_FILE = Path(__file__).parent / "students.db"
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from picture_store import detect_content_type, store_picture
+
+logger = logging.getLogger(__name__)
+
+# Database file path (override with STUDENTS_DB, e.g. for benchmarks)
+DB_FILE = Path(os.environ.get("STUDENTS_DB", Path(__file__).parent / "students.db"))
+
+# How long a connection waits for another connection's (or process's)
+# write lock before failing with "database is locked"
+BUSY_TIMEOUT_MS = int(os.environ.get("STUDENTS_DB_BUSY_TIMEOUT_MS", 30000))
+
+# Per-connection PRAGMAs, applied once when a connection is opened
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,   # 256 MB memory-mapped I/O
+    "cache_size": -64 * 1024,         # negative = KiB, so 64 MB page cache
+    "busy_timeout": BUSY_TIMEOUT_MS,  # ms to wait on a locked database
+}
+
+# Stored in PRAGMA user_version once init_database() has run. Bump it
+# whenever init_database() gains a table, trigger or migration, so
+# existing databases run it again.
+SCHEMA_VERSION = 3
+
+
+# Kept in constants so bulk imports can recreate them (see DEFERRABLE_TRIGGERS)
+FTS_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+        INSERT INTO students_fts(rowid, name) VALUES (new.id, new.name);
+    END
+"""
+
+
+# ============= ANALYTICS SCHEMA =============
+# Aggregates for the /analytics endpoints, kept current by triggers so
+# reading them never scans students or scores (see analytics.py).
+#
+# Scores use the baseline formula and risk thresholds from prediction.py.
+
+def _score(row):
+    return f"({row}.attendance * 0.4 + {row}.internal * 2 + {row}.assignment * 2)"
+
+
+def _risk_counts(score):
+    """low, medium, high increments (0 or 1) for a score expression"""
+    return (f"({score} >= 75)", f"({score} >= 50 AND {score} < 75)", f"({score} < 50)")
+
+
+def _subject_add(row):
+    score = _score(row)
+    low, medium, high = _risk_counts(score)
+    return f"""
+        INSERT INTO analytics_subjects (subject_code, entries, sum_attendance, sum_internal,
+                                        sum_assignment, sum_score, low, medium, high)
+        VALUES ({row}.subject_code, 1, {row}.attendance, {row}.internal,
+                {row}.assignment, {score}, {low}, {medium}, {high})
+        ON CONFLICT(subject_code) DO UPDATE SET
+            entries = entries + 1,
+            sum_attendance = sum_attendance + excluded.sum_attendance,
+            sum_internal = sum_internal + excluded.sum_internal,
+            sum_assignment = sum_assignment + excluded.sum_assignment,
+            sum_score = sum_score + excluded.sum_score,
+            low = low + excluded.low,
+            medium = medium + excluded.medium,
+            high = high + excluded.high;
+    """
+
+
+def _subject_remove(row):
+    score = _score(row)
+    low, medium, high = _risk_counts(score)
+    return f"""
+        UPDATE analytics_subjects SET
+            entries = entries - 1,
+            sum_attendance = sum_attendance - {row}.attendance,
+            sum_internal = sum_internal - {row}.internal,
+            sum_assignment = sum_assignment - {row}.assignment,
+            sum_score = sum_score - {score},
+            low = low - {low},
+            medium = medium - {medium},
+            high = high - {high}
+        WHERE subject_code = {row}.subject_code;
+        DELETE FROM analytics_subjects WHERE subject_code = {row}.subject_code AND entries = 0;
+    """
+
+
+def _student_refresh(usn):
+    """Recompute one student's average score and risk from their subjects"""
+    return f"""
+        UPDATE analytics_students SET (subjects, avg_score, risk) = (
+            SELECT n, average,
+                CASE WHEN average >= 75 THEN 'Low'
+                     WHEN average >= 50 THEN 'Medium'
+                     WHEN average IS NOT NULL THEN 'High' END
+            FROM (
+                SELECT count(*) AS n, avg({_score("sc")}) AS average
+                FROM student_subject_scores sc WHERE sc.usn = {usn}
+            )
+        ) WHERE usn = {usn};
+    """
+
+
+# (dimension, key expression) of the cohort groups every student counts in
+GROUP_DIMENSIONS = (("all", "''"), ("age", "{row}.age"), ("batch", "{row}.batch"))
+
+
+def _group_add(row):
+    return "".join(f"""
+        INSERT INTO analytics_groups (dimension, key, students, scored, sum_score, low, medium, high)
+        VALUES ('{dimension}', {key.format(row=row)}, 1, {row}.avg_score IS NOT NULL,
+                coalesce({row}.avg_score, 0), {row}.risk IS 'Low', {row}.risk IS 'Medium',
+                {row}.risk IS 'High')
+        ON CONFLICT(dimension, key) DO UPDATE SET
+            students = students + 1,
+            scored = scored + excluded.scored,
+            sum_score = sum_score + excluded.sum_score,
+            low = low + excluded.low,
+            medium = medium + excluded.medium,
+            high = high + excluded.high;
+    """ for dimension, key in GROUP_DIMENSIONS)
+
+
+def _group_remove(row):
+    return "".join(f"""
+        UPDATE analytics_groups SET
+            students = students - 1,
+            scored = scored - ({row}.avg_score IS NOT NULL),
+            sum_score = sum_score - coalesce({row}.avg_score, 0),
+            low = low - ({row}.risk IS 'Low'),
+            medium = medium - ({row}.risk IS 'Medium'),
+            high = high - ({row}.risk IS 'High')
+        WHERE dimension = '{dimension}' AND key = {key.format(row=row)};
+        DELETE FROM analytics_groups
+        WHERE dimension = '{dimension}' AND key = {key.format(row=row)} AND students = 0;
+    """ for dimension, key in GROUP_DIMENSIONS)
+
+
+ANALYTICS_STUDENT_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS analytics_student_insert AFTER INSERT ON students BEGIN
+        INSERT INTO analytics_students (usn, age, batch)
+        VALUES (new.usn, new.age, rtrim(new.usn, '0123456789'));
+    END
+"""
+
+ANALYTICS_GROUPS_INSERT_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS analytics_groups_insert
+    AFTER INSERT ON analytics_students BEGIN
+        {_group_add("new")}
+    END
+"""
+
+ANALYTICS_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS analytics_subjects (
+        subject_code TEXT PRIMARY KEY,
+        entries INTEGER NOT NULL,
+        sum_attendance REAL NOT NULL,
+        sum_internal REAL NOT NULL,
+        sum_assignment REAL NOT NULL,
+        sum_score REAL NOT NULL,
+        low INTEGER NOT NULL,
+        medium INTEGER NOT NULL,
+        high INTEGER NOT NULL
+    );
+    -- One row per student: the USN batch (e.g. 1CR23AD for 1CR23AD106),
+    -- average score over their subjects and the resulting risk level
+    CREATE TABLE IF NOT EXISTS analytics_students (
+        usn TEXT PRIMARY KEY,
+        age INTEGER NOT NULL,
+        batch TEXT NOT NULL,
+        subjects INTEGER NOT NULL DEFAULT 0,
+        avg_score REAL,
+        risk TEXT
+    ) WITHOUT ROWID;
+    -- Totals per cohort: dimension 'all' (key ''), 'age' or 'batch'
+    CREATE TABLE IF NOT EXISTS analytics_groups (
+        dimension TEXT NOT NULL,
+        key NOT NULL,
+        students INTEGER NOT NULL,
+        scored INTEGER NOT NULL,
+        sum_score REAL NOT NULL,
+        low INTEGER NOT NULL,
+        medium INTEGER NOT NULL,
+        high INTEGER NOT NULL,
+        PRIMARY KEY (dimension, key)
+    ) WITHOUT ROWID;
+
+    {ANALYTICS_STUDENT_INSERT_TRIGGER};
+    CREATE TRIGGER IF NOT EXISTS analytics_student_delete AFTER DELETE ON students BEGIN
+        DELETE FROM analytics_students WHERE usn = old.usn;
+    END;
+    CREATE TRIGGER IF NOT EXISTS analytics_student_age AFTER UPDATE OF age ON students
+    WHEN old.age IS NOT new.age BEGIN
+        UPDATE analytics_students SET age = new.age WHERE usn = new.usn;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS analytics_scores_insert
+    AFTER INSERT ON student_subject_scores BEGIN
+        {_subject_add("new")}
+        {_student_refresh("new.usn")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS analytics_scores_delete
+    AFTER DELETE ON student_subject_scores BEGIN
+        {_subject_remove("old")}
+        {_student_refresh("old.usn")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS analytics_scores_update
+    AFTER UPDATE ON student_subject_scores BEGIN
+        {_subject_remove("old")}
+        {_subject_add("new")}
+        {_student_refresh("old.usn")}
+        {_student_refresh("new.usn")}
+    END;
+
+    {ANALYTICS_GROUPS_INSERT_TRIGGER};
+    CREATE TRIGGER IF NOT EXISTS analytics_groups_delete
+    AFTER DELETE ON analytics_students BEGIN
+        {_group_remove("old")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS analytics_groups_update
+    AFTER UPDATE ON analytics_students BEGIN
+        {_group_remove("old")}
+        {_group_add("new")}
+    END;
+"""
+
+
+# ============= TABLE VERSIONS =============
+# One counter per table, bumped by triggers on every write from any
+# process, so a reader can tell that a table changed without reading it
+# (collection ETags, see http_caching.collection_etag). Counters start at
+# a random value: a recreated database doesn't repeat old versions.
+
+VERSIONED_TABLES = ("students", "subjects", "student_subject_scores")
+
+
+def _version_trigger(table, event):
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS table_versions_{table}_{event.lower()}
+    AFTER {event} ON {table} BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+    END"""
+
+
+STUDENTS_VERSION_INSERT_TRIGGER = _version_trigger("students", "INSERT")
+
+TABLE_VERSIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS table_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID;
+""" + "".join(
+    f"""
+    INSERT OR IGNORE INTO table_versions (name, version)
+    VALUES ('{table}', abs(random() % 1000000000));
+""" + "".join(_version_trigger(table, event) + ";" for event in ("INSERT", "UPDATE", "DELETE"))
+    for table in VERSIONED_TABLES
+)
+
+
+# ============= CHANGE LOG =============
+# One row per student insert, delete and change of usn/name/age, written
+# by triggers in the writing transaction, whichever process or code path
+# made it. seq numbers the changes in commit order; change_feed.py
+# streams them to dashboards. Bulk imports log a single 'reload' row per
+# batch instead of one per student (see BULK_CHANGE_LOG). Every
+# CHANGE_LOG_PRUNE_EVERY rows, rows older than the newest CHANGE_LOG_KEEP
+# are deleted.
+
+CHANGE_LOG_KEEP = 10000
+CHANGE_LOG_PRUNE_EVERY = 1000
+
+CHANGE_LOG_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS change_log_student_insert AFTER INSERT ON students BEGIN
+        INSERT INTO change_log (op, student_id, usn, name, age)
+        VALUES ('insert', new.id, new.usn, new.name, new.age);
+    END"""
+
+CHANGE_LOG_UPDATE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS change_log_student_update AFTER UPDATE OF usn, name, age ON students
+    WHEN old.usn IS NOT new.usn OR old.name IS NOT new.name OR old.age IS NOT new.age BEGIN
+        INSERT INTO change_log (op, student_id, usn, name, age)
+        VALUES ('update', new.id, new.usn, new.name, new.age);
+    END"""
+
+CHANGE_LOG_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        op TEXT NOT NULL,
+        student_id INTEGER,
+        usn TEXT,
+        name TEXT,
+        age INTEGER,
+        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    {CHANGE_LOG_INSERT_TRIGGER};
+    {CHANGE_LOG_UPDATE_TRIGGER};
+    CREATE TRIGGER IF NOT EXISTS change_log_student_delete AFTER DELETE ON students BEGIN
+        INSERT INTO change_log (op, student_id, usn) VALUES ('delete', old.id, old.usn);
+    END;
+    CREATE TRIGGER IF NOT EXISTS change_log_prune AFTER INSERT ON change_log
+    WHEN new.seq % {CHANGE_LOG_PRUNE_EVERY} = 0 BEGIN
+        DELETE FROM change_log WHERE seq <= new.seq - {CHANGE_LOG_KEEP};
+    END;
+"""
+
+BULK_CHANGE_LOG = "INSERT INTO change_log (op) VALUES ('reload')"
+
+
+# ============= BULK INSERTS =============
+# Per-row triggers cost several times a plain INSERT. Bulk imports drop
+# these inside their transaction, insert the rows, run BULK_INSERT_CATCHUP
+# once for the new rows (students.id > ?1, which have no scores yet),
+# log BULK_CHANGE_LOG and recreate the triggers before committing, so
+# other connections never see them missing (see bulk_students.py).
+
+DEFERRABLE_TRIGGERS = {
+    "students_fts_insert": FTS_INSERT_TRIGGER,
+    "analytics_student_insert": ANALYTICS_STUDENT_INSERT_TRIGGER,
+    "analytics_groups_insert": ANALYTICS_GROUPS_INSERT_TRIGGER,
+    "table_versions_students_insert": STUDENTS_VERSION_INSERT_TRIGGER,
+    "change_log_student_insert": CHANGE_LOG_INSERT_TRIGGER,
+    "change_log_student_update": CHANGE_LOG_UPDATE_TRIGGER,
+}
+
+BULK_INSERT_CATCHUP = (
+    "INSERT INTO students_fts(rowid, name) SELECT id, name FROM students WHERE id > ?1",
+    """
+    INSERT INTO analytics_students (usn, age, batch)
+    SELECT usn, age, rtrim(usn, '0123456789') FROM students WHERE id > ?1
+    """,
+    """
+    INSERT INTO analytics_groups (dimension, key, students, scored, sum_score, low, medium, high)
+    SELECT *, 0, 0, 0, 0, 0 FROM (
+        SELECT 'all', '', count(*) FROM students WHERE id > ?1 HAVING count(*) > 0
+        UNION ALL
+        SELECT 'age', age, count(*) FROM students WHERE id > ?1 GROUP BY age
+        UNION ALL
+        SELECT 'batch', rtrim(usn, '0123456789') AS batch, count(*)
+        FROM students WHERE id > ?1 GROUP BY batch
+    ) WHERE true
+    ON CONFLICT(dimension, key) DO UPDATE SET students = students + excluded.students
+    """,
+    """
+    UPDATE table_versions SET version = version + 1
+    WHERE name = 'students' AND EXISTS (SELECT 1 FROM students WHERE id > ?1)
+    """,
+)
+
+
+def rebuild_analytics(conn):
+    """
+    Recompute every analytics table from students and scores
+    
+    Runs when the tables are first created; call it again to repair them
+    (e.g. after editing the database by hand with the triggers missing).
+    """
+    conn.executescript(f"""
+        DELETE FROM analytics_students;
+        DELETE FROM analytics_groups;
+        DELETE FROM analytics_subjects;
+        INSERT INTO analytics_students (usn, age, batch)
+        SELECT usn, age, rtrim(usn, '0123456789') FROM students;
+        INSERT INTO analytics_subjects
+        SELECT subject_code, count(*), sum(attendance), sum(internal), sum(assignment),
+               sum(score), sum(score >= 75), sum(score >= 50 AND score < 75), sum(score < 50)
+        FROM (SELECT *, {_score("s")} AS score FROM student_subject_scores s)
+        GROUP BY subject_code;
+    """)
+    usns = conn.execute("SELECT DISTINCT usn FROM student_subject_scores").fetchall()
+    conn.executemany(_student_refresh("?1"), usns)
+    conn.commit()
 
 
 def init_database():
-    """Initialize the database and create tables if they don't exist"""
-    conn = sqlite3.connect(DB_FILE)
+    """
+    Initialize the database and create tables if they don't exist
+    
+    Call ensure_database() instead: it runs this once, under a lock, when
+    several processes start at the same time.
+    """
+    conn = sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT_MS / 1000)
     cursor = conn.cursor()
+    # Persistent: set once here instead of racing from every new connection
+    cursor.execute("PRAGMA journal_mode = WAL")
     
     # Create students table
     cursor.execute("""
@@ -17,25 +404,311 @@ def init_database():
             usn TEXT UNIQUE NOT NULL,
             name TEXT NOT NULL,
             age INTEGER NOT NULL,
-            profile_picture BLOB,
+            picture_sha256 TEXT REFERENCES pictures(sha256),
+            picture_updated_at TIMESTAMP,
+            avatar_url TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Profile pictures, stored once per distinct content (see picture_store.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pictures (
+            sha256 TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            content_type TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
     
+    # Downscaled copies of each picture (see thumbnails.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS picture_thumbnails (
+            sha256 TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            content_type TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (sha256, size)
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS picture_thumbnails_release
+        AFTER DELETE ON pictures BEGIN
+            DELETE FROM picture_thumbnails WHERE sha256 = old.sha256;
+        END
+    """)
+    
+    # Columns added after the tables were first released
+    _add_column(cursor, "students", "picture_updated_at", "TIMESTAMP")
+    _add_column(cursor, "students", "avatar_url", "TEXT")
+    if _add_column(cursor, "pictures", "content_type", "TEXT"):
+        _backfill_content_types(cursor)
+    
+    # Databases created before the picture store keep images inline
+    if _has_column(cursor, "students", "profile_picture"):
+        conn.commit()
+        migrate_profile_pictures(conn)
+    
     # Create index on USN for faster lookups
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_usn ON students(usn)
     """)
     
+    # Index matching the listing sort order, used for keyset pagination
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_students_created_id
+        ON students(created_at DESC, id DESC)
+    """)
+    
+    # Trigram full-text index on names, kept in sync by triggers
+    fts_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'students_fts'"
+    ).fetchone()
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+            name,
+            content='students',
+            content_rowid='id',
+            tokenize='trigram'
+        )
+    """)
+    cursor.execute(FTS_INSERT_TRIGGER)
+    cursor.executescript("""
+        CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+            INSERT INTO students_fts(students_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END;
+        CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF name ON students BEGIN
+            INSERT INTO students_fts(students_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO students_fts(rowid, name) VALUES (new.id, new.name);
+        END;
+    """)
+    # Per-trigram document counts, used to pick selective trigrams
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS students_fts_vocab
+        USING fts5vocab('students_fts', 'row')
+    """)
+    if not fts_exists:
+        # Index the rows of a database created before the FTS table existed
+        cursor.execute("INSERT INTO students_fts(students_fts) VALUES ('rebuild')")
+    
+    # Per-subject performance (see subject_scores.py)
+    cursor.executescript("""
+        CREATE TABLE IF NOT EXISTS subjects (
+            code TEXT PRIMARY KEY,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS student_subject_scores (
+            usn TEXT NOT NULL REFERENCES students(usn),
+            subject_code TEXT NOT NULL REFERENCES subjects(code),
+            attendance NUMERIC NOT NULL,
+            internal NUMERIC NOT NULL,
+            assignment NUMERIC NOT NULL,
+            total_classes INTEGER NOT NULL,
+            PRIMARY KEY (usn, subject_code)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_scores_subject ON student_subject_scores(subject_code);
+        CREATE TRIGGER IF NOT EXISTS student_subject_scores_release
+        AFTER DELETE ON students BEGIN
+            DELETE FROM student_subject_scores WHERE usn = old.usn;
+        END;
+    """)
+    
+    # Per-table change counters, maintained by triggers
+    cursor.executescript(TABLE_VERSIONS_SCHEMA)
+    
+    # Cohort analytics, maintained by triggers
+    analytics_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'analytics_students'"
+    ).fetchone()
+    cursor.executescript(ANALYTICS_SCHEMA)
+    if not analytics_exists:
+        rebuild_analytics(conn)
+    
+    # Delete pictures as soon as no student references them any more
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_students_picture ON students(picture_sha256)
+    """)
+    cursor.executescript("""
+        CREATE TRIGGER IF NOT EXISTS pictures_release_on_delete
+        AFTER DELETE ON students WHEN old.picture_sha256 IS NOT NULL BEGIN
+            DELETE FROM pictures WHERE sha256 = old.picture_sha256
+            AND NOT EXISTS (SELECT 1 FROM students WHERE picture_sha256 = old.picture_sha256);
+        END;
+        CREATE TRIGGER IF NOT EXISTS pictures_release_on_update
+        AFTER UPDATE OF picture_sha256 ON students
+        WHEN old.picture_sha256 IS NOT NULL AND old.picture_sha256 IS NOT new.picture_sha256 BEGIN
+            DELETE FROM pictures WHERE sha256 = old.picture_sha256
+            AND NOT EXISTS (SELECT 1 FROM students WHERE picture_sha256 = old.picture_sha256);
+        END;
+    """)
+    
+    # Login credentials and the key signing session tokens (see auth.py)
+    cursor.executescript("""
+        CREATE TABLE IF NOT EXISTS accounts (
+            role TEXT NOT NULL,
+            login TEXT NOT NULL,
+            password_hash TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (role, login)
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS accounts_release
+        AFTER DELETE ON students BEGIN
+            DELETE FROM accounts WHERE role = 'student' AND login = old.usn;
+        END;
+        CREATE TABLE IF NOT EXISTS auth_keys (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            secret BLOB NOT NULL
+        );
+        INSERT OR IGNORE INTO auth_keys (id, secret) VALUES (1, randomblob(32));
+    """)
+    
+    # Student changes for the dashboard feed
+    cursor.executescript(CHANGE_LOG_SCHEMA)
+    
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
-    print(f"Database initialized at {DB_FILE}")
+    logger.info("Database initialized at %s", DB_FILE)
+
+
+# Set once ensure_database() has seen the schema current in this process
+_schema_checked = False
+_init_lock = threading.Lock()
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive inter-process lock on path, held for the with-block"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10 s
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def schema_version():
+    """PRAGMA user_version of the database file (0 before initialization)"""
+    conn = sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT_MS / 1000)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def ensure_database():
+    """
+    Run init_database() unless the file is already at SCHEMA_VERSION
+    
+    Safe to call from many processes at once (e.g. server workers): they
+    take turns on a lock file next to the database, and only the first
+    one creates or migrates the schema. After the first call in a process
+    it returns straight away.
+    
+    Returns:
+        True if this call initialized the database
+    """
+    global _schema_checked
+    if _schema_checked:
+        return False
+    with _init_lock:
+        if _schema_checked:
+            return False
+        initialized = False
+        if schema_version() != SCHEMA_VERSION:
+            with file_lock(f"{DB_FILE}.init-lock"):
+                if schema_version() != SCHEMA_VERSION:
+                    init_database()
+                    initialized = True
+        _schema_checked = True
+        return initialized
+
+
+def _has_column(cursor, table, column):
+    columns = cursor.execute(f"PRAGMA table_info({table})").fetchall()
+    return any(row[1] == column for row in columns)
+
+
+def _add_column(cursor, table, column, declaration):
+    """Add a column to an existing table; returns True if it was missing"""
+    if _has_column(cursor, table, column):
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    return True
+
+
+def _backfill_content_types(cursor):
+    rows = cursor.execute(
+        "SELECT sha256, substr(data, 1, 32) FROM pictures WHERE content_type IS NULL"
+    ).fetchall()
+    cursor.executemany(
+        "UPDATE pictures SET content_type = ? WHERE sha256 = ?",
+        [(detect_content_type(head), sha256) for sha256, head in rows]
+    )
+
+
+def migrate_profile_pictures(conn):
+    """
+    One-shot migration: move inline students.profile_picture BLOBs into
+    the pictures table, then drop the column and compact the file
+    
+    Runs automatically from init_database() on databases that still have
+    the old column; safe to run again (it does nothing the second time).
+    """
+    cursor = conn.cursor()
+    if not _has_column(cursor, "students", "profile_picture"):
+        return
+    
+    size_before = os.path.getsize(DB_FILE)
+    if not _has_column(cursor, "students", "picture_sha256"):
+        cursor.execute("ALTER TABLE students ADD COLUMN picture_sha256 TEXT REFERENCES pictures(sha256)")
+    _add_column(cursor, "students", "picture_updated_at", "TIMESTAMP")
+    
+    moved = 0
+    ids = conn.execute(
+        "SELECT id FROM students WHERE profile_picture IS NOT NULL"
+    ).fetchall()
+    for (student_id,) in ids:
+        data = conn.execute(
+            "SELECT profile_picture FROM students WHERE id = ?", (student_id,)
+        ).fetchone()[0]
+        sha256 = store_picture(conn, data)
+        conn.execute(
+            "UPDATE students SET picture_sha256 = ?, picture_updated_at = created_at WHERE id = ?",
+            (sha256, student_id)
+        )
+        moved += 1
+    
+    cursor.execute("ALTER TABLE students DROP COLUMN profile_picture")
+    conn.commit()
+    conn.execute("VACUUM")
+    
+    unique = conn.execute("SELECT COUNT(*) FROM pictures").fetchone()[0]
+    size_after = os.path.getsize(DB_FILE)
+    logger.info("Migrated %d profile pictures (%d unique) to the picture store; "
+                "database %.1f MB -> %.1f MB", moved, unique, size_before / 1e6, size_after / 1e6)
+
 
+def configure_connection(conn):
+    """Apply the per-connection PRAGMAs to an open connection"""
+    for pragma, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
 
-def get_connection():
-    """Get a database connection"""
-    return sqlite3.connect(DB_FILE)
 
+def get_connection(check_same_thread=True):
+    """Get a database connection (creating the schema on first use)"""
+    if not _schema_checked:
+        ensure_database()
+    return sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT_MS / 1000,
+                           check_same_thread=check_same_thread)
 
-# Initialize database when module is imported
-init_database()
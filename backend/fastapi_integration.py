@@ -2,130 +2,331 @@
 FastAPI Integration for Student Database
 =========================================
 
-This shows how to integrate the SQLite database with your FastAPI backend.
-Add these endpoints to your existing FastAPI application.
+Profile picture, update and search endpoints for the students database,
+as a router: main.create_app() includes it next to main.py's own student
+endpoints.
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import Response
 from pydantic import BaseModel
-from typing import Optional
-import base64
-
-# Import your database functions
-from student_operations import (
-    add_student,
-    get_all_students,
-    get_student_by_usn,
-    get_student_profile_picture,
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from typing import List, Optional
+import hashlib
+import os
+
+from json_responses import FastJSONResponse
+
+# Import your database functions (async wrappers run off the event loop)
+from async_operations import (
+    get_student_picture_info,
+    get_picture_bytes,
+    get_picture_thumbnail,
     update_student,
-    delete_student,
-    search_students_by_name
+    begin_picture,
+    write_picture_chunk,
+    discard_picture,
+    attach_picture,
+    search_students_by_name,
+    get_table_versions
 )
+from http_caching import (
+    COLLECTION_CACHE_CONTROL,
+    RangeNotSatisfiable,
+    collection_etag,
+    http_date,
+    is_not_modified,
+    parse_range,
+    quote_etag,
+    sqlite_timestamp,
+)
+from picture_store import CHUNK_SIZE, MAX_PICTURE_BYTES, PictureTooLarge, detect_content_type
+from thumbnails import MAX_THUMBNAIL_SIZE, MIN_THUMBNAIL_SIZE
+
+router = APIRouter()
 
-app = FastAPI()
+# How long browsers may reuse a profile picture before revalidating it
+PICTURE_CACHE_CONTROL = os.environ.get("PICTURE_CACHE_CONTROL", "public, max-age=300")
+
+# Bytes allowed on top of MAX_PICTURE_BYTES for the multipart boundaries
+# and part headers around an upload
+MULTIPART_OVERHEAD = 64 * 1024
 
 
 # ============= REQUEST MODELS =============
 
-class StudentCreate(BaseModel):
+class StudentUpdate(BaseModel):
+    name: Optional[str] = None
+    age: Optional[int] = None
+
+
+# ============= RESPONSE MODELS =============
+# For the OpenAPI schema only: the endpoints using them return a
+# FastJSONResponse directly, which skips FastAPI's encoder pass
+
+class SearchResultOut(BaseModel):
+    id: int
     usn: str
     name: str
     age: int
-    profile_picture_base64: Optional[str] = None  # Base64 encoded image
 
 
-class StudentUpdate(BaseModel):
-    name: Optional[str] = None
-    age: Optional[int] = None
+class SearchResults(BaseModel):
+    total: int
+    students: List[SearchResultOut]
 
 
 # ============= API ENDPOINTS =============
 
-@app.post("/students")
-async def create_student(student: StudentCreate):
-    """Create a new student"""
-    
-    # Handle profile picture if provided
-    picture_path = None
-    if student.profile_picture_base64:
-        # Decode base64 and save temporarily
-        import tempfile
-        picture_data = base64.b64decode(student.profile_picture_base64)
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-        temp_file.write(picture_data)
-        temp_file.close()
-        picture_path = temp_file.name
-    
-    student_id = add_student(
-        student.usn,
-        student.name,
-        student.age,
-        picture_path
-    )
+async def students_validators(request):
+    """
+    (headers, not_modified) for a response built from the students table
     
-    if student_id is None:
-        raise HTTPException(status_code=400, detail="Student with this USN already exists")
-    
-    return {
-        "message": "Student created successfully",
-        "id": student_id,
-        "usn": student.usn
+    The ETag changes with every write to students, so an unchanged
+    collection is answered with 304 before it is queried.
+    """
+    headers = {
+        "ETag": collection_etag(*await get_table_versions("students")),
+        "Cache-Control": COLLECTION_CACHE_CONTROL,
     }
+    return headers, is_not_modified(request.headers, headers["ETag"])
 
 
-@app.get("/students")
-async def list_students():
-    """Get all students"""
-    students = get_all_students()
+@router.get("/students/{usn}/picture")
+async def get_profile_picture(
+    usn: str,
+    request: Request,
+    size: Optional[int] = Query(None, ge=MIN_THUMBNAIL_SIZE, le=MAX_THUMBNAIL_SIZE)
+):
+    """
+    Get student's profile picture
     
-    return {
-        "total": len(students),
-        "students": [
-            {
-                
-                "usn": s[1],
-                "name": s[2],
-                "age": s[3],
-                "created_at": s[4]
-            }
-            for s in students
-        ]
+    Supports conditional requests (If-None-Match / If-Modified-Since get a
+    304 without reading the image) and single byte ranges. With ?size=N a
+    thumbnail whose longest side is at most N pixels is returned instead.
+    """
+    info = await get_student_picture_info(usn)
+    
+    if not info:
+        raise HTTPException(status_code=404, detail="Profile picture not found")
+    
+    sha256, content_type, picture_size, updated_at = info
+    # ?size= gets its own ETag even when the original is served instead of
+    # a thumbnail (no Pillow, or not a raster image), so that the 304 check
+    # and the response agree
+    headers = {
+        "ETag": quote_etag(sha256 if size is None else f"{sha256}-{size}"),
+        "Last-Modified": http_date(sqlite_timestamp(updated_at)),
+        "Cache-Control": PICTURE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
     }
+    
+    if is_not_modified(request.headers, headers["ETag"], sqlite_timestamp(updated_at)):
+        return Response(status_code=304, headers=headers)
+    
+    if size is not None:
+        thumbnail = await get_picture_thumbnail(sha256, size)
+        if thumbnail:
+            data, thumbnail_type = thumbnail
+            headers.pop("Accept-Ranges")
+            return Response(content=data, media_type=thumbnail_type, headers=headers)
+        # No Pillow, or not a raster image: serve the original
+    
+    media_type = content_type or "application/octet-stream"
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range == headers["ETag"]:
+        try:
+            byte_range = parse_range(request.headers.get("range"), picture_size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{picture_size}"})
+    
+    if byte_range:
+        start, end = byte_range
+        image_data = await get_picture_bytes(sha256, start, end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{picture_size}"
+        status_code = 206
+    else:
+        image_data = await get_picture_bytes(sha256)
+        status_code = 200
+    
+    if image_data is None:
+        # Replaced between reading the metadata and the bytes
+        raise HTTPException(status_code=404, detail="Profile picture not found")
+    
+    return Response(content=image_data, status_code=status_code,
+                    media_type=media_type, headers=headers)
 
 
-@app.get("/students/{usn}")
-async def get_student(usn: str):
-    """Get a specific student by USN"""
-    student = get_student_by_usn(usn)
+class _PicturePart:
+    """
+    python-multipart callbacks picking out the "picture" part: its bytes
+    in each chunk fed to the parser are collected in data
+    """
     
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
+    def __init__(self):
+        self.fed = 0  # body bytes fed to the parser before the current chunk
+        self.data_start = None  # body offset of the picture's first byte
+        self.found = False
+        self.data = []
+        self._reading = False
+        self._headers = {}
+        self._field = self._value = b""
     
-    return {
-        "id": student[0],
-        "usn": student[1],
-        "name": student[2],
-        "age": student[3],
-        "created_at": student[4]
-    }
+    def callbacks(self):
+        return {name: getattr(self, name) for name in (
+            "on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+            "on_headers_finished", "on_part_data", "on_part_end",
+        )}
+    
+    def on_part_begin(self):
+        self._headers = {}
+    
+    def on_header_field(self, data, start, end):
+        self._field += data[start:end]
+    
+    def on_header_value(self, data, start, end):
+        self._value += data[start:end]
+    
+    def on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+    
+    def on_headers_finished(self):
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._reading = not self.found and params.get(b"name") == b"picture"
+        self.found = self.found or self._reading
+    
+    def on_part_data(self, data, start, end):
+        if self._reading:
+            if self.data_start is None:
+                self.data_start = self.fed + start
+            self.data.append(bytes(data[start:end]))
+    
+    def on_part_end(self):
+        self._reading = False
 
 
-@app.get("/students/{usn}/picture")
-async def get_profile_picture(usn: str):
-    """Get student's profile picture"""
-    image_data = get_student_profile_picture(usn)
+async def stream_picture_upload(request, usn):
+    """
+    Stream the "picture" part of a multipart body into the picture store
+    while it arrives, then make it usn's picture
     
-    if not image_data:
-        raise HTTPException(status_code=404, detail="Profile picture not found")
+    The bytes are hashed and written into a preallocated BLOB (see
+    picture_store.begin_picture) CHUNK_SIZE at a time, each chunk a write
+    queue mutation of its own, so nothing is spooled to a temporary file,
+    about one chunk is held in memory and MAX_PICTURE_BYTES applies as the
+    bytes arrive. The BLOB is sized from Content-Length minus the
+    multipart framing, which is exact when the picture is the last part.
     
-    return Response(content=image_data, media_type="image/jpeg")
+    Returns:
+        (whether the student exists, picture size)
+    
+    Raises:
+        PictureTooLarge, or HTTPException for a body that isn't a
+        multipart upload with a picture
+    """
+    length = request.headers.get("content-length")
+    if not (length and length.isdigit()):
+        raise HTTPException(status_code=411, detail="Content-Length required")
+    length = int(length)
+    if length > MAX_PICTURE_BYTES + MULTIPART_OVERHEAD:
+        # Refuse before reading any of the body
+        raise PictureTooLarge(f"Picture is larger than {MAX_PICTURE_BYTES} bytes")
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+    
+    part = _PicturePart()
+    parser = MultipartParser(boundary, part.callbacks())
+    # What follows the picture when it is the last part
+    closing = len(b"\r\n--" + boundary + b"--\r\n")
+    digest = hashlib.sha256()
+    content_type = None
+    size = stored = 0
+    rowid = allocated = None
+    pending = bytearray()
+    tail = bytearray()  # bytes past the end of the BLOB (it came out too short)
+    
+    async def flush():
+        nonlocal stored, content_type
+        if content_type is None:
+            content_type = detect_content_type(bytes(pending[:32]))
+        head = bytes(pending[:allocated - stored])
+        if head:
+            await write_picture_chunk(rowid, stored, head)
+            stored += len(head)
+        tail.extend(pending[len(head):])
+        pending.clear()
+    
+    try:
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                part.fed += len(chunk)
+                for data in part.data:
+                    size += len(data)
+                    if size > MAX_PICTURE_BYTES:
+                        raise PictureTooLarge(f"Picture is larger than {MAX_PICTURE_BYTES} bytes")
+                    digest.update(data)
+                    pending += data
+                part.data.clear()
+                if rowid is None and part.data_start is not None:
+                    allocated = min(max(length - part.data_start - closing, 0), MAX_PICTURE_BYTES)
+                    rowid = await begin_picture(allocated)
+                if rowid is not None and len(pending) >= CHUNK_SIZE:
+                    await flush()
+            parser.finalize()
+        except MultipartParseError:
+            raise HTTPException(status_code=400, detail="Malformed multipart upload")
+        if not part.found:
+            raise HTTPException(status_code=422, detail="Missing the picture file field")
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty picture")
+        await flush()
+        success = await attach_picture(usn, rowid, digest.hexdigest(), content_type, size,
+                                       bytes(tail))
+        rowid = None  # attached, or dropped because the student doesn't exist
+    finally:
+        if rowid is not None:
+            discard_picture(rowid)
+    return success, size
 
 
-@app.put("/students/{usn}")
+@router.put(
+    "/students/{usn}/picture",
+    openapi_extra={"requestBody": {"required": True, "content": {"multipart/form-data": {
+        "schema": {"type": "object", "required": ["picture"],
+                   "properties": {"picture": {"type": "string", "format": "binary"}}},
+    }}}},
+)
+async def upload_profile_picture(usn: str, request: Request):
+    """
+    Replace a student's profile picture (multipart upload, streamed in chunks)
+    
+    The body is parsed here rather than by an UploadFile parameter, which
+    would spool the whole upload to a temporary file first (see
+    stream_picture_upload): a Content-Length over the limit gets 413
+    straight away, and so does a picture that grows past it while
+    streaming.
+    """
+    try:
+        success, size = await stream_picture_upload(request, usn)
+    except PictureTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    if not success:
+        raise HTTPException(status_code=404, detail="Student not found")
+    
+    return {"message": "Profile picture updated successfully", "size": size}
+
+
+@router.put("/students/{usn}")
 async def update_student_info(usn: str, student: StudentUpdate):
     """Update student information"""
-    success = update_student(
+    success = await update_student(
         usn,
         name=student.name,
         age=student.age
@@ -137,34 +338,21 @@ async def update_student_info(usn: str, student: StudentUpdate):
     return {"message": "Student updated successfully"}
 
 
-@app.delete("/students/{usn}")
-async def remove_student(usn: str):
-    """Delete a student"""
-    success = delete_student(usn)
-    
-    if not success:
-        raise HTTPException(status_code=404, detail="Student not found")
+@router.get("/students/search/{name}", response_model=SearchResults)
+async def search_students(
+    name: str,
+    request: Request,
+    limit: int = Query(20, ge=1, le=200),
+    fuzzy: bool = True
+):
+    """Search students by name (prefix, multi-word and typo-tolerant)"""
+    headers, not_modified = await students_validators(request)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
     
-    return {"message": "Student deleted successfully"}
-
-
-@app.get("/students/search/{name}")
-async def search_students(name: str):
-    """Search students by name"""
-    students = search_students_by_name(name)
+    students = await search_students_by_name(name, limit=limit, fuzzy=fuzzy)
     
-    return {
+    return FastJSONResponse({
         "total": len(students),
-        "students": [
-            {
-                "id": s[0],
-                "usn": s[1],
-                "name": s[2],
-                "age": s[3]
-            }
-            for s in students
-        ]
-    }
-
-
-
+        "students": [s._asdict() for s in students]
+    }, headers=headers)
@@ -0,0 +1,116 @@
+"""
+HTTP Caching Helpers
+====================
+
+Validators (ETag / Last-Modified), conditional requests (304 Not
+Modified) and byte ranges (206 Partial Content) for the API responses.
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+# Collections change without their URL changing: clients must revalidate
+# every time (cheap, see collection_etag) instead of reusing a copy
+COLLECTION_CACHE_CONTROL = "no-cache"
+
+# The same for responses that depend on who is asking: never stored by
+# shared caches
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when a Range header does not overlap the resource"""
+
+
+def quote_etag(value):
+    """Strong ETag header value for an opaque version string"""
+    return f'"{value}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches etag (weak comparison)"""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def collection_etag(*versions):
+    """
+    Weak ETag for a response built from tables at the given versions
+
+    Weak, because compression changes the bytes but not the content (see
+    compression.py). Read the versions before the data: a write in between
+    then yields newer data under an older tag, which only costs the client
+    one extra full response.
+    """
+    return 'W/"' + "-".join(str(version) for version in versions) + '"'
+
+
+def sqlite_timestamp(value):
+    """Parse SQLite's CURRENT_TIMESTAMP format ("YYYY-MM-DD HH:MM:SS", UTC)"""
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def http_date(moment):
+    """Format a datetime for Last-Modified / Date headers"""
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(headers, etag, last_modified=None):
+    """
+    Decide whether a conditional GET can be answered with 304
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def parse_range(range_header, size):
+    """
+    Parse a single-range "bytes=" Range header
+
+    Returns:
+        (start, end) inclusive, or None if the header should be ignored
+        (missing, not bytes, or multiple ranges) and the full body sent
+
+    Raises:
+        RangeNotSatisfiable: if the range lies outside the resource
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable(range_header)
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(range_header)
+    return start, min(end, size - 1)
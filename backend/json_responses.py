@@ -0,0 +1,45 @@
+"""
+JSON Responses
+==============
+
+When an endpoint returns a dict, FastAPI first walks every object in it
+with jsonable_encoder and only then dumps it. For listings that walk is
+most of the request's CPU time (about 230 ms of 240 ms for 10k students).
+
+Hot endpoints therefore build dicts of plain values themselves and
+return a FastJSONResponse, which FastAPI sends as is. It serializes with
+orjson when installed (pip install orjson, several times faster than the
+json module) and falls back to compact json.dumps otherwise. Such routes
+still declare response_model= for the OpenAPI schema; FastAPI doesn't
+apply it to a returned Response.
+
+FastJSONResponse is also the apps' default_response_class, so endpoints
+returning dicts at least get the faster renderer.
+"""
+
+import json
+
+from fastapi.responses import JSONResponse
+
+import metrics
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+def dumps(content):
+    """Serialize content to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by dumps(), timed as the json_render stage"""
+
+    def render(self, content):
+        with metrics.timed_stage("json_render"):
+            return dumps(content)
@@ -2,38 +2,131 @@
 Main FastAPI Backend Server
 ============================
 Handles student records, performance prediction, and admin authentication
+
+The app is built by create_app(): it configures logging, adds the
+middleware and includes the routers (this module's, fastapi_integration's
+and prediction_api's). Importing this module does neither, and does not
+touch the database; `main.app` is created on first access (that is what
+`uvicorn main:app` does), and the schema is checked once per process, in
+the startup lifespan.
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+import asyncio
 import base64
-import tempfile
+import logging
 import os
+import signal
+import tempfile
+import threading
 
-# Import database functions
-from student_operations import (
+import app_logging
+import auth
+import change_feed
+import database
+import metrics
+import student_cache
+from bulk_students import detect_format, export_students
+from compression import CompressionMiddleware
+from http_caching import (
+    COLLECTION_CACHE_CONTROL,
+    PRIVATE_CACHE_CONTROL,
+    collection_etag,
+    is_not_modified,
+)
+from json_responses import FastJSONResponse, dumps
+from picture_store import PictureTooLarge
+from subject_scores import PERFORMANCE_TABLES
+from student_operations import iter_students
+
+# Import database functions (async wrappers run off the event loop)
+from async_operations import (
     add_student,
     get_all_students,
+    get_students_page,
     get_student_by_usn,
     get_student_profile_picture,
+    get_student_performance_json,
+    check_password,
+    import_students_file,
+    load_demo_data,
     update_student,
     delete_student,
-    search_students_by_name
+    search_students_by_name,
+    get_table_versions,
+    get_analytics_summary,
+    get_subject_analytics,
+    get_group_analytics
 )
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
-# Enable CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],  # React dev server
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Seconds /readyz waits for the database before reporting not ready
+READY_TIMEOUT = float(os.environ.get("READY_TIMEOUT", 2.0))
+
+# DEMO_DATA=1 seeds the demo students and logins of seed_data.py; off by
+# default, so a real database never gets them
+DEMO_DATA = os.environ.get("DEMO_DATA", "").lower() in ("1", "true", "yes")
+
+router = APIRouter()
+
+def on_shutdown_signal(callback):
+    """
+    Call callback on the event loop as soon as SIGINT / SIGTERM arrives,
+    then pass the signal on to the server's own handler
+    
+    Uvicorn only runs the lifespan shutdown once every open connection
+    has finished, too late to tell anyone the worker is draining. Signals
+    can only be handled from the main thread; elsewhere (TestClient) this
+    does nothing.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(callback)
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                # SIG_DFL / SIG_IGN: put it back and let it act
+                signal.signal(signum, previous)
+                signal.raise_signal(signum)
+        
+        signal.signal(sig, handler)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Create / migrate the schema (once per process; serve.py already did it)
+    await run_in_threadpool(database.ensure_database)
+    # Warm-load every prediction model once per process
+    import model_registry
+    await run_in_threadpool(model_registry.load_models)
+    if DEMO_DATA:
+        # Add the demo students, their subject scores and the demo logins
+        # on first start
+        await load_demo_data()
+        await run_in_threadpool(auth.load_demo_accounts)
+    
+    def draining():
+        # Fail readiness checks while uvicorn waits for open requests,
+        # and end the change feed streams, which would never finish
+        app.state.ready = False
+        app.state.draining = True
+        change_feed.broadcaster.shutdown()
+    
+    on_shutdown_signal(draining)
+    app.state.ready = True
+    yield
+    app.state.ready = False
 
 # ============= REQUEST/RESPONSE MODELS =============
 
@@ -51,251 +144,107 @@ class StudentLogin(BaseModel):
     usn: str
     password: str
 
-class PredictionInput(BaseModel):
-    attendance: float
-    internal: float
-    assignment: float
+# Response models document the student endpoints; those endpoints return
+# a FastJSONResponse themselves, skipping FastAPI's encoder pass
+
+class StudentOut(BaseModel):
+    id: int
+    usn: str
+    name: str
+    age: int
+    created_at: str
+
+class StudentDetail(BaseModel):
+    success: bool
+    student: StudentOut
+
+class StudentList(BaseModel):
+    success: bool
+    total: Optional[int] = None
+    count: Optional[int] = None
+    next_cursor: Optional[str] = None
+    students: List[StudentOut]
 
 # ============= ADMIN ENDPOINTS =============
 
-# Hardcoded admin credentials (in production, use proper authentication)
-ADMIN_CREDENTIALS = {
-    "admin@example.com": "admin123",
-    "test@test.com": "password"
-}
-
-# Hardcoded student credentials and data (in production, fetch from database)
-STUDENT_DATA = {
-    "1CR23AD106": {
-        "password": "student123",
-        "name": "Samridh Hada",
-        "usn": "1CR23AD106",
-        "age": 20,
-        "profile_picture": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='80' height='80'%3E%3Crect fill='%237c3aed' width='80' height='80'/%3E%3Ctext x='50%25' y='50%25' dominant-baseline='middle' text-anchor='middle' font-family='sans-serif' font-size='32' fill='white'%3ESH%3C/text%3E%3C/svg%3E",
-        "subjects": [
-            {
-                "name": "Data Structures",
-                "code": "CS301",
-                "attendance": 85,
-                "internal": 22,
-                "assignment": 23,
-                "totalClasses": 40
-            },
-            {
-                "name": "Operating Systems",
-                "code": "CS302",
-                "attendance": 90,
-                "internal": 20,
-                "assignment": 21,
-                "totalClasses": 40
-            },
-            {
-                "name": "Database Management",
-                "code": "CS303",
-                "attendance": 78,
-                "internal": 18,
-                "assignment": 19,
-                "totalClasses": 40
-            },
-            {
-                "name": "Computer Networks",
-                "code": "CS304",
-                "attendance": 92,
-                "internal": 24,
-                "assignment": 24,
-                "totalClasses": 40
-            },
-            {
-                "name": "Software Engineering",
-                "code": "CS305",
-                "attendance": 88,
-                "internal": 21,
-                "assignment": 22,
-                "totalClasses": 40
-            }
-        ]
-    },
-    "1CR23AD107": {
-        "password": "student123",
-        "name": "Rahul Kumar",
-        "usn": "1CR23AD107",
-        "age": 21,
-        "profile_picture": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='80' height='80'%3E%3Crect fill='%2310b981' width='80' height='80'/%3E%3Ctext x='50%25' y='50%25' dominant-baseline='middle' text-anchor='middle' font-family='sans-serif' font-size='32' fill='white'%3ERK%3C/text%3E%3C/svg%3E",
-        "subjects": [
-            {
-                "name": "Data Structures",
-                "code": "CS301",
-                "attendance": 92,
-                "internal": 24,
-                "assignment": 24,
-                "totalClasses": 40
-            },
-            {
-                "name": "Operating Systems",
-                "code": "CS302",
-                "attendance": 88,
-                "internal": 22,
-                "assignment": 23,
-                "totalClasses": 40
-            },
-            {
-                "name": "Database Management",
-                "code": "CS303",
-                "attendance": 85,
-                "internal": 21,
-                "assignment": 22,
-                "totalClasses": 40
-            },
-            {
-                "name": "Computer Networks",
-                "code": "CS304",
-                "attendance": 90,
-                "internal": 23,
-                "assignment": 24,
-                "totalClasses": 40
-            },
-            {
-                "name": "Software Engineering",
-                "code": "CS305",
-                "attendance": 87,
-                "internal": 20,
-                "assignment": 21,
-                "totalClasses": 40
-            }
-        ]
-    },
-    "1CR23AD108": {
-        "password": "student123",
-        "name": "Priya Sharma",
-        "usn": "1CR23AD108",
-        "age": 19,
-        "profile_picture": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='80' height='80'%3E%3Crect fill='%23f59e0b' width='80' height='80'/%3E%3Ctext x='50%25' y='50%25' dominant-baseline='middle' text-anchor='middle' font-family='sans-serif' font-size='32' fill='white'%3EPS%3C/text%3E%3C/svg%3E",
-        "subjects": [
-            {
-                "name": "Data Structures",
-                "code": "CS301",
-                "attendance": 95,
-                "internal": 25,
-                "assignment": 25,
-                "totalClasses": 40
-            },
-            {
-                "name": "Operating Systems",
-                "code": "CS302",
-                "attendance": 93,
-                "internal": 24,
-                "assignment": 24,
-                "totalClasses": 40
-            },
-            {
-                "name": "Database Management",
-                "code": "CS303",
-                "attendance": 91,
-                "internal": 23,
-                "assignment": 24,
-                "totalClasses": 40
-            },
-            {
-                "name": "Computer Networks",
-                "code": "CS304",
-                "attendance": 94,
-                "internal": 25,
-                "assignment": 25,
-                "totalClasses": 40
-            },
-            {
-                "name": "Software Engineering",
-                "code": "CS305",
-                "attendance": 96,
-                "internal": 24,
-                "assignment": 25,
-                "totalClasses": 40
-            }
-        ]
-    }
-}
+def token_fields(token):
+    return {"token": token, "token_type": "bearer", "expires_in": auth.AUTH_TOKEN_TTL}
 
-@app.post("/admin/login")
+@router.post("/admin/login")
 async def admin_login(credentials: AdminLogin):
-    """Admin login endpoint"""
+    """Admin login endpoint (returns a bearer token)"""
     email = credentials.email
-    password = credentials.password
+    token = await check_password("admin", email, credentials.password)
     
-    if email in ADMIN_CREDENTIALS and ADMIN_CREDENTIALS[email] == password:
+    if token is not None:
         return {
             "success": True,
             "message": "Login successful",
-            "email": email
+            "email": email,
+            **token_fields(token)
         }
     else:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
 # ============= STUDENT ENDPOINTS =============
 
-@app.post("/student/login")
+@router.post("/student/login")
 async def student_login(credentials: StudentLogin):
-    """Student login endpoint"""
+    """Student login endpoint (returns a bearer token with the student's data)"""
     usn = credentials.usn.upper()
-    password = credentials.password
+    token = await check_password("student", usn, credentials.password)
     
-    if usn in STUDENT_DATA and STUDENT_DATA[usn]["password"] == password:
-        student_info = STUDENT_DATA[usn].copy()
-        student_info.pop("password")  # Don't send password back
-        return {
-            "success": True,
-            "message": "Login successful",
-            "student": student_info
-        }
-    else:
-        raise HTTPException(status_code=401, detail="Invalid USN or password")
+    if token is not None:
+        student_json = await get_student_performance_json(usn)
+        if student_json is not None:
+            fields = dumps({"success": True, "message": "Login successful", **token_fields(token)})
+            return Response(fields[:-1] + b', "student": ' + student_json.encode() + b'}',
+                            media_type="application/json")
+    raise HTTPException(status_code=401, detail="Invalid USN or password")
 
-@app.get("/student/performance/{usn}")
-async def get_student_performance(usn: str):
-    """Get student performance data"""
-    usn = usn.upper()
+@router.get("/student/performance/{usn}", dependencies=[Depends(auth.require_student_access)])
+async def get_student_performance(usn: str, request: Request):
+    """Get student performance data (the student's own, or any for an admin)"""
+    versions = await get_table_versions(*PERFORMANCE_TABLES)
+    headers = {
+        "ETag": collection_etag(*versions),
+        "Cache-Control": PRIVATE_CACHE_CONTROL,
+    }
+    if is_not_modified(request.headers, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
     
-    if usn in STUDENT_DATA:
-        student_info = STUDENT_DATA[usn].copy()
-        student_info.pop("password")
-        return {
-            "success": True,
-            "student": student_info
-        }
-    else:
+    # A cached document from before these versions counts as a miss
+    student_json = await get_student_performance_json(usn.upper(), versions)
+    
+    if student_json is None:
         raise HTTPException(status_code=404, detail="Student not found")
+    return Response('{"success": true, "student": ' + student_json + '}',
+                    media_type="application/json", headers=headers)
 
 # ============= STUDENT REGISTRATION ENDPOINTS =============
 
-@app.post("/students")
+@router.post("/students")
 async def create_student(student: StudentCreate):
     """Create a new student"""
     
     # Handle profile picture if provided
-    picture_path = None
+    picture_data = None
     if student.profile_picture_base64:
         try:
-            # Decode base64 and save temporarily
-            picture_data = base64.b64decode(student.profile_picture_base64)
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            temp_file.write(picture_data)
-            temp_file.close()
-            picture_path = temp_file.name
+            with metrics.timed_stage("base64_decode"):
+                picture_data = base64.b64decode(student.profile_picture_base64)
         except Exception as e:
-            print(f"Error processing image: {e}")
+            logger.warning("Ignoring undecodable profile picture for %s: %s", student.usn, e)
     
-    student_id = add_student(
-        student.usn,
-        student.name,
-        student.age,
-        picture_path
-    )
-    
-    # Clean up temp file
-    if picture_path and os.path.exists(picture_path):
-        try:
-            os.unlink(picture_path)
-        except:
-            pass
+    try:
+        student_id = await add_student(
+            student.usn,
+            student.name,
+            student.age,
+            profile_picture=picture_data
+        )
+    except PictureTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
     if student_id is None:
         raise HTTPException(status_code=400, detail="Student with this USN already exists")
@@ -307,81 +256,243 @@ async def create_student(student: StudentCreate):
         "usn": student.usn
     }
 
-@app.get("/students")
-async def list_students():
-    """Get all students"""
-    students = get_all_students()
+def stream_students_ndjson():
+    """Yield one JSON document per student, newline-delimited"""
+    for s in iter_students():
+        yield dumps(s._asdict()) + b"\n"
+
+
+def stream_students_json():
+    """Yield the same document as GET /students, one student at a time"""
+    yield b'{"success":true,"students":['
+    total = 0
+    for s in iter_students():
+        yield (b"," if total else b"") + dumps(s._asdict())
+        total += 1
+    yield f'],"total":{total}}}'.encode()
+
+
+@router.get("/students", response_model=StudentList)
+async def list_students(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$")
+):
+    """
+    Get students, newest first
     
-    return {
+    - no parameters: every student in one response
+    - limit/cursor: one page; pass next_cursor back to get the following page
+    - stream=ndjson|json: stream every student without buffering the table
+    
+    Responses carry an ETag that changes with the students table, so a
+    poll with If-None-Match gets a 304 without running the query.
+    """
+    headers = {
+        "ETag": collection_etag(*await get_table_versions("students")),
+        "Cache-Control": COLLECTION_CACHE_CONTROL,
+    }
+    if is_not_modified(request.headers, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    if stream == "ndjson":
+        return StreamingResponse(stream_students_ndjson(), media_type="application/x-ndjson",
+                                 headers=headers)
+    if stream == "json":
+        return StreamingResponse(stream_students_json(), media_type="application/json",
+                                 headers=headers)
+    
+    if limit is not None or cursor is not None:
+        try:
+            students, next_cursor = await get_students_page(limit or 50, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return FastJSONResponse({
+            "success": True,
+            "count": len(students),
+            "next_cursor": next_cursor,
+            "students": [s._asdict() for s in students]
+        }, headers=headers)
+    
+    students = await get_all_students()
+    
+    return FastJSONResponse({
         "success": True,
         "total": len(students),
-        "students": [
-            {
-                "id": s[0],
-                "usn": s[1],
-                "name": s[2],
-                "age": s[3],
-                "created_at": s[4]
-            }
-            for s in students
-        ]
-    }
+        "students": [s._asdict() for s in students]
+    }, headers=headers)
 
-@app.get("/students/{usn}")
+# Uploads larger than this are spooled to a temporary file
+BULK_SPOOL_BYTES = 8 * 1024 * 1024
+
+@router.post("/students/bulk")
+async def bulk_import_students(
+    request: Request,
+    mode: str = Query("insert", pattern="^(insert|upsert)$"),
+    format: Optional[str] = Query(None, pattern="^(csv|parquet)$")
+):
+    """
+    Create many students from a CSV or Parquet file (columns usn, name, age)
+    
+    Send the file as the request body (Content-Type: text/csv or
+    application/vnd.apache.parquet) or as a multipart "file" field.
+    
+    - mode=insert: rows whose USN already exists are reported and skipped
+    - mode=upsert: existing students get the new name and age
+    
+    Rows are committed in large batches; invalid rows are listed under
+    "errors" with their line number and don't stop the import.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=422, detail="Upload the data as a 'file' field")
+        fmt = format or detect_format(upload.content_type, upload.filename)
+        fileobj = upload.file
+    else:
+        fmt = format or detect_format(content_type)
+        fileobj = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_BYTES)
+        with metrics.timed_stage("upload_spool"):
+            async for chunk in request.stream():
+                fileobj.write(chunk)
+        fileobj.seek(0)
+    
+    try:
+        result = await import_students_file(fileobj, fmt, upsert=(mode == "upsert"))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    finally:
+        fileobj.close()
+    
+    return {"success": True, **result}
+
+@router.get("/students/export")
+async def export_all_students(format: str = Query("csv", pattern="^(csv|parquet)$")):
+    """Download every student as CSV or Parquet, streamed from the database"""
+    try:
+        chunks = export_students(format)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    media_type = "text/csv" if format == "csv" else "application/vnd.apache.parquet"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="students.{format}"'}
+    )
+
+@router.get("/students/changes")
+async def student_changes(request: Request, after: Optional[int] = Query(None, ge=0)):
+    """
+    Server-Sent Events stream of student inserts, updates and deletes
+    
+    Resumes after the Last-Event-ID header (EventSource sends it when it
+    reconnects) or ?after=<seq>; see change_feed.py for the events.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        after = int(last_event_id)
+    return StreamingResponse(
+        change_feed.broadcaster.stream(after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/students/{usn}", response_model=StudentDetail)
 async def get_student(usn: str):
     """Get a specific student by USN"""
-    student = get_student_by_usn(usn)
+    student = await get_student_by_usn(usn)
     
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    return {
-        "success": True,
-        "student": {
-            "id": student[0],
-            "usn": student[1],
-            "name": student[2],
-            "age": student[3],
-            "created_at": student[4]
-        }
-    }
+    return FastJSONResponse({"success": True, "student": student._asdict()})
 
-@app.delete("/students/{usn}")
+@router.delete("/students/{usn}")
 async def remove_student(usn: str):
     """Delete a student"""
-    success = delete_student(usn)
+    success = await delete_student(usn)
     
     if not success:
         raise HTTPException(status_code=404, detail="Student not found")
     
     return {"success": True, "message": "Student deleted successfully"}
 
-# ============= PREDICTION ENDPOINT (Your existing one) =============
+# ============= ANALYTICS ENDPOINTS =============
+
+@router.get("/analytics/summary")
+async def analytics_summary():
+    """Student count, average score and risk distribution across all students"""
+    return {"success": True, "summary": await get_analytics_summary()}
+
+@router.get("/analytics/subjects")
+async def analytics_subjects():
+    """Average attendance, marks and score, and risk counts per subject"""
+    return {"success": True, "subjects": await get_subject_analytics()}
+
+@router.get("/analytics/ages")
+async def analytics_ages():
+    """Students, average score and risk counts per age"""
+    return {"success": True, "ages": await get_group_analytics("age")}
+
+@router.get("/analytics/batches")
+async def analytics_batches():
+    """Students, average score and at-risk counts per USN batch (e.g. 1CR23AD)"""
+    return {"success": True, "batches": await get_group_analytics("batch")}
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Latency histograms and counters in the Prometheus text format"""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
-@app.post("/predict")
-async def predict_performance(data: PredictionInput):
-    """Predict student performance"""
-    # Simple prediction logic (replace with your actual model)
-    score = (data.attendance * 0.4 + data.internal * 2 + data.assignment * 2)
+@router.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss/eviction counters of the student lookup cache"""
+    return student_cache.stats()
+
+# ============= HEALTH ENDPOINTS =============
+
+@router.get("/healthz")
+async def liveness():
+    """Liveness: the worker process is up and its event loop responds"""
+    return {"status": "ok", "pid": os.getpid()}
+
+@router.get("/readyz")
+async def readiness(request: Request):
+    """
+    Readiness: startup finished, not shutting down, the database answers
+    within READY_TIMEOUT seconds and the default model is loaded
     
-    if score >= 75:
-        risk_level = "Low"
-    elif score >= 50:
-        risk_level = "Medium"
+    503 (with the failing checks) otherwise, so a load balancer stops
+    sending this worker traffic.
+    """
+    import model_registry
+    
+    state = request.app.state
+    if getattr(state, "ready", False):
+        checks = {"startup": "ok"}
     else:
-        risk_level = "High"
+        checks = {"startup": "draining" if getattr(state, "draining", False) else "not finished"}
+    try:
+        await asyncio.wait_for(get_table_versions("students"), READY_TIMEOUT)
+        checks["database"] = "ok"
+    except Exception as e:
+        checks["database"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+    try:
+        model_registry.get_model()
+        checks["model"] = "ok"
+    except model_registry.UnknownModel as e:
+        checks["model"] = f"not loaded: {e}"
     
-    return {
-        "predicted_score": round(score, 2),
-        "risk_level": risk_level,
-        "attendance": data.attendance,
-        "internal": data.internal,
-        "assignment": data.assignment
-    }
-
-# ============= HEALTH CHECK =============
+    ready = all(result == "ok" for result in checks.values())
+    return FastJSONResponse({"ready": ready, "pid": os.getpid(), "checks": checks},
+                            status_code=200 if ready else 503)
 
-@app.get("/")
+@router.get("/")
 async def root():
     return {
         "message": "Student Performance API",
@@ -389,10 +500,52 @@ async def root():
         "endpoints": [
             "/admin/login",
             "/students",
-            "/predict"
+            "/students/changes",
+            "/predict",
+            "/predict/batch",
+            "/models",
+            "/analytics/summary"
         ]
     }
 
+# ============= APPLICATION =============
+
+def create_app():
+    """Build the API: logging, middleware and every router"""
+    app_logging.configure_logging()
+    # Imported here: prediction_api pulls in numpy
+    import fastapi_integration
+    import prediction_api
+    
+    app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(metrics.MetricsMiddleware)
+    
+    # Enable CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],  # React dev server
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    app.include_router(router)
+    app.include_router(fastapi_integration.router)
+    app.include_router(prediction_api.router)
+    return app
+
+
+def __getattr__(name):
+    # `main.app` is built on first access, not at import
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
+    # Development server (auto-reload, one process); see serve.py for production
     import uvicorn
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
@@ -0,0 +1,348 @@
+"""
+Performance Metrics
+===================
+
+In-process counters and latency histograms, exposed in the Prometheus
+text format by GET /metrics:
+
+- http_request_duration_seconds   per route, method and status (MetricsMiddleware)
+- db_query_duration_seconds       per student_operations function (@instrumented)
+- db_rows_returned_total          rows returned by those functions
+- db_pool_wait_seconds            time spent waiting for a pooled connection
+- blob_bytes_read_total           picture / thumbnail bytes read from SQLite
+- stage_duration_seconds          named steps inside a request (timed_stage),
+                                  e.g. base64 decoding or JSON rendering
+
+Each process keeps its own numbers (Prometheus sums them across workers).
+
+Set SLOW_REQUEST_SECONDS to log the sampled stacks of every thread while
+a request runs longer than that (see SlowRequestSampler).
+"""
+
+import bisect
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SLOW_REQUEST_SECONDS = float(os.environ.get("SLOW_REQUEST_SECONDS", 0)) or None
+SLOW_REQUEST_SAMPLE_INTERVAL = float(os.environ.get("SLOW_REQUEST_SAMPLE_INTERVAL", 0.005))
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter; label values are passed positionally"""
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value}"
+                for labels, value in values]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    def count(self, *labels):
+        state = self._values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    def render(self):
+        with self._lock:
+            values = sorted((labels, list(state)) for labels, state in self._values.items())
+        lines = []
+        for labels, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), state[:-1]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {state[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_SECONDS = Histogram("http_request_duration_seconds",
+                         "Time from request start to the last response byte",
+                         ("method", "route", "status"))
+HTTP_RESPONSE_BYTES = Counter("http_response_bytes_total", "Response body bytes sent",
+                              ("method", "route"))
+HTTP_SLOW = Counter("http_slow_requests_total",
+                    "Requests slower than SLOW_REQUEST_SECONDS", ("method", "route"))
+QUERY_SECONDS = Histogram("db_query_duration_seconds",
+                          "Duration of instrumented database functions", ("function",))
+QUERY_ROWS = Counter("db_rows_returned_total",
+                     "Rows returned by instrumented database functions", ("function",))
+QUERY_ERRORS = Counter("db_query_errors_total",
+                       "Exceptions raised by instrumented database functions", ("function",))
+POOL_WAIT_SECONDS = Histogram("db_pool_wait_seconds",
+                              "Time spent waiting for a pooled SQLite connection")
+BLOB_BYTES_READ = Counter("blob_bytes_read_total", "BLOB bytes read from SQLite", ("table",))
+STAGE_SECONDS = Histogram("stage_duration_seconds",
+                          "Duration of named steps inside requests", ("stage",))
+
+
+# ============= DATABASE FUNCTIONS =============
+
+def count_rows(result):
+    """Default row count: list length, 1 for a single row tuple, else 0"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        return 1
+    return 0
+
+
+def instrumented(func=None, *, rows=count_rows):
+    """
+    Record the duration, rows returned and errors of a database function
+
+    Usage:
+        @instrumented
+        def get_all_students(): ...
+
+        @instrumented(rows=lambda result: len(result[0]))
+        def get_students_page(...): ...
+    """
+    if func is None:
+        return functools.partial(instrumented, rows=rows)
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            QUERY_ERRORS.inc(name)
+            raise
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - start, name)
+        if rows is not None:
+            QUERY_ROWS.inc(name, amount=rows(result))
+        return result
+
+    return wrapper
+
+
+@contextmanager
+def timed_stage(stage):
+    """Time a named step, e.g. with timed_stage("base64_decode"): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+
+
+# ============= SLOW REQUESTS =============
+
+# Threads whose innermost Python frame is here are idle, not working
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+_IDLE_FUNCTIONS = {("thread.py", "_worker"), ("handlers.py", "dequeue")}
+
+
+def _is_idle(frame):
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return filename in _IDLE_FILES or (filename, code.co_name) in _IDLE_FUNCTIONS
+
+
+class SlowRequestSampler:
+    """
+    Poor man's sampling profiler for slow requests
+
+    A background thread wakes every interval seconds. While any request
+    has been running for longer than threshold, it records the stack of
+    every busy thread. When such a request finishes, the most frequent
+    stacks are logged as a warning. Fast requests cost two dict updates.
+    """
+
+    def __init__(self, threshold, interval=SLOW_REQUEST_SAMPLE_INTERVAL, top=5, depth=12):
+        self.threshold = threshold
+        self.interval = interval
+        self.top = top
+        self.depth = depth
+        self._active = {}  # token -> (start, samples)
+        self._lock = threading.Lock()
+        self._next_token = 0
+        self._thread = None
+
+    def begin(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-request-sampler",
+                                                daemon=True)
+                self._thread.start()
+            self._next_token += 1
+            token = self._next_token
+            self._active[token] = (time.perf_counter(), _Tally())
+        return token
+
+    def end(self, token, label, duration):
+        with self._lock:
+            _, samples = self._active.pop(token)
+        if duration < self.threshold:
+            return
+        stacks = "\n".join(
+            f"--- {count} samples ---\n{stack}" for stack, count in samples.most_common(self.top)
+        ) or "(no samples)"
+        logger.warning("Slow request %s took %.3fs (threshold %.3fs); busiest stacks:\n%s",
+                       label, duration, self.threshold, stacks)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            with self._lock:
+                slow = [samples for start, samples in self._active.values()
+                        if now - start >= self.threshold]
+            if not slow:
+                continue
+            for ident, frame in sys._current_frames().items():
+                if ident == me or _is_idle(frame):
+                    continue
+                stack = "".join(traceback.format_stack(frame, limit=self.depth))
+                for samples in slow:
+                    samples[stack] += 1
+
+
+_samplers = {}
+_samplers_lock = threading.Lock()
+
+
+def get_sampler(threshold):
+    """The process-wide sampler for a threshold (one thread per process)"""
+    with _samplers_lock:
+        if threshold not in _samplers:
+            _samplers[threshold] = SlowRequestSampler(threshold)
+        return _samplers[threshold]
+
+
+# ============= HTTP MIDDLEWARE =============
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and body size per route
+
+    Timing stops at the last body chunk, so streamed responses are
+    measured until they finish. Routes are labelled by their path
+    template (/students/{usn}), not the raw path.
+    """
+
+    def __init__(self, app, slow_request_seconds=SLOW_REQUEST_SECONDS):
+        self.app = app
+        self.sampler = get_sampler(slow_request_seconds) if slow_request_seconds else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        token = self.sampler.begin() if self.sampler else None
+        status = 500
+        sent = 0
+        finished = False
+
+        def record():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            duration = time.perf_counter() - start
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_SECONDS.observe(duration, method, path, str(status))
+            HTTP_RESPONSE_BYTES.inc(method, path, amount=sent)
+            if self.sampler:
+                if duration >= self.sampler.threshold:
+                    HTTP_SLOW.inc(method, path)
+                self.sampler.end(token, f"{method} {scope['path']}", duration)
+
+        async def send_wrapper(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await send(message)
+                    record()
+                    return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
@@ -0,0 +1,209 @@
+"""
+Prediction Model Registry
+=========================
+
+Keeps every prediction model in process memory, loaded once at startup,
+and lets /predict pick one by name per request.
+
+Models are read from MODELS_DIR (default: backend/models):
+
+- <name>.json     linear coefficients:
+                  {"weights": {"attendance": 0.4, "internal": 2, "assignment": 2},
+                   "intercept": 0, "thresholds": {"low": 75, "medium": 50}}
+- <name>.joblib   a fitted scikit-learn regressor (needs joblib), trained on
+                  the columns [attendance, internal, assignment]
+
+The built-in formula is always available as "baseline". Reloading swaps
+the whole model table in one assignment, so requests that already picked
+a model finish with it and new requests see the new one. It only affects
+the process that reloads: with several workers, each keeps what it
+loaded at startup until it restarts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from prediction import (
+    LOW_RISK_SCORE,
+    MEDIUM_RISK_SCORE,
+    predict_batch,
+    predict_scores,
+)
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = Path(os.environ.get("MODELS_DIR", Path(__file__).parent / "models"))
+DEFAULT_MODEL = os.environ.get("DEFAULT_MODEL", "baseline")
+
+# Single-row predictions remembered per (model, version, inputs)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 10000))
+
+
+class UnknownModel(KeyError):
+    """Raised when a request names a model that isn't loaded"""
+
+
+class Model:
+    """A named, versioned scoring function with risk thresholds"""
+
+    def __init__(self, name, version, score, low=LOW_RISK_SCORE, medium=MEDIUM_RISK_SCORE,
+                 source=None):
+        self.name = name
+        self.version = version
+        self.score = score
+        self.low = low
+        self.medium = medium
+        self.source = source
+
+    def predict(self, attendance, internal, assignment):
+        """(scores, risk levels) for columns of inputs"""
+        return predict_batch(attendance, internal, assignment,
+                             score=self.score, low=self.low, medium=self.medium)
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "source": str(self.source) if self.source else "built-in",
+            "thresholds": {"low": self.low, "medium": self.medium},
+        }
+
+
+def baseline_model():
+    """The original hard-coded formula"""
+    return Model("baseline", "builtin", predict_scores)
+
+
+def _file_version(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+
+
+def load_linear_model(path):
+    """Load a coefficients file (see module docstring)"""
+    spec = json.loads(path.read_text())
+    weights = spec["weights"]
+    w_attendance = float(weights["attendance"])
+    w_internal = float(weights["internal"])
+    w_assignment = float(weights["assignment"])
+    intercept = float(spec.get("intercept", 0))
+    thresholds = spec.get("thresholds", {})
+
+    def score(attendance, internal, assignment):
+        return attendance * w_attendance + internal * w_internal + assignment * w_assignment + intercept
+
+    return Model(path.stem, _file_version(path), score,
+                 low=thresholds.get("low", LOW_RISK_SCORE),
+                 medium=thresholds.get("medium", MEDIUM_RISK_SCORE),
+                 source=path)
+
+
+def load_sklearn_model(path):
+    """Load a fitted scikit-learn regressor saved with joblib.dump"""
+    import joblib
+
+    estimator = joblib.load(path)
+
+    def score(attendance, internal, assignment):
+        return estimator.predict(np.column_stack((attendance, internal, assignment)))
+
+    return Model(path.stem, _file_version(path), score, source=path)
+
+
+LOADERS = {
+    ".json": load_linear_model,
+    ".joblib": load_sklearn_model,
+}
+
+
+# name -> Model; replaced as a whole, never mutated in place
+_models = {"baseline": baseline_model()}
+_write_lock = threading.Lock()
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_models(directory=MODELS_DIR):
+    """
+    (Re)load every model file in directory and swap them in atomically
+
+    A file that can't be loaded is logged and skipped, so one bad model
+    doesn't keep the server from starting.
+
+    Returns:
+        Names of the loaded models
+    """
+    global _models
+    models = {"baseline": baseline_model()}
+    directory = Path(directory)
+    if directory.is_dir():
+        for path in sorted(directory.iterdir()):
+            loader = LOADERS.get(path.suffix)
+            if loader:
+                try:
+                    models[path.stem] = loader(path)
+                except Exception:
+                    logger.exception("Skipping model file %s: could not load it", path)
+    with _write_lock:
+        _models = models
+    return sorted(models)
+
+
+def reload_model(name, directory=MODELS_DIR):
+    """Reload a single model from its file and swap it in atomically"""
+    global _models
+    if name == "baseline":
+        return _models["baseline"]
+    for suffix, loader in LOADERS.items():
+        path = Path(directory) / f"{name}{suffix}"
+        if path.exists():
+            model = loader(path)
+            break
+    else:
+        raise UnknownModel(name)
+    with _write_lock:
+        _models = {**_models, name: model}
+    return model
+
+
+def get_model(name=None):
+    """The model registered under name (DEFAULT_MODEL if None)"""
+    try:
+        return _models[name or DEFAULT_MODEL]
+    except KeyError:
+        raise UnknownModel(name or DEFAULT_MODEL) from None
+
+
+def list_models():
+    return [model.describe() for model in _models.values()]
+
+
+def predict_one(attendance, internal, assignment, model_name=None):
+    """
+    Score a single student, remembering the result in a bounded LRU cache
+
+    Returns:
+        (model, score, risk level)
+    """
+    model = get_model(model_name)
+    key = (model.name, model.version, attendance, internal, assignment)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return (model, *cached)
+
+    scores, risks = model.predict([attendance], [internal], [assignment])
+    result = (float(scores[0]), str(risks[0]))
+    with _cache_lock:
+        _cache[key] = result
+        if len(_cache) > PREDICTION_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return (model, *result)
@@ -0,0 +1,245 @@
+"""
+Content-Addressed Picture Store
+===============================
+
+Profile pictures live in their own table, keyed by the SHA-256 of their
+bytes, instead of inline in the students row. Students reference a
+picture by hash, so:
+
+- listing and search queries never page through image data
+- identical uploads are stored once
+- a picture is deleted automatically (by trigger, see database.py) once
+  no student references it any more
+
+All functions take an open connection so they can share the caller's
+transaction.
+"""
+
+import hashlib
+import os
+import uuid
+
+from metrics import BLOB_BYTES_READ
+
+# Largest accepted picture, in bytes
+MAX_PICTURE_BYTES = int(os.environ.get("MAX_PICTURE_BYTES", 10 * 1024 * 1024))
+
+# Bytes copied per step when streaming a picture into the database
+CHUNK_SIZE = 256 * 1024
+
+
+class PictureTooLarge(ValueError):
+    """Raised when a picture exceeds MAX_PICTURE_BYTES"""
+
+
+# Leading bytes of the image formats browsers display
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+    (b"\x00\x00\x01\x00", "image/x-icon"),
+)
+
+
+def detect_content_type(head):
+    """
+    Guess an image's MIME type from its first bytes (32 are plenty)
+
+    Returns application/octet-stream for unrecognised data.
+    """
+    head = bytes(head)
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    text = head.lstrip().lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in head.lower()):
+        return "image/svg+xml"
+    return "application/octet-stream"
+
+
+def picture_hash(data):
+    """The content address of a picture"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def store_picture(conn, data):
+    """
+    Store picture bytes (once per distinct content)
+
+    Returns:
+        The SHA-256 hex digest to reference the picture by
+    """
+    sha256 = picture_hash(data)
+    conn.execute("""
+        INSERT OR IGNORE INTO pictures (sha256, data, size, content_type)
+        VALUES (?, ?, ?, ?)
+    """, (sha256, data, len(data), detect_content_type(data[:32])))
+    return sha256
+
+
+def load_picture(conn, sha256):
+    """Get picture bytes by hash, or None if not stored"""
+    row = conn.execute(
+        "SELECT data FROM pictures WHERE sha256 = ?", (sha256,)
+    ).fetchone()
+    if not row:
+        return None
+    BLOB_BYTES_READ.inc("pictures", amount=len(row[0]))
+    return row[0]
+
+
+def load_picture_range(conn, sha256, start=0, length=None):
+    """
+    Get part of a picture by hash without reading the rest of it
+
+    Uses incremental blob I/O, so a small range of a large picture only
+    touches the pages that hold those bytes.
+
+    Returns:
+        The bytes, or None if the picture is not stored
+    """
+    row = conn.execute(
+        "SELECT rowid, size FROM pictures WHERE sha256 = ?", (sha256,)
+    ).fetchone()
+    if not row:
+        return None
+    rowid, size = row
+    if length is None:
+        length = size - start
+    with conn.blobopen("pictures", "data", rowid, readonly=True) as blob:
+        blob.seek(start)
+        data = blob.read(length)
+    BLOB_BYTES_READ.inc("pictures", amount=len(data))
+    return data
+
+
+def read_picture(picture):
+    """Picture bytes from bytes or a binary file-like object (or None)"""
+    if picture is None or isinstance(picture, (bytes, bytearray, memoryview)):
+        data = picture
+    else:
+        data = picture.read()
+    if data is not None and len(data) > MAX_PICTURE_BYTES:
+        raise PictureTooLarge(f"Picture is larger than {MAX_PICTURE_BYTES} bytes")
+    return data
+
+
+# Placeholder rows of pictures still being written are keyed
+# "pending-<uuid>"; ones older than this were abandoned (a crash mid-upload)
+PENDING_PICTURE_HOURS = 1
+
+
+def begin_picture(conn, size):
+    """
+    Insert a placeholder row holding a zeroed BLOB of size bytes, to be
+    filled with write_picture_chunk and keyed by finish_picture
+
+    Also drops placeholders abandoned more than PENDING_PICTURE_HOURS ago.
+
+    Returns:
+        The placeholder's rowid
+    """
+    conn.execute("""
+        DELETE FROM pictures
+        WHERE sha256 >= 'pending-' AND sha256 < 'pending.'
+        AND created_at < datetime('now', ?)
+    """, (f"-{PENDING_PICTURE_HOURS} hours",))
+    cursor = conn.execute("""
+        INSERT INTO pictures (sha256, data, size)
+        VALUES (?, zeroblob(?), ?)
+    """, (f"pending-{uuid.uuid4().hex}", size, size))
+    return cursor.lastrowid
+
+
+def write_picture_chunk(conn, rowid, offset, data):
+    """Write data into a placeholder's BLOB at offset (incremental blob I/O)"""
+    with conn.blobopen("pictures", "data", rowid) as blob:
+        blob.seek(offset)
+        blob.write(data)
+
+
+def finish_picture(conn, rowid, sha256, content_type, size, tail=b""):
+    """
+    Key a placeholder by its hash once all size bytes are written, or drop
+    it if the same picture is already stored
+
+    Args:
+        size: The picture's length; a shorter one than the placeholder
+            was created with is trimmed to it
+        tail: Bytes past the end of the placeholder, appended to it
+            (when the picture turned out longer than expected)
+
+    Returns:
+        sha256
+    """
+    if conn.execute("SELECT 1 FROM pictures WHERE sha256 = ?", (sha256,)).fetchone():
+        discard_picture(conn, rowid)
+        return sha256
+    if tail:
+        conn.execute("UPDATE pictures SET data = data || ? WHERE rowid = ?", (tail, rowid))
+    else:
+        conn.execute("""
+            UPDATE pictures SET data = substr(data, 1, ?)
+            WHERE rowid = ? AND length(data) > ?
+        """, (size, rowid, size))
+    conn.execute(
+        "UPDATE pictures SET sha256 = ?, content_type = ?, size = ? WHERE rowid = ?",
+        (sha256, content_type, size, rowid)
+    )
+    return sha256
+
+
+def discard_picture(conn, rowid):
+    """Delete a placeholder (an upload that failed or wasn't needed)"""
+    conn.execute("DELETE FROM pictures WHERE rowid = ?", (rowid,))
+
+
+def store_picture_stream(conn, fileobj, size, max_bytes=MAX_PICTURE_BYTES,
+                         chunk_size=CHUNK_SIZE):
+    """
+    Stream a picture from a file-like object into the store in chunks
+
+    The bytes are written straight into a preallocated BLOB with SQLite's
+    incremental blob I/O while being hashed, so at most one chunk is held
+    in memory. The row is then keyed by the hash, or dropped if the same
+    picture is already stored.
+
+    Args:
+        conn: Open connection (the caller commits or rolls back)
+        fileobj: Binary file-like object positioned at the start
+        size: Number of bytes that will be read from fileobj
+        max_bytes: Reject pictures larger than this
+
+    Returns:
+        The SHA-256 hex digest to reference the picture by
+    """
+    if size > max_bytes:
+        raise PictureTooLarge(f"Picture is larger than {max_bytes} bytes")
+
+    rowid = begin_picture(conn, size)
+    digest = hashlib.sha256()
+    written = 0
+    content_type = None
+    with conn.blobopen("pictures", "data", rowid) as blob:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            if content_type is None:
+                content_type = detect_content_type(chunk[:32])
+            written += len(chunk)
+            if written > size:
+                # More data than announced: also covers a lying size
+                raise PictureTooLarge(f"Picture is larger than {size} bytes")
+            digest.update(chunk)
+            blob.write(chunk)
+    if written != size:
+        raise ValueError(f"Expected {size} picture bytes, got {written}")
+
+    return finish_picture(conn, rowid, digest.hexdigest(), content_type, size)
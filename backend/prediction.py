@@ -0,0 +1,101 @@
+"""
+Performance Prediction Kernel
+=============================
+
+Scores students from attendance, internal and assignment marks. Works on
+whole columns at once with NumPy, so the single /predict endpoint and
+/predict/batch share the same code. The formula below is the "baseline"
+model; other models are loaded through model_registry.py.
+"""
+
+import csv
+import io
+
+import numpy as np
+
+# Score thresholds for the risk levels
+LOW_RISK_SCORE = 75
+MEDIUM_RISK_SCORE = 50
+
+# Indexed by (score >= MEDIUM_RISK_SCORE) + (score >= LOW_RISK_SCORE)
+RISK_LEVELS = np.array(["High", "Medium", "Low"])
+
+INPUT_COLUMNS = ("attendance", "internal", "assignment")
+
+
+def predict_scores(attendance, internal, assignment):
+    """Predicted score for each student (arrays in, float64 array out)"""
+    attendance = np.asarray(attendance, dtype=np.float64)
+    internal = np.asarray(internal, dtype=np.float64)
+    assignment = np.asarray(assignment, dtype=np.float64)
+    # Simple prediction logic (replace with your actual model)
+    return attendance * 0.4 + internal * 2 + assignment * 2
+
+
+def risk_levels(scores, low=LOW_RISK_SCORE, medium=MEDIUM_RISK_SCORE):
+    """Risk level ("Low", "Medium" or "High") for each score"""
+    scores = np.asarray(scores)
+    index = (scores >= medium).astype(np.intp) + (scores >= low)
+    return RISK_LEVELS[index]
+
+
+def predict_batch(attendance, internal, assignment, score=predict_scores,
+                  low=LOW_RISK_SCORE, medium=MEDIUM_RISK_SCORE):
+    """
+    Score a batch of students in one pass
+
+    Args:
+        attendance, internal, assignment: Equal-length columns
+        score: Function mapping the three float64 columns to scores
+        low, medium: Minimum scores for the "Low" and "Medium" risk levels
+
+    Returns:
+        (scores rounded to 2 decimals, risk levels) as NumPy arrays
+    """
+    columns = [np.asarray(c, dtype=np.float64) for c in (attendance, internal, assignment)]
+    if any(c.ndim != 1 or c.shape != columns[0].shape for c in columns):
+        raise ValueError("Inputs must be columns of equal length")
+    scores = np.asarray(score(*columns), dtype=np.float64).reshape(-1)
+    if not np.isfinite(scores).all():
+        raise ValueError("Inputs must be finite numbers")
+    return np.round(scores, 2), risk_levels(scores, low, medium)
+
+
+def columns_from_csv(data):
+    """
+    Read the input columns from CSV bytes with a header row
+
+    Other columns (e.g. usn) are ignored.
+    """
+    text = io.StringIO(data.decode("utf-8-sig"))
+    header = next(csv.reader(text), None)
+    if header is None:
+        raise ValueError("Empty CSV file")
+    header = [name.strip().lower() for name in header]
+    missing = [name for name in INPUT_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+
+    usecols = [header.index(name) for name in INPUT_COLUMNS]
+    table = np.loadtxt(text, delimiter=",", usecols=usecols, dtype=np.float64, ndmin=2)
+    return table[:, 0], table[:, 1], table[:, 2]
+
+
+def columns_from_arrow(data):
+    """Read the input columns from an Arrow IPC file or stream (needs pyarrow)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("Arrow uploads need pyarrow (pip install pyarrow)") from None
+
+    try:
+        table = pa.ipc.open_file(pa.py_buffer(data)).read_all()
+    except pa.ArrowInvalid:
+        table = pa.ipc.open_stream(pa.py_buffer(data)).read_all()
+    missing = [name for name in INPUT_COLUMNS if name not in table.column_names]
+    if missing:
+        raise ValueError(f"Arrow table is missing columns: {', '.join(missing)}")
+    return tuple(
+        table.column(name).to_numpy().astype(np.float64, copy=False)
+        for name in INPUT_COLUMNS
+    )
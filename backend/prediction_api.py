@@ -0,0 +1,195 @@
+"""
+Prediction API
+==============
+
+POST /predict, POST /predict/batch, GET /predict/students and the
+/models endpoints, as a router included by main.create_app(). Kept apart
+from main.py because it pulls in numpy (through model_registry,
+prediction and roster_snapshot), which importing main should not.
+"""
+
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+import auth
+import model_registry
+import roster_snapshot
+from json_responses import FastJSONResponse
+from prediction import (
+    INPUT_COLUMNS,
+    columns_from_arrow,
+    columns_from_csv,
+)
+
+router = APIRouter()
+
+
+class PredictionInput(BaseModel):
+    attendance: float
+    internal: float
+    assignment: float
+
+
+@router.post("/predict")
+async def predict_performance(data: PredictionInput, model: Optional[str] = None):
+    """Predict student performance (?model=<name> picks a registered model)"""
+    try:
+        used, score, risk_level = model_registry.predict_one(
+            data.attendance, data.internal, data.assignment, model
+        )
+    except model_registry.UnknownModel:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {model}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return {
+        "predicted_score": score,
+        "risk_level": risk_level,
+        "attendance": data.attendance,
+        "internal": data.internal,
+        "assignment": data.assignment,
+        "model": used.name,
+        "model_version": used.version
+    }
+
+
+ARROW_CONTENT_TYPES = (
+    "application/vnd.apache.arrow.file",
+    "application/vnd.apache.arrow.stream",
+)
+
+
+def predict_columns(model, content_type, body, filename=None):
+    """Parse a batch payload and score it (runs in a worker thread)"""
+    if content_type.startswith("text/csv") or (filename or "").endswith(".csv"):
+        columns = columns_from_csv(body)
+    elif content_type.startswith(ARROW_CONTENT_TYPES) or (filename or "").endswith((".arrow", ".feather")):
+        columns = columns_from_arrow(body)
+    else:
+        payload = json.loads(body)
+        if not isinstance(payload, dict):
+            raise ValueError("Expected a JSON object of columns")
+        missing = [name for name in INPUT_COLUMNS if name not in payload]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        columns = [payload[name] for name in INPUT_COLUMNS]
+    
+    scores, risks = model.predict(*columns)
+    return {
+        "count": len(scores),
+        "model": model.name,
+        "model_version": model.version,
+        "predicted_score": scores.tolist(),
+        "risk_level": risks.tolist()
+    }
+
+
+@router.post("/predict/batch")
+async def predict_performance_batch(request: Request, model: Optional[str] = None):
+    """
+    Predict performance for many students in one request
+    
+    Accepts columns of equal length as any of:
+    - JSON: {"attendance": [...], "internal": [...], "assignment": [...]}
+    - CSV (Content-Type: text/csv) with a header row naming those columns
+    - Arrow IPC (application/vnd.apache.arrow.file or .stream)
+    - multipart/form-data with one of the above uploaded as "file"
+    
+    Returns columns: {"count", "predicted_score": [...], "risk_level": [...]}
+    ?model=<name> picks a registered model.
+    """
+    try:
+        used = model_registry.get_model(model)
+    except model_registry.UnknownModel:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {model}")
+    
+    content_type = request.headers.get("content-type", "application/json")
+    filename = None
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=422, detail="Upload the data as a 'file' field")
+        body = await upload.read()
+        content_type = upload.content_type or ""
+        filename = upload.filename
+    else:
+        body = await request.body()
+    
+    try:
+        result = await run_in_threadpool(predict_columns, used, content_type, body, filename)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return FastJSONResponse(result)
+
+
+def score_roster(model, risk=None):
+    """Score every student from the roster snapshot (runs in a worker thread)"""
+    snapshot = roster_snapshot.current()
+    students, scores, risks = roster_snapshot.score_students(snapshot, model)
+    if risk:
+        keep = risks == risk
+        students, scores, risks = students[keep], scores[keep], risks[keep]
+    rows = students.tolist()
+    usns = snapshot.usn.tolist()
+    names = snapshot.name.tolist()
+    return {
+        "count": len(rows),
+        "model": model.name,
+        "model_version": model.version,
+        "usn": [usns[i] for i in rows],
+        "name": [names[i] for i in rows],
+        "predicted_score": scores.tolist(),
+        "risk_level": risks.tolist()
+    }
+
+
+@router.get("/predict/students")
+async def predict_all_students(
+    model: Optional[str] = None,
+    risk: Optional[str] = Query(None, pattern="^(Low|Medium|High)$")
+):
+    """
+    Predict performance for every student with scores
+    
+    Each student is scored on the average of their per-subject scores
+    (like /analytics). Reads the shared roster snapshot, which is rebuilt
+    first if students or scores changed. ?risk=High returns only the
+    students at that risk level.
+    """
+    try:
+        used = model_registry.get_model(model)
+    except model_registry.UnknownModel:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {model}")
+    
+    return FastJSONResponse(await run_in_threadpool(score_roster, used, risk))
+
+
+@router.get("/models")
+async def list_models():
+    """Prediction models loaded in this process"""
+    return {"default": model_registry.DEFAULT_MODEL, "models": model_registry.list_models()}
+
+
+@router.post("/models/{name}/reload", dependencies=[Depends(auth.require_admin)])
+async def reload_model(name: str):
+    """
+    Reload a model from its file; in-flight requests finish on the old one
+    
+    Admins only. Reloads it in the worker process that handles the request
+    (its pid is in the response); other workers keep the version they
+    loaded at startup until they restart.
+    """
+    try:
+        model = await run_in_threadpool(model_registry.reload_model, name)
+    except model_registry.UnknownModel:
+        raise HTTPException(status_code=404, detail=f"No model file for: {name}")
+    except (ValueError, KeyError, OSError) as e:
+        raise HTTPException(status_code=422, detail=f"Could not load model {name}: {e}")
+    return {"success": True, "pid": os.getpid(), "model": model.describe()}
@@ -0,0 +1,331 @@
+"""
+Roster Snapshot
+===============
+
+Cohort-wide work (scoring every student, per-subject averages) needs the
+whole roster and every score in memory. As sqlite3 rows and dicts that
+costs a few hundred bytes per value, in every worker process. Instead,
+students and scores are exported to one columnar file next to the
+database, which each worker maps read-only:
+
+- fixed-width little-endian columns (ids, ages, marks, ...), read as
+  NumPy views straight from the mapping, without copying
+- USNs, names and subject codes/names as string tables: one offsets
+  column plus the UTF-8 bytes of every value, back to back
+- students sorted by USN, scores by (USN, subject), so a student's
+  scores are one slice (score_start[i]:score_start[i + 1])
+
+The mapped pages live in the OS page cache and are shared by every
+worker, instead of each one holding its own copy.
+
+The file records the table versions (see TABLE VERSIONS in database.py)
+it was built from. current() compares them with the database, and a
+stale file is rebuilt by one process (under a lock file) into a
+temporary file that replaces it with os.replace(), so a reader sees
+either the old snapshot or the new one, never a partial file. Mappings
+of the old file stay valid until their arrays are garbage collected.
+
+Settings:
+    ROSTER_SNAPSHOT     snapshot file (default: <database file>.roster)
+
+Build it from the command line:
+    python roster_snapshot.py
+"""
+
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from connection_pool import connection
+from database import DB_FILE, VERSIONED_TABLES, file_lock
+from metrics import instrumented
+from student_operations import get_table_versions
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = Path(os.environ.get("ROSTER_SNAPSHOT", f"{DB_FILE}.roster"))
+
+# File layout: MAGIC, header length (uint64), JSON header, then every
+# column at an ALIGNMENT-byte boundary
+MAGIC = b"ROSTER01"
+ALIGNMENT = 64
+
+# Column name -> dtype; string columns are "<name>.offsets" + "<name>.data"
+COLUMNS = {
+    "student_id": "<i8",
+    "age": "<i4",
+    "usn.offsets": "<u8",
+    "usn.data": "u1",
+    "name.offsets": "<u8",
+    "name.data": "u1",
+    "score_start": "<u8",
+    "subject_code.offsets": "<u8",
+    "subject_code.data": "u1",
+    "subject_name.offsets": "<u8",
+    "subject_name.data": "u1",
+    "score_student": "<i4",
+    "score_subject": "<i4",
+    "attendance": "<f8",
+    "internal": "<f8",
+    "assignment": "<f8",
+    "total_classes": "<i4",
+}
+
+
+class StringColumn:
+    """Read-only sequence of str over a string table (offsets + UTF-8 bytes)"""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string column index out of range")
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode()
+
+    def tolist(self):
+        """Every value as a list of str (decodes the whole column)"""
+        data = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        return [data[start:end].decode() for start, end in zip(bounds, bounds[1:])]
+
+    def index(self, value):
+        """Position of value in a sorted column (binary search), else ValueError"""
+        position = bisect.bisect_left(self, value)
+        if position == len(self) or self[position] != value:
+            raise ValueError(f"{value!r} is not in the snapshot")
+        return position
+
+
+def _string_table(values):
+    """(offsets, data) arrays for a list of str"""
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+# ============= BUILDING =============
+
+def _read_columns(conn):
+    """(table versions, {column: array}) from one consistent read of conn"""
+    conn.execute("BEGIN")
+    try:
+        versions = dict(conn.execute("SELECT name, version FROM table_versions").fetchall())
+        students = conn.execute("SELECT id, usn, name, age FROM students ORDER BY usn").fetchall()
+        subjects = conn.execute("SELECT code, name FROM subjects ORDER BY code").fetchall()
+        scores = conn.execute("""
+            SELECT usn, subject_code, attendance, internal, assignment, total_classes
+            FROM student_subject_scores ORDER BY usn, subject_code
+        """).fetchall()
+    finally:
+        conn.rollback()
+
+    ids, usns, names, ages = zip(*students) if students else ((), (), (), ())
+    codes, subject_names = zip(*subjects) if subjects else ((), ())
+    student_index = {usn: i for i, usn in enumerate(usns)}
+    subject_index = {code: i for i, code in enumerate(codes)}
+    # Scores of a student or subject that no longer exists have no row to point at
+    scores = [row for row in scores if row[0] in student_index and row[1] in subject_index]
+
+    columns = {
+        "student_id": np.array(ids, dtype=np.int64),
+        "age": np.array(ages, dtype=np.int32),
+        "score_student": np.array([student_index[row[0]] for row in scores], dtype=np.int32),
+        "score_subject": np.array([subject_index[row[1]] for row in scores], dtype=np.int32),
+    }
+    for name, values in (("usn", usns), ("name", names),
+                         ("subject_code", codes), ("subject_name", subject_names)):
+        columns[f"{name}.offsets"], columns[f"{name}.data"] = _string_table(values)
+    for position, name in enumerate(("attendance", "internal", "assignment", "total_classes"), 2):
+        columns[name] = np.array([row[position] for row in scores], dtype=COLUMNS[name])
+    # Scores are sorted by student: student i's are score_start[i]:score_start[i + 1]
+    columns["score_start"] = np.searchsorted(
+        columns["score_student"], np.arange(len(usns) + 1)
+    ).astype(np.uint64)
+    return {table: versions[table] for table in VERSIONED_TABLES}, columns
+
+
+@instrumented(rows=None)
+def build_snapshot(path=SNAPSHOT_PATH):
+    """
+    Export students and scores to path, replacing it atomically
+
+    Returns:
+        The table versions the snapshot was built from
+    """
+    path = Path(path)
+    with connection() as conn:
+        versions, columns = _read_columns(conn)
+
+    header = {"versions": versions, "columns": {}}
+    offset = 0
+    for name, dtype in COLUMNS.items():
+        array = columns[name]
+        header["columns"][name] = [dtype, offset, len(array)]
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header_bytes = json.dumps(header).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+            for name, (dtype, column_offset, length) in header["columns"].items():
+                f.seek(data_start + column_offset)
+                f.write(columns[name].astype(dtype, copy=False).tobytes())
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    logger.info("Built roster snapshot %s: %d students, %d scores",
+                path, len(columns["student_id"]), len(columns["score_student"]))
+    return versions
+
+
+# ============= READING =============
+
+class RosterSnapshot:
+    """
+    A snapshot file mapped read-only; every column is a NumPy view of it
+
+    Students: student_id, age, usn, name (StringColumn), score_start.
+    Subjects: subject_code, subject_name (StringColumn).
+    Scores: score_student and score_subject (row numbers into the above),
+    attendance, internal, assignment, total_classes.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # The file it was opened from, to notice when it has been replaced
+        self.file_id = (stat.st_ino, stat.st_mtime_ns)
+        self.size = stat.st_size
+
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a roster snapshot")
+        (header_length,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+        header_end = len(MAGIC) + 8 + header_length
+        header = json.loads(buffer[len(MAGIC) + 8:header_end])
+        data_start = -(-header_end // ALIGNMENT) * ALIGNMENT
+
+        self.versions = header["versions"]
+        columns = {
+            name: np.frombuffer(buffer, dtype=dtype, count=length, offset=data_start + offset)
+            for name, (dtype, offset, length) in header["columns"].items()
+        }
+        for name in ("usn", "name", "subject_code", "subject_name"):
+            setattr(self, name, StringColumn(columns.pop(f"{name}.offsets"),
+                                             columns.pop(f"{name}.data")))
+        self.__dict__.update(columns)
+        # No close(): the mapping is released with the last view of it
+
+    def __len__(self):
+        return len(self.student_id)
+
+    def student_scores(self, usn):
+        """Row numbers of a student's scores (empty if the USN isn't there)"""
+        try:
+            index = self.usn.index(usn)
+        except ValueError:
+            return np.arange(0)
+        return np.arange(int(self.score_start[index]), int(self.score_start[index + 1]))
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def _mapped():
+    """The file at SNAPSHOT_PATH, mapped again only if it was replaced"""
+    global _snapshot
+    try:
+        stat = os.stat(SNAPSHOT_PATH)
+    except FileNotFoundError:
+        return None
+    if _snapshot is None or _snapshot.file_id != (stat.st_ino, stat.st_mtime_ns):
+        try:
+            _snapshot = RosterSnapshot(SNAPSHOT_PATH)
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable roster snapshot %s", SNAPSHOT_PATH, exc_info=True)
+            return None
+    return _snapshot
+
+
+def _covers(snapshot, versions):
+    # Exactly equal: version counters start at random values, so a newer
+    # snapshot may just as well come from a deleted and recreated database
+    return snapshot is not None and all(
+        snapshot.versions.get(table) == version for table, version in versions.items()
+    )
+
+
+def current():
+    """
+    The roster snapshot, rebuilt first if the database changed since
+
+    Costs one table_versions lookup when the mapped file is current.
+    Blocks (reads the whole roster) when it has to rebuild: call it off
+    the event loop.
+    """
+    versions = dict(zip(VERSIONED_TABLES, get_table_versions(*VERSIONED_TABLES)))
+    snapshot = _snapshot
+    if _covers(snapshot, versions):
+        return snapshot
+    with _lock:
+        snapshot = _mapped()
+        if not _covers(snapshot, versions):
+            # One process rebuilds; the others wait, then map its file
+            with file_lock(f"{SNAPSHOT_PATH}.lock"):
+                snapshot = _mapped()
+                if not _covers(snapshot, versions):
+                    build_snapshot(SNAPSHOT_PATH)
+                    snapshot = _mapped()
+        return snapshot
+
+
+# ============= COHORT WORK =============
+
+def score_students(snapshot, model):
+    """
+    Every scored student's predicted score and risk level, from the
+    average of their per-subject scores under model
+
+    Returns:
+        (student row numbers, scores rounded to 2 decimals, risk levels)
+    """
+    from prediction import risk_levels
+
+    counts = np.diff(snapshot.score_start).astype(np.intp)
+    scores = np.asarray(model.score(snapshot.attendance, snapshot.internal, snapshot.assignment),
+                        dtype=np.float64).reshape(-1)
+    totals = np.bincount(snapshot.score_student, weights=scores, minlength=len(snapshot))
+    students = np.flatnonzero(counts)
+    averages = totals[students] / counts[students]
+    return students, np.round(averages, 2), risk_levels(averages, model.low, model.medium)
+
+
+if __name__ == "__main__":
+    versions = build_snapshot()
+    snapshot = RosterSnapshot()
+    print(f"✅ Built {SNAPSHOT_PATH}: {len(snapshot)} students, "
+          f"{len(snapshot.score_student)} scores, {snapshot.size / 1024:.0f} KiB ({versions})")
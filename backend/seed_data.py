@@ -0,0 +1,167 @@
+"""
+Demo Student Data
+=================
+
+Sample students with per-subject performance. With DEMO_DATA=1 set,
+subject_scores.load_demo_data() copies them into the database the first
+time the server starts (never over existing students), and
+auth.load_demo_accounts() turns the passwords below (students and
+admins) into hashed logins.
+"""
+
+# Demo admin logins
+ADMIN_CREDENTIALS = {
+    "admin@example.com": "admin123",
+    "test@test.com": "password"
+}
+
+# Hardcoded student credentials and data
+STUDENT_DATA = {
+    "1CR23AD106": {
+        "password": "student123",
+        "name": "Samridh Hada",
+        "usn": "1CR23AD106",
+        "age": 20,
+        "profile_picture": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='80' height='80'%3E%3Crect fill='%237c3aed' width='80' height='80'/%3E%3Ctext x='50%25' y='50%25' dominant-baseline='middle' text-anchor='middle' font-family='sans-serif' font-size='32' fill='white'%3ESH%3C/text%3E%3C/svg%3E",
+        "subjects": [
+            {
+                "name": "Data Structures",
+                "code": "CS301",
+                "attendance": 85,
+                "internal": 22,
+                "assignment": 23,
+                "totalClasses": 40
+            },
+            {
+                "name": "Operating Systems",
+                "code": "CS302",
+                "attendance": 90,
+                "internal": 20,
+                "assignment": 21,
+                "totalClasses": 40
+            },
+            {
+                "name": "Database Management",
+                "code": "CS303",
+                "attendance": 78,
+                "internal": 18,
+                "assignment": 19,
+                "totalClasses": 40
+            },
+            {
+                "name": "Computer Networks",
+                "code": "CS304",
+                "attendance": 92,
+                "internal": 24,
+                "assignment": 24,
+                "totalClasses": 40
+            },
+            {
+                "name": "Software Engineering",
+                "code": "CS305",
+                "attendance": 88,
+                "internal": 21,
+                "assignment": 22,
+                "totalClasses": 40
+            }
+        ]
+    },
+    "1CR23AD107": {
+        "password": "student123",
+        "name": "Rahul Kumar",
+        "usn": "1CR23AD107",
+        "age": 21,
+        "profile_picture": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='80' height='80'%3E%3Crect fill='%2310b981' width='80' height='80'/%3E%3Ctext x='50%25' y='50%25' dominant-baseline='middle' text-anchor='middle' font-family='sans-serif' font-size='32' fill='white'%3ERK%3C/text%3E%3C/svg%3E",
+        "subjects": [
+            {
+                "name": "Data Structures",
+                "code": "CS301",
+                "attendance": 92,
+                "internal": 24,
+                "assignment": 24,
+                "totalClasses": 40
+            },
+            {
+                "name": "Operating Systems",
+                "code": "CS302",
+                "attendance": 88,
+                "internal": 22,
+                "assignment": 23,
+                "totalClasses": 40
+            },
+            {
+                "name": "Database Management",
+                "code": "CS303",
+                "attendance": 85,
+                "internal": 21,
+                "assignment": 22,
+                "totalClasses": 40
+            },
+            {
+                "name": "Computer Networks",
+                "code": "CS304",
+                "attendance": 90,
+                "internal": 23,
+                "assignment": 24,
+                "totalClasses": 40
+            },
+            {
+                "name": "Software Engineering",
+                "code": "CS305",
+                "attendance": 87,
+                "internal": 20,
+                "assignment": 21,
+                "totalClasses": 40
+            }
+        ]
+    },
+    "1CR23AD108": {
+        "password": "student123",
+        "name": "Priya Sharma",
+        "usn": "1CR23AD108",
+        "age": 19,
+        "profile_picture": "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='80' height='80'%3E%3Crect fill='%23f59e0b' width='80' height='80'/%3E%3Ctext x='50%25' y='50%25' dominant-baseline='middle' text-anchor='middle' font-family='sans-serif' font-size='32' fill='white'%3EPS%3C/text%3E%3C/svg%3E",
+        "subjects": [
+            {
+                "name": "Data Structures",
+                "code": "CS301",
+                "attendance": 95,
+                "internal": 25,
+                "assignment": 25,
+                "totalClasses": 40
+            },
+            {
+                "name": "Operating Systems",
+                "code": "CS302",
+                "attendance": 93,
+                "internal": 24,
+                "assignment": 24,
+                "totalClasses": 40
+            },
+            {
+                "name": "Database Management",
+                "code": "CS303",
+                "attendance": 91,
+                "internal": 23,
+                "assignment": 24,
+                "totalClasses": 40
+            },
+            {
+                "name": "Computer Networks",
+                "code": "CS304",
+                "attendance": 94,
+                "internal": 25,
+                "assignment": 25,
+                "totalClasses": 40
+            },
+            {
+                "name": "Software Engineering",
+                "code": "CS305",
+                "attendance": 96,
+                "internal": 24,
+                "assignment": 25,
+                "totalClasses": 40
+            }
+        ]
+    }
+}
@@ -0,0 +1,74 @@
+"""
+Production Server
+=================
+
+Runs the API in several worker processes sharing one SQLite database:
+
+    python serve.py --workers 4 --host 0.0.0.0 --port 8000
+
+- the schema is created / migrated once, here, before any worker starts
+  (workers that find it current skip initialization; see
+  database.ensure_database)
+- the database runs in WAL mode, so readers never block the writer, and
+  every connection waits up to STUDENTS_DB_BUSY_TIMEOUT_MS for another
+  process's write lock instead of failing with "database is locked"
+- GET /healthz (liveness) and GET /readyz (readiness) are meant for the
+  process manager / load balancer
+
+Each worker keeps its own connection pool, student cache and metrics.
+Listing ETags come from the database, so they agree across workers, and
+cached students are checked against the database's table versions, so a
+write through one worker is seen by the next read through any other
+(benchmarks/bench_workers.py checks this).
+
+Defaults: WEB_CONCURRENCY workers (else one per CPU), 127.0.0.1:8000.
+For development use `python main.py` (one process, auto-reload).
+"""
+
+import argparse
+import logging
+import os
+
+import app_logging
+
+logger = logging.getLogger("serve")
+
+
+def default_workers():
+    return int(os.environ.get("WEB_CONCURRENCY", 0)) or os.cpu_count() or 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--app", default="main:app", help="ASGI app to serve (module:attribute)")
+    parser.add_argument("--access-log", action="store_true", help="log every request")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="seconds to let in-flight requests finish on shutdown")
+    args = parser.parse_args(argv)
+
+    app_logging.configure_logging()
+    import database
+    import uvicorn
+
+    database.ensure_database()
+    logger.info("Database %s at schema version %d", database.DB_FILE, database.schema_version())
+    logger.info("Serving %s on %s:%d with %d worker(s)", args.app, args.host, args.port, args.workers)
+    # Workers are separate processes: flush and stop our log writer thread first
+    app_logging.stop_logging()
+
+    uvicorn.run(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        access_log=args.access_log,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
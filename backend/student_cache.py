@@ -0,0 +1,361 @@
+"""
+Student Read Cache
+==================
+
+Read-through cache in front of the student_operations lookups that the
+portal repeats constantly:
+
+- get_student_by_usn
+- get_student_picture_info
+- subject_scores.get_student_performance_json
+
+Every process keeps a bounded LRU with a TTL. With STUDENT_CACHE_URL
+set, misses also go through a shared backend before SQLite:
+
+    STUDENT_CACHE_URL=redis://localhost:6379/0    (needs redis-py)
+    STUDENT_CACHE_URL=memory://                   in-process stand-in
+
+Every entry records the table versions (see TABLE VERSIONS in
+database.py) it was read under, and a lookup first reads the current
+ones (one primary-key lookup): an entry from other versions is a miss.
+So a write in any process, another worker's included, is seen by the
+next lookup everywhere, not after STUDENT_CACHE_TTL. Writes go through
+write_queue.py, which also calls invalidate() for each USN it wrote once
+the batch commits; the bulk import and demo data wrappers below drop
+everything.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import bulk_students
+import student_operations
+import subject_scores
+
+STUDENT_CACHE_ENTRIES = int(os.environ.get("STUDENT_CACHE_ENTRIES", 10000))
+STUDENT_CACHE_TTL = float(os.environ.get("STUDENT_CACHE_TTL", 60))
+STUDENT_CACHE_URL = os.environ.get("STUDENT_CACHE_URL")
+
+KEY_PREFIX = "students:"
+
+
+class LRUCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, max_entries=STUDENT_CACHE_ENTRIES, ttl=STUDENT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a read that started before one
+        # doesn't store its (possibly stale) result
+        self.generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key, count_miss=True):
+        """(True, value) for a live entry, else (False, None)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            if count_miss:
+                self.misses += 1
+            return False, None
+
+    def set(self, key, value, generation=None):
+        """Store value, unless an invalidation happened since generation"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# ============= SHARED BACKENDS =============
+# Values are stored as JSON text; get() returns None for a missing key.
+
+class MemoryBackend:
+    """Dict-based stand-in for a shared cache (tests and local development)"""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def clear(self, prefix):
+        with self._lock:
+            for key in [key for key in self._values if key.startswith(prefix)]:
+                del self._values[key]
+
+
+class RedisBackend:
+    """Shared cache in Redis (pip install redis)"""
+
+    def __init__(self, url):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._redis.get(key)
+        return value.decode() if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._redis.set(key, value, ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self._redis.delete(*keys)
+
+    def clear(self, prefix):
+        for keys in _chunks(self._redis.scan_iter(match=prefix + "*", count=1000), 1000):
+            self._redis.delete(*keys)
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def make_backend(url):
+    """Shared backend for a STUDENT_CACHE_URL, or None"""
+    if not url:
+        return None
+    if url.startswith("memory:"):
+        return MemoryBackend()
+    if url.startswith(("redis:", "rediss:", "unix:")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported STUDENT_CACHE_URL: {url}")
+
+
+local = LRUCache()
+shared = make_backend(STUDENT_CACHE_URL)
+_shared_counts = {"hits": 0, "misses": 0, "errors": 0}
+_shared_lock = threading.Lock()
+
+
+def _count(name):
+    with _shared_lock:
+        _shared_counts[name] += 1
+
+
+def _key(kind, usn):
+    return f"{KEY_PREFIX}{kind}:{usn}"
+
+
+def _keys(usn):
+    return [_key(kind, usn) for kind in ("student", "picture", "performance")]
+
+
+def peek(kind, usn):
+    """
+    Look in the local LRU only: (True, (versions, value)) on a hit
+
+    Cheap enough to call on the event loop; a miss isn't counted, since
+    the read-through call that follows counts it. The caller compares the
+    entry's versions with the current ones.
+    """
+    return local.get(_key(kind, usn), count_miss=False)
+
+
+def _read_through(kind, usn, load, decode=lambda value: value, valid=lambda value: True):
+    key = _key(kind, usn)
+    found, value = local.get(key)
+    if found and valid(value):
+        return value
+
+    generation = local.generation
+    if shared is not None:
+        try:
+            text = shared.get(key)
+        except Exception:
+            text = None
+            _count("errors")
+        value = decode(json.loads(text)) if text is not None else None
+        if value is not None and valid(value):
+            _count("hits")
+            local.set(key, value, generation)
+            return value
+        _count("misses")
+
+    value = load(usn)
+    local.set(key, value, generation)
+    if shared is not None and local.generation == generation:
+        try:
+            shared.set(key, json.dumps(value), local.ttl)
+        except Exception:
+            _count("errors")
+    return value
+
+
+def _tuple(value):
+    return tuple(value) if value is not None else None
+
+
+def _versioned(decode=lambda value: value):
+    """Decoder of a (versions, value) entry coming back from JSON"""
+    return lambda entry: (tuple(entry[0]), decode(entry[1]))
+
+
+def _student(value):
+    return student_operations.Student._make(value) if value is not None else None
+
+
+def _read_versioned(kind, usn, load, decode, versions, tables=("students",)):
+    """
+    _read_through for an entry that is only valid under the given table
+    versions (read now if None); returns the value
+    """
+    if versions is None:
+        versions = student_operations.get_table_versions(*tables)
+    versions = tuple(versions)
+    entry = _read_through(
+        kind, usn,
+        lambda usn: (versions, load(usn)),
+        _versioned(decode),
+        valid=lambda entry: entry[0] == versions,
+    )
+    return entry[1]
+
+
+def invalidate(usn):
+    """Drop every cached entry for a USN"""
+    keys = _keys(usn)
+    local.delete(*keys)
+    if shared is not None:
+        try:
+            shared.delete(*keys)
+        except Exception:
+            _count("errors")
+
+
+def invalidate_all():
+    local.clear()
+    if shared is not None:
+        try:
+            shared.clear(KEY_PREFIX)
+        except Exception:
+            _count("errors")
+
+
+def stats():
+    """Hit/miss/eviction counters for the local LRU (and the shared backend)"""
+    result = {"local": local.stats()}
+    if shared is not None:
+        with _shared_lock:
+            result["shared"] = {"backend": type(shared).__name__, **_shared_counts}
+    return result
+
+
+# ============= CACHED READS =============
+
+def get_student_by_usn(usn, versions=None):
+    """
+    Cached student_operations.get_student_by_usn
+    
+    versions: the current ("students",) table versions, if the caller
+    already read them
+    """
+    return _read_versioned("student", usn, student_operations.get_student_by_usn,
+                           _student, versions)
+
+
+def get_student_picture_info(usn, versions=None):
+    """
+    Cached student_operations.get_student_picture_info
+    
+    versions: the current ("students",) table versions, if the caller
+    already read them. A student's picture is a column of students, so
+    changing (and releasing) it bumps that version too.
+    """
+    return _read_versioned("picture", usn, student_operations.get_student_picture_info,
+                           _tuple, versions)
+
+
+def get_student_performance_json(usn, versions=None):
+    """
+    Cached subject_scores.get_student_performance_json
+    
+    versions are the PERFORMANCE_TABLES versions the caller's ETag comes
+    from (read now if None), so the document always matches the ETag
+    sent with it.
+    """
+    return _read_versioned("performance", usn, subject_scores.get_student_performance_json,
+                           lambda value: value, versions, subject_scores.PERFORMANCE_TABLES)
+
+
+# ============= INVALIDATING WRITES =============
+
+def import_batch(batch, upsert, result):
+    """bulk_students.import_batch, then drop the whole cache"""
+    try:
+        return bulk_students.import_batch(batch, upsert, result)
+    finally:
+        invalidate_all()
+
+
+def load_demo_data():
+    """subject_scores.load_demo_data, then drop the whole cache"""
+    try:
+        return subject_scores.load_demo_data()
+    finally:
+        invalidate_all()
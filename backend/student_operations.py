@@ -7,14 +7,92 @@ on the students database.
 """
 
 import sqlite3
-from database import get_connection, DB_FILE
+from database import DB_FILE
+from connection_pool import connection
+from metrics import BLOB_BYTES_READ, instrumented
+from picture_store import (
+    discard_picture,
+    finish_picture,
+    load_picture_range,
+    read_picture,
+    store_picture,
+    store_picture_stream,
+)
+from thumbnails import schedule_thumbnails
 import base64
+import functools
+import logging
+from collections import namedtuple
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round-trip when streaming large result sets
+STREAM_BATCH_SIZE = 500
+
+# Typo-tolerant search: index entries read to collect candidates and
+# minimum word trigram similarity (shared / total distinct trigrams)
+FUZZY_MAX_POSTINGS = 2000
+FUZZY_MIN_SIMILARITY = 0.3
+
+
+# ============= ROW TYPES =============
+# Reads return named tuples: s[1] keeps working, s.usn reads better and
+# s._asdict() is the JSON object the endpoints send
+
+Student = namedtuple("Student", "id usn name age created_at")
+SearchResult = namedtuple("SearchResult", "id usn name age")
+
+
+def _row_factory(row_type):
+    """sqlite3 row_factory building row_type tuples"""
+    make = row_type._make
+    return lambda cursor, row: make(row)
+
+
+STUDENT_ROW = _row_factory(Student)
+SEARCH_ROW = _row_factory(SearchResult)
+
 
 # ============= CREATE OPERATIONS =============
 
-def add_student(usn, name, age, profile_picture_path=None):
+def picture_bytes(profile_picture, profile_picture_path):
+    """Image data from bytes / a file-like object, or else from a file path"""
+    if profile_picture is None and profile_picture_path:
+        with open(profile_picture_path, 'rb') as f:
+            return read_picture(f)
+    return read_picture(profile_picture)
+
+
+@instrumented(rows=None)
+def insert_student(conn, usn, name, age, picture_data=None):
+    """
+    INSERT a student on conn without committing (see add_student)
+    
+    Returns:
+        (student_id, picture_sha256)
+    
+    Raises:
+        sqlite3.IntegrityError if the USN is already taken
+    """
+    picture_sha256 = None
+    if picture_data:
+        picture_sha256 = store_picture(conn, picture_data)
+    cursor = conn.execute("""
+        INSERT INTO students (usn, name, age, picture_sha256, picture_updated_at)
+        VALUES (?, ?, ?, ?, CASE WHEN ? IS NULL THEN NULL ELSE CURRENT_TIMESTAMP END)
+    """, (usn, name, age, picture_sha256, picture_sha256))
+    return cursor.lastrowid, picture_sha256
+
+
+def student_added(usn, student_id, picture_sha256):
+    """Work left once an insert_student is committed"""
+    schedule_thumbnails(picture_sha256)
+    logger.info("Added student %s (id %d)", usn, student_id)
+
+
+@instrumented(rows=None)
+def add_student(usn, name, age, profile_picture_path=None, profile_picture=None):
     """
     Add a new student to the database
     
@@ -23,86 +101,139 @@ def add_student(usn, name, age, profile_picture_path=None):
         name: Student's full name
         age: Student's age
         profile_picture_path: Path to image file (optional)
+        profile_picture: Image as bytes or a binary file object (optional,
+            used instead of profile_picture_path)
     
     Returns:
         The ID of the newly created student
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # Read the image file if provided
-    profile_pic_data = None
-    if profile_picture_path:
-        with open(profile_picture_path, 'rb') as f:
-            profile_pic_data = f.read()
-    
-    try:
-        cursor.execute("""
-            INSERT INTO students (usn, name, age, profile_picture)
-            VALUES (?, ?, ?, ?)
-        """, (usn, name, age, profile_pic_data))
-        
-        conn.commit()
-        student_id = cursor.lastrowid
-        print(f"✅ Student added successfully! ID: {student_id}")
-        return student_id
-        
-    except sqlite3.IntegrityError:
-        print(f"❌ Error: Student with USN '{usn}' already exists!")
-        return None
-        
-    finally:
-        conn.close()
+    # Read the image if provided
+    profile_pic_data = picture_bytes(profile_picture, profile_picture_path)
+    
+    with connection() as conn:
+        try:
+            student_id, picture_sha256 = insert_student(conn, usn, name, age, profile_pic_data)
+            conn.commit()
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            logger.info("Student with USN %s already exists", usn)
+            return None
+    
+    student_added(usn, student_id, picture_sha256)
+    return student_id
 
 
 # ============= READ OPERATIONS =============
 
+@instrumented
 def get_all_students():
     """Get all students from the database (without images for speed)"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT id, usn, name, age, created_at 
-        FROM students
-        ORDER BY created_at DESC
-    """)
-    
-    students = cursor.fetchall()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = STUDENT_ROW
+        cursor.execute("""
+            SELECT id, usn, name, age, created_at 
+            FROM students
+            ORDER BY created_at DESC
+        """)
+        students = cursor.fetchall()
     
-    print(f"\n📚 Total students: {len(students)}")
-    for student in students:
-        print(f"  ID: {student[0]} | USN: {student[1]} | Name: {student[2]} | Age: {student[3]}")
+    logger.debug("Listed %d students", len(students))
     
     return students
 
 
-def get_student_by_usn(usn):
-    """Get a specific student by their USN"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
+def encode_cursor(created_at, student_id):
+    """Turn the sort key of the last row on a page into an opaque cursor"""
+    return base64.urlsafe_b64encode(f"{created_at}|{student_id}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        created_at, student_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return created_at, int(student_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _students_before(limit, key=None):
+    """Up to limit students ordered before key ((created_at, id); None: from the newest)"""
+    query = """
         SELECT id, usn, name, age, created_at
         FROM students
-        WHERE usn = ?
-    """, (usn,))
+    """
+    params = []
+    if key:
+        query += " WHERE (created_at, id) < (?, ?)"
+        params.extend(key)
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = STUDENT_ROW
+        return cursor.execute(query, params).fetchall()
+
+
+@instrumented(rows=lambda result: len(result[0]))
+def get_students_page(limit=50, cursor=None):
+    """
+    Get one page of students, newest first, using keyset pagination
     
-    student = cursor.fetchone()
-    conn.close()
+    Args:
+        limit: Maximum number of students to return
+        cursor: next_cursor from the previous page (None for the first page)
     
-    if student:
-        print(f"\n👤 Found student:")
-        print(f"   USN: {student[1]}")
-        print(f"   Name: {student[2]}")
-        print(f"   Age: {student[3]}")
-        return student
-    else:
-        print(f"❌ No student found with USN: {usn}")
-        return None
+    Returns:
+        (students, next_cursor) - next_cursor is None on the last page
+    """
+    students = _students_before(limit, decode_cursor(cursor) if cursor else None)
+    
+    next_cursor = None
+    if len(students) == limit:
+        last = students[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return students, next_cursor
+
+
+def iter_students(batch_size=STREAM_BATCH_SIZE):
+    """
+    Yield every student, newest first, without loading the table into memory
+    
+    Reads keyset batches of batch_size (like get_students_page), taking a
+    pooled connection only while a batch is read, so a slow download
+    doesn't hold one. Students added during the download are newer than
+    the cursor and not included.
+    """
+    key = None
+    while True:
+        students = _students_before(batch_size, key)
+        yield from students
+        if len(students) < batch_size:
+            return
+        key = (students[-1].created_at, students[-1].id)
+
 
+@instrumented
+def get_student_by_usn(usn):
+    """Get a specific student by their USN"""
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = STUDENT_ROW
+        cursor.execute("""
+            SELECT id, usn, name, age, created_at
+            FROM students
+            WHERE usn = ?
+        """, (usn,))
+        student = cursor.fetchone()
+    
+    if student is None:
+        logger.debug("No student found with USN %s", usn)
+    return student
 
+
+@instrumented(rows=lambda result: int(result is not None))
 def get_student_profile_picture(usn, save_path=None):
     """
     Get a student's profile picture
@@ -114,48 +245,90 @@ def get_student_profile_picture(usn, save_path=None):
     Returns:
         The image data as bytes
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT profile_picture
-        FROM students
-        WHERE usn = ?
-    """, (usn,))
-    
-    result = cursor.fetchone()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT p.data
+            FROM students s
+            JOIN pictures p ON p.sha256 = s.picture_sha256
+            WHERE s.usn = ?
+        """, (usn,))
+        result = cursor.fetchone()
     
     if result and result[0]:
         image_data = result[0]
+        BLOB_BYTES_READ.inc("pictures", amount=len(image_data))
         
         # Save to file if path provided
         if save_path:
             with open(save_path, 'wb') as f:
                 f.write(image_data)
-            print(f"✅ Profile picture saved to: {save_path}")
+            logger.info("Saved profile picture of %s to %s", usn, save_path)
         
         return image_data
     else:
-        print(f"❌ No profile picture found for USN: {usn}")
+        logger.debug("No profile picture found for USN %s", usn)
         return None
 
 
-# ============= UPDATE OPERATIONS =============
+@instrumented
+def get_student_picture_info(usn):
+    """
+    Get a student's picture metadata without reading the image itself
+    
+    Returns:
+        (sha256, content_type, size, updated_at) or None if the student
+        has no picture. updated_at is when this student's picture was set.
+    """
+    with connection() as conn:
+        return conn.execute("""
+            SELECT p.sha256, p.content_type, p.size,
+                   COALESCE(s.picture_updated_at, s.created_at)
+            FROM students s
+            JOIN pictures p ON p.sha256 = s.picture_sha256
+            WHERE s.usn = ?
+        """, (usn,)).fetchone()
+
+
+@instrumented(rows=lambda result: int(result is not None))
+def get_picture_bytes(sha256, start=0, length=None):
+    """Read a picture (or a byte range of it) by its hash"""
+    with connection() as conn:
+        return load_picture_range(conn, sha256, start, length)
+
 
-def update_student(usn, name=None, age=None, profile_picture_path=None):
+def get_table_versions(*tables):
     """
-    Update student information
+    Current change counters of tables (see TABLE VERSIONS in database.py)
     
-    Args:
-        usn: Student's USN (to identify which student)
-        name: New name (optional)
-        age: New age (optional)
-        profile_picture_path: New image path (optional)
+    A single primary-key lookup: cheap enough to run before deciding
+    whether a listing needs to be queried at all.
+    
+    Returns:
+        Tuple of versions, in the order of tables
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with connection() as conn:
+        versions = dict(conn.execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({', '.join('?' * len(tables))})",
+            tables
+        ).fetchall())
+    return tuple(versions[table] for table in tables)
+
+
+# ============= UPDATE OPERATIONS =============
+
+@instrumented(rows=None)
+def apply_student_update(conn, usn, name=None, age=None, picture_data=None):
+    """
+    UPDATE a student on conn without committing (see update_student)
+    
+    A new picture is only stored when the student exists, so call this
+    inside a write transaction (BEGIN IMMEDIATE) or roll back when no row
+    was updated.
     
+    Returns:
+        (rows_affected, picture_sha256), or None if there is nothing to update
+    """
     # Build the update query dynamically based on what's provided
     updates = []
     params = []
@@ -168,76 +341,289 @@ def update_student(usn, name=None, age=None, profile_picture_path=None):
         updates.append("age = ?")
         params.append(age)
     
-    if profile_picture_path:
-        with open(profile_picture_path, 'rb') as f:
-            image_data = f.read()
-        updates.append("profile_picture = ?")
-        params.append(image_data)
+    if picture_data:
+        updates.append("picture_sha256 = ?")
+        updates.append("picture_updated_at = CURRENT_TIMESTAMP")
     
     if not updates:
-        print("❌ No fields to update!")
-        return False
+        return None
+    
+    picture_sha256 = None
+    if picture_data:
+        if conn.execute("SELECT 1 FROM students WHERE usn = ?", (usn,)).fetchone() is None:
+            return 0, None
+        picture_sha256 = store_picture(conn, picture_data)
+        params.append(picture_sha256)
     
     # Add USN to params for the WHERE clause
     params.append(usn)
     
-    query = f"UPDATE students SET {', '.join(updates)} WHERE usn = ?"
-    cursor.execute(query, params)
-    
-    conn.commit()
-    rows_affected = cursor.rowcount
-    conn.close()
-    
+    cursor = conn.execute(f"UPDATE students SET {', '.join(updates)} WHERE usn = ?", params)
+    return cursor.rowcount, picture_sha256
+
+
+def student_updated(usn, outcome):
+    """Log the result of an apply_student_update and return update_student's bool"""
+    if outcome is None:
+        logger.debug("Nothing to update for %s", usn)
+        return False
+    rows_affected, picture_sha256 = outcome
     if rows_affected > 0:
-        print(f"✅ Student {usn} updated successfully!")
+        schedule_thumbnails(picture_sha256)
+        logger.info("Updated student %s", usn)
         return True
-    else:
-        print(f"❌ No student found with USN: {usn}")
-        return False
+    logger.info("Update failed, no student found with USN %s", usn)
+    return False
 
 
-# ============= DELETE OPERATIONS =============
+@instrumented(rows=None)
+def update_student(usn, name=None, age=None, profile_picture_path=None, profile_picture=None):
+    """
+    Update student information
+    
+    Args:
+        usn: Student's USN (to identify which student)
+        name: New name (optional)
+        age: New age (optional)
+        profile_picture_path: New image path (optional)
+        profile_picture: New image as bytes or a binary file object (optional)
+    """
+    image_data = picture_bytes(profile_picture, profile_picture_path)
+    with connection() as conn:
+        outcome = apply_student_update(conn, usn, name, age, image_data)
+        if outcome and outcome[0] > 0:
+            conn.commit()
+        else:
+            conn.rollback()  # don't keep a picture nobody references
+    return student_updated(usn, outcome)
 
-def delete_student(usn):
-    """Delete a student from the database"""
-    conn = get_connection()
-    cursor = conn.cursor()
+
+@instrumented(rows=None)
+def set_student_picture(usn, fileobj, size):
+    """
+    Replace a student's profile picture by streaming it from a file object
     
-    cursor.execute("DELETE FROM students WHERE usn = ?", (usn,))
+    The picture is copied into the database in chunks (see
+    picture_store.store_picture_stream), so it is never held in memory
+    as a whole.
     
-    conn.commit()
-    rows_affected = cursor.rowcount
-    conn.close()
+    Args:
+        usn: Student's USN
+        fileobj: Binary file-like object positioned at the start
+        size: Number of bytes in the picture
     
-    if rows_affected > 0:
-        print(f"✅ Student {usn} deleted successfully!")
-        return True
-    else:
-        print(f"❌ No student found with USN: {usn}")
+    Returns:
+        True if the student exists and the picture was stored
+    """
+    with connection() as conn:
+        picture_sha256 = store_picture_stream(conn, fileobj, size)
+        cursor = conn.execute(
+            """
+            UPDATE students SET picture_sha256 = ?, picture_updated_at = CURRENT_TIMESTAMP
+            WHERE usn = ?
+            """,
+            (picture_sha256, usn)
+        )
+        if cursor.rowcount > 0:
+            conn.commit()
+            schedule_thumbnails(picture_sha256)
+            logger.info("Updated profile picture of %s (%d bytes)", usn, size)
+            return True
+        conn.rollback()
+    
+    logger.info("Picture upload failed, no student found with USN %s", usn)
+    return False
+
+
+@instrumented(rows=None)
+def attach_picture(conn, usn, rowid, sha256, content_type, size, tail=b""):
+    """
+    Finish a picture streamed into a placeholder row (see
+    picture_store.begin_picture) and make it usn's picture, on conn
+    without committing; the placeholder is dropped if there is no such
+    student
+    
+    Returns:
+        The picture's sha256, or None if the student doesn't exist
+    """
+    if conn.execute("SELECT 1 FROM students WHERE usn = ?", (usn,)).fetchone() is None:
+        discard_picture(conn, rowid)
+        return None
+    picture_sha256 = finish_picture(conn, rowid, sha256, content_type, size, tail)
+    conn.execute("""
+        UPDATE students SET picture_sha256 = ?, picture_updated_at = CURRENT_TIMESTAMP
+        WHERE usn = ?
+    """, (picture_sha256, usn))
+    return picture_sha256
+
+
+def picture_attached(usn, picture_sha256, size):
+    """Work left once an attach_picture is committed; returns whether the student existed"""
+    if picture_sha256 is None:
+        logger.info("Picture upload failed, no student found with USN %s", usn)
         return False
+    schedule_thumbnails(picture_sha256)
+    logger.info("Updated profile picture of %s (%d bytes)", usn, size)
+    return True
+
+
+# ============= DELETE OPERATIONS =============
+
+@instrumented(rows=None)
+def remove_student(conn, usn):
+    """DELETE a student on conn without committing; returns True if there was one"""
+    return conn.execute("DELETE FROM students WHERE usn = ?", (usn,)).rowcount > 0
+
+
+def student_removed(usn, deleted):
+    """Log the result of a remove_student and return it"""
+    if deleted:
+        logger.info("Deleted student %s", usn)
+    else:
+        logger.info("Delete failed, no student found with USN %s", usn)
+    return deleted
+
+
+def delete_student(usn):
+    """Delete a student from the database"""
+    with connection() as conn:
+        deleted = remove_student(conn, usn)
+        conn.commit()
+    return student_removed(usn, deleted)
 
 
 # ============= SEARCH OPERATIONS =============
 
-def search_students_by_name(name_pattern):
-    """Search students by name (partial match)"""
-    conn = get_connection()
-    cursor = conn.cursor()
+def _trigrams(text):
+    """Set of 3-character substrings of each word in text (lower-cased)"""
+    return {
+        word[i:i + 3]
+        for word in text.lower().split()
+        for i in range(len(word) - 2)
+    }
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_trigrams(word):
+    """
+    Trigrams of a single word padded as "  word " (like PostgreSQL's
+    pg_trgm), so word starts and ends count when scoring similarity
+    """
+    word = f"  {word.lower()} "
+    return frozenset(word[i:i + 3] for i in range(len(word) - 2))
+
+
+def _fts_quote(text):
+    """Quote text as an FTS5 string so it is matched literally"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _search_fuzzy(conn, tokens, exclude_ids, limit):
+    """Typo-tolerant fallback: rank names by shared trigrams with the query"""
+    query_grams = list(_trigrams(" ".join(tokens)))
+    if not query_grams:
+        return []
+    token_grams = [_word_trigrams(t) for t in tokens]
+    
+    # Look up the rarest trigrams first and stop once enough index entries
+    # are covered: common trigrams match a large part of the table and
+    # would turn the lookup back into a scan
+    counts = conn.execute(f"""
+        SELECT term, doc FROM students_fts_vocab
+        WHERE term IN ({", ".join("?" * len(query_grams))})
+        ORDER BY doc
+    """, query_grams).fetchall()
+    terms = []
+    postings = 0
+    for term, doc in counts:
+        if terms and postings + doc > FUZZY_MAX_POSTINGS:
+            break
+        terms.append(term)
+        postings += doc
+    if not terms:
+        return []
     
-    cursor.execute("""
-        SELECT id, usn, name, age
-        FROM students
-        WHERE name LIKE ?
-        ORDER BY name
-    """, (f"%{name_pattern}%",))
+    cursor = conn.cursor()
+    cursor.row_factory = SEARCH_ROW
+    candidates = cursor.execute("""
+        SELECT s.id, s.usn, s.name, s.age
+        FROM students_fts
+        JOIN students s ON s.id = students_fts.rowid
+        WHERE students_fts MATCH ?
+    """, (" OR ".join(_fts_quote(term) for term in terms),)).fetchall()
+    
+    scored = []
+    for student in candidates:
+        if student.id in exclude_ids:
+            continue
+        word_grams = [_word_trigrams(w) for w in student.name.split()]
+        # Average over query words of the best match among the name's words
+        similarity = sum(
+            max(len(q & w) / len(q | w) for w in word_grams)
+            for q in token_grams
+        ) / len(token_grams)
+        if similarity >= FUZZY_MIN_SIMILARITY:
+            scored.append((-similarity, student.name, student))
+    scored.sort()
+    return [student for _, _, student in scored[:limit]]
+
+
+@instrumented
+def search_students_by_name(name_pattern, limit=None, fuzzy=True):
+    """
+    Search students by name
     
-    students = cursor.fetchall()
-    conn.close()
+    Every word in name_pattern must appear somewhere in the name (in any
+    order, so prefixes and partial words match). Names starting with the
+    first word are ranked first. Words of 3+ characters are looked up in
+    the trigram index; shorter words are checked with LIKE.
     
-    print(f"\n🔍 Found {len(students)} students matching '{name_pattern}':")
-    for student in students:
-        print(f"  {student[1]} - {student[2]} (Age: {student[3]})")
+    Args:
+        name_pattern: Text typed by the user, e.g. "pri sha"
+        limit: Maximum number of results (None for all matches)
+        fuzzy: If fewer than limit students match exactly (or none match
+            when limit is None), fill up with close, possibly misspelt,
+            matches ranked by similarity
+    """
+    tokens = name_pattern.split()
+    indexed = [t for t in tokens if len(t) >= 3]
+    short = [t for t in tokens if len(t) < 3]
+    sql_limit = -1 if limit is None else limit
+    
+    like_filters = "".join(" AND s.name LIKE ?" for _ in short)
+    like_params = [f"%{t}%" for t in short]
+    prefix = f"{tokens[0]}%" if tokens else "%"
+    
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = SEARCH_ROW
+        if indexed:
+            cursor.execute(f"""
+                SELECT s.id, s.usn, s.name, s.age
+                FROM students_fts
+                JOIN students s ON s.id = students_fts.rowid
+                WHERE students_fts MATCH ?{like_filters}
+                ORDER BY s.name LIKE ? DESC, s.name
+                LIMIT ?
+            """, [" AND ".join(_fts_quote(t) for t in indexed),
+                  *like_params, prefix, sql_limit])
+        else:
+            # Too short for trigrams: plain LIKE scan
+            cursor.execute(f"""
+                SELECT s.id, s.usn, s.name, s.age
+                FROM students s
+                WHERE 1 = 1{like_filters}
+                ORDER BY s.name LIKE ? DESC, s.name
+                LIMIT ?
+            """, [*like_params, prefix, sql_limit])
+        students = cursor.fetchall()
+        
+        wanted = 1 if limit is None else limit
+        if fuzzy and indexed and len(students) < wanted:
+            found = {s.id for s in students}
+            students += _search_fuzzy(conn, tokens, found, wanted - len(students))
     
+    logger.debug("Found %d students matching %r", len(students), name_pattern)
     return students
 
 
@@ -250,29 +636,50 @@ if __name__ == "__main__":
     
     # Example 1: Add students
     print("\n📝 Example 1: Adding students...")
-    add_student("1MS21CS001", "Rahul Kumar", 20)
-    add_student("1MS21CS002", "Priya Sharma", 19)
-    add_student("1MS21CS003", "Amit Patel", 21)
+    for usn, name, age in [("1MS21CS001", "Rahul Kumar", 20),
+                           ("1MS21CS002", "Priya Sharma", 19),
+                           ("1MS21CS003", "Amit Patel", 21)]:
+        student_id = add_student(usn, name, age)
+        if student_id:
+            print(f"✅ Student added successfully! ID: {student_id}")
+        else:
+            print(f"❌ Error: Student with USN '{usn}' already exists!")
     
     # Example 2: View all students
     print("\n" + "=" * 60)
     print("📝 Example 2: Viewing all students...")
-    get_all_students()
+    students = get_all_students()
+    print(f"\n📚 Total students: {len(students)}")
+    for student in students:
+        print(f"  ID: {student[0]} | USN: {student[1]} | Name: {student[2]} | Age: {student[3]}")
     
     # Example 3: Search for a specific student
     print("\n" + "=" * 60)
     print("📝 Example 3: Searching for student by USN...")
-    get_student_by_usn("1MS21CS001")
+    student = get_student_by_usn("1MS21CS001")
+    if student:
+        print(f"\n👤 Found student:")
+        print(f"   USN: {student[1]}")
+        print(f"   Name: {student[2]}")
+        print(f"   Age: {student[3]}")
+    else:
+        print("❌ No student found with USN: 1MS21CS001")
     
     # Example 4: Update student information
     print("\n" + "=" * 60)
     print("📝 Example 4: Updating student age...")
-    update_student("1MS21CS001", age=21)
+    if update_student("1MS21CS001", age=21):
+        print("✅ Student 1MS21CS001 updated successfully!")
+    else:
+        print("❌ No student found with USN: 1MS21CS001")
     
     # Example 5: Search by name
     print("\n" + "=" * 60)
     print("📝 Example 5: Searching students by name...")
-    search_students_by_name("Priya")
+    students = search_students_by_name("Priya")
+    print(f"\n🔍 Found {len(students)} students matching 'Priya':")
+    for student in students:
+        print(f"  {student[1]} - {student[2]} (Age: {student[3]})")
     
     # Example 6: Delete a student
     print("\n" + "=" * 60)
@@ -0,0 +1,161 @@
+"""
+Subject Performance
+===================
+
+Per-subject attendance and marks, stored in the subjects and
+student_subject_scores tables (see database.py), plus a bulk loader.
+
+The student portal's performance document is built by a single joined
+query that uses SQLite's JSON functions, so the JSON text goes straight
+from the database to the HTTP response without a detour through Python
+dicts.
+
+Load a JSON file shaped like seed_data.STUDENT_DATA (a list of students,
+or a dict keyed by USN) from the command line:
+    python subject_scores.py students.json
+"""
+
+import json
+import sys
+
+from connection_pool import connection
+from metrics import instrumented
+
+# Tables PERFORMANCE_QUERY reads (for ETags, see database.VERSIONED_TABLES)
+PERFORMANCE_TABLES = ("students", "subjects", "student_subject_scores")
+
+# One row: {"name", "usn", "age", "profile_picture", "subjects": [...]}
+PERFORMANCE_QUERY = """
+    SELECT json_object(
+        'name', s.name,
+        'usn', s.usn,
+        'age', s.age,
+        'profile_picture', s.avatar_url,
+        'subjects', (
+            SELECT json_group_array(json(subject))
+            FROM (
+                SELECT json_object(
+                    'name', sub.name,
+                    'code', sub.code,
+                    'attendance', sc.attendance,
+                    'internal', sc.internal,
+                    'assignment', sc.assignment,
+                    'totalClasses', sc.total_classes
+                ) AS subject
+                FROM student_subject_scores sc
+                JOIN subjects sub ON sub.code = sc.subject_code
+                WHERE sc.usn = s.usn
+                ORDER BY sc.subject_code
+            )
+        )
+    )
+    FROM students s
+    WHERE s.usn = ?
+"""
+
+
+@instrumented(rows=lambda result: int(result is not None))
+def get_student_performance_json(usn):
+    """
+    Get a student's profile and per-subject performance as JSON text
+
+    Returns:
+        A JSON object string, or None if the student doesn't exist
+    """
+    with connection() as conn:
+        row = conn.execute(PERFORMANCE_QUERY, (usn,)).fetchone()
+    return row[0] if row else None
+
+
+def bulk_load_scores(students, update_existing=True):
+    """
+    Insert or update students, subjects and scores in one transaction
+
+    Args:
+        students: Iterable of dicts shaped like seed_data.STUDENT_DATA values:
+            {"usn", "name", "age", "profile_picture" (optional),
+             "subjects": [{"name", "code", "attendance", "internal",
+                           "assignment", "totalClasses"}, ...]}
+        update_existing: False leaves students already in the database
+            (and their scores) alone
+
+    Returns:
+        (number of students, number of score rows) written
+    """
+    students = list(students)
+    if not update_existing:
+        with connection() as conn:
+            usns = [student["usn"].upper() for student in students]
+            existing = {row[0] for row in conn.execute(
+                f"SELECT usn FROM students WHERE usn IN ({', '.join('?' * len(usns))})", usns
+            )} if usns else set()
+        students = [student for student in students if student["usn"].upper() not in existing]
+
+    student_rows = []
+    subject_rows = {}
+    score_rows = []
+    for student in students:
+        usn = student["usn"].upper()
+        student_rows.append((usn, student["name"], student["age"], student.get("profile_picture")))
+        for subject in student.get("subjects", []):
+            subject_rows[subject["code"]] = (subject["code"], subject["name"])
+            score_rows.append((
+                usn, subject["code"], subject["attendance"], subject["internal"],
+                subject["assignment"], subject["totalClasses"]
+            ))
+
+    with connection() as conn:
+        conn.executemany("""
+            INSERT INTO students (usn, name, age, avatar_url) VALUES (?, ?, ?, ?)
+            ON CONFLICT(usn) DO UPDATE SET
+                name = excluded.name,
+                age = excluded.age,
+                avatar_url = COALESCE(excluded.avatar_url, avatar_url)
+        """ if update_existing else """
+            INSERT INTO students (usn, name, age, avatar_url) VALUES (?, ?, ?, ?)
+            ON CONFLICT(usn) DO NOTHING
+        """, student_rows)
+        conn.executemany("""
+            INSERT INTO subjects (code, name) VALUES (?, ?)
+            ON CONFLICT(code) DO UPDATE SET name = excluded.name
+        """, subject_rows.values())
+        # An upsert rather than INSERT OR REPLACE: REPLACE skips the delete
+        # triggers that keep the analytics tables current
+        conn.executemany("""
+            INSERT INTO student_subject_scores
+                (usn, subject_code, attendance, internal, assignment, total_classes)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(usn, subject_code) DO UPDATE SET
+                attendance = excluded.attendance,
+                internal = excluded.internal,
+                assignment = excluded.assignment,
+                total_classes = excluded.total_classes
+        """, score_rows)
+        conn.commit()
+
+    return len(student_rows), len(score_rows)
+
+
+def load_demo_data():
+    """
+    Load seed_data.STUDENT_DATA unless subject scores already exist
+
+    Only adds students: one whose USN is already taken keeps its name,
+    age and scores.
+    """
+    with connection() as conn:
+        if conn.execute("SELECT 1 FROM student_subject_scores LIMIT 1").fetchone():
+            return 0, 0
+    from seed_data import STUDENT_DATA
+    return bulk_load_scores(STUDENT_DATA.values(), update_existing=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python subject_scores.py students.json")
+    with open(sys.argv[1]) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.values()
+    students, scores = bulk_load_scores(data)
+    print(f"✅ Loaded {students} students and {scores} subject scores")
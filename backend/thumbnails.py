@@ -0,0 +1,210 @@
+"""
+Profile Picture Thumbnails
+==========================
+
+Avatars are shown at about 80px, so shipping the original upload wastes
+bandwidth. This module derives small WebP (or JPEG) thumbnails from the
+pictures in picture_store.py:
+
+- THUMBNAIL_SIZES are generated in a background worker pool as soon as a
+  picture is written, and stored in the picture_thumbnails table
+- a standard size that hasn't been built yet is generated on request
+  (and queued to be stored)
+- any other size is generated on request and kept in a bounded in-memory
+  LRU cache
+- pictures Pillow can't decode (SVG, say) are remembered per picture, so
+  they aren't loaded and decoded again on every request
+
+Thumbnails need Pillow (pip install pillow). Without it every function
+here returns None and the API falls back to the original picture.
+"""
+
+import functools
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from connection_pool import connection
+from metrics import BLOB_BYTES_READ
+from picture_store import load_picture
+
+
+@functools.lru_cache(maxsize=1)
+def _pillow():
+    """(Image, ImageOps, WebP support), imported on first use; None without Pillow"""
+    try:
+        from PIL import Image, ImageOps, features
+    except ImportError:  # Pillow is optional
+        return None
+    return Image, ImageOps, features.check("webp")
+
+
+# Sizes (longest side, in px) generated for every picture and stored
+THUMBNAIL_SIZES = (64, 128, 256)
+
+# Bounds for sizes requested through ?size=
+MIN_THUMBNAIL_SIZE = 16
+MAX_THUMBNAIL_SIZE = 512
+
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", 2))
+THUMBNAIL_CACHE_ENTRIES = int(os.environ.get("THUMBNAIL_CACHE_ENTRIES", 1024))
+
+_workers = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnails")
+
+# (sha256, size) -> (data, content_type)
+_cache = OrderedDict()
+# sha256 of pictures Pillow can't read (SVG, corrupt uploads), at any size
+_undecodable = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def thumbnails_available():
+    """Whether Pillow is installed"""
+    return _pillow() is not None
+
+
+def make_thumbnail(data, size):
+    """
+    Scale an image down so its longest side is at most size pixels
+
+    Returns:
+        (thumbnail bytes, content type), or None if the image can't be read
+    """
+    pillow = _pillow()
+    if pillow is None:
+        return None
+    Image, ImageOps, webp = pillow
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((size, size))
+            output = io.BytesIO()
+            if webp:
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA")
+                image.save(output, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+                return output.getvalue(), "image/webp"
+            image.convert("RGB").save(output, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+            return output.getvalue(), "image/jpeg"
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def _store_thumbnail(conn, sha256, size, thumbnail):
+    data, content_type = thumbnail
+    conn.execute("""
+        INSERT OR IGNORE INTO picture_thumbnails (sha256, size, content_type, data)
+        SELECT ?, ?, ?, ?
+        WHERE EXISTS (SELECT 1 FROM pictures WHERE sha256 = ?)
+    """, (sha256, size, content_type, data, sha256))
+
+
+def build_thumbnails(sha256):
+    """Generate and store every standard size of a picture"""
+    with connection() as conn:
+        existing = {row[0] for row in conn.execute(
+            "SELECT size FROM picture_thumbnails WHERE sha256 = ?", (sha256,)
+        )}
+        missing = [size for size in THUMBNAIL_SIZES if size not in existing]
+        if not missing:
+            return
+        data = load_picture(conn, sha256)
+    if data is None:
+        return  # deleted in the meantime
+
+    thumbnails = {size: _thumbnail_of(sha256, data, size) for size in missing}
+    with connection() as conn:
+        for size, thumbnail in thumbnails.items():
+            if thumbnail:
+                _store_thumbnail(conn, sha256, size, thumbnail)
+        conn.commit()
+
+
+def schedule_thumbnails(sha256):
+    """Build a picture's thumbnails in the background (no-op without Pillow)"""
+    if sha256 and thumbnails_available():
+        _workers.submit(build_thumbnails, sha256)
+
+
+def _cache_get(key):
+    with _cache_lock:
+        if key not in _cache:
+            return False, None
+        _cache.move_to_end(key)
+        return True, _cache[key]
+
+
+def _cache_put(key, value):
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > THUMBNAIL_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def _is_undecodable(sha256):
+    with _cache_lock:
+        return sha256 in _undecodable
+
+
+def _mark_undecodable(sha256):
+    with _cache_lock:
+        _undecodable[sha256] = True
+        _undecodable.move_to_end(sha256)
+        while len(_undecodable) > THUMBNAIL_CACHE_ENTRIES:
+            _undecodable.popitem(last=False)
+
+
+def _thumbnail_of(sha256, data, size):
+    """make_thumbnail, remembering pictures that can't be decoded"""
+    thumbnail = make_thumbnail(data, size)
+    if thumbnail is None:
+        _mark_undecodable(sha256)
+    return thumbnail
+
+
+def get_thumbnail(sha256, size):
+    """
+    Get a thumbnail of a stored picture, generating it if needed
+
+    Returns:
+        (data, content_type), or None if the picture doesn't exist, can't
+        be decoded, or Pillow isn't installed
+    """
+    if not thumbnails_available() or _is_undecodable(sha256):
+        return None
+
+    if size in THUMBNAIL_SIZES:
+        with connection() as conn:
+            row = conn.execute("""
+                SELECT data, content_type FROM picture_thumbnails
+                WHERE sha256 = ? AND size = ?
+            """, (sha256, size)).fetchone()
+            if row:
+                BLOB_BYTES_READ.inc("picture_thumbnails", amount=len(row[0]))
+                return row
+            data = load_picture(conn, sha256)
+        if data is None:
+            return None
+        # Not built yet (upload still being processed, or an older picture):
+        # answer now and leave storing it to the background workers
+        thumbnail = _thumbnail_of(sha256, data, size)
+        if thumbnail:
+            schedule_thumbnails(sha256)
+        return thumbnail
+
+    key = (sha256, size)
+    found, thumbnail = _cache_get(key)
+    if found:
+        return thumbnail
+    with connection() as conn:
+        data = load_picture(conn, sha256)
+    if data is None:
+        return None
+    thumbnail = _thumbnail_of(sha256, data, size)
+    if thumbnail:
+        _cache_put(key, thumbnail)
+    return thumbnail
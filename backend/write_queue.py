@@ -0,0 +1,293 @@
+"""
+Group-Commit Write Queue
+========================
+
+Every student mutation from the API goes through one writer thread:
+
+- add / update / delete requests are queued and committed together: the
+  writer collects mutations until WRITE_BATCH_WINDOW_MS has passed since
+  the oldest one arrived, or WRITE_BATCH_MAX are waiting, then runs them
+  all in one BEGIN IMMEDIATE ... COMMIT
+- each mutation runs inside its own SAVEPOINT, so one failing (e.g. a
+  duplicate USN raising sqlite3.IntegrityError) is rolled back alone and
+  only its caller sees the error
+- callers get a concurrent.futures.Future that resolves once the batch is
+  committed, with their own result
+- anything else that must not overlap with the batches runs on the same
+  thread through call(); a bulk import is one call() per batch of rows,
+  so other writes are committed between its batches
+- a streamed picture upload is written as it arrives, a placeholder row
+  and then one chunk per mutation (see STREAMED PICTURES below)
+
+One commit per batch instead of one per row means far fewer WAL writes
+and lock hand-offs when many clients register at once. While a batch is
+being committed new mutations queue up, so under load batches fill
+without waiting for the window.
+
+Settings:
+    WRITE_BATCH_WINDOW_MS   longest wait for more mutations (default 2)
+    WRITE_BATCH_MAX         mutations per transaction at most (default 256)
+
+Usage:
+    from write_queue import writer
+
+    future = writer.submit(student_operations.remove_student, "1MS21CS001")
+    deleted = future.result()
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import picture_store
+import student_cache
+import student_operations
+from connection_pool import connection
+from metrics import Histogram, instrumented
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_WINDOW_MS = float(os.environ.get("WRITE_BATCH_WINDOW_MS", 2))
+WRITE_BATCH_MAX = int(os.environ.get("WRITE_BATCH_MAX", 256))
+
+WRITE_BATCH_SIZE = Histogram("db_write_batch_size", "Mutations committed per transaction",
+                             buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+
+_STOP = object()
+
+
+class _Mutation:
+    """A queued mutation: mutation(conn, *args), then done(outcome, error)"""
+
+    __slots__ = ("mutation", "args", "done", "future", "queued_at", "exclusive")
+
+    def __init__(self, mutation, args, done=None, exclusive=False):
+        self.mutation = mutation
+        self.args = args
+        self.done = done
+        self.future = Future()
+        self.queued_at = time.monotonic()
+        self.exclusive = exclusive
+
+    def finish(self, outcome, error):
+        """Resolve the caller's future (done may turn outcome/error into the result)"""
+        try:
+            if self.done is not None:
+                outcome = self.done(outcome, error)
+            elif error is not None:
+                raise error
+        except BaseException as e:
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(outcome)
+
+
+class GroupCommitWriter:
+    """A single writer thread committing queued mutations in batches"""
+
+    def __init__(self, window_ms=WRITE_BATCH_WINDOW_MS, max_batch=WRITE_BATCH_MAX):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Started on first use, and again in a forked worker process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name="db-write", daemon=True)
+                self._thread.start()
+
+    def submit(self, mutation, *args, done=None):
+        """
+        Queue mutation(conn, *args) for the next batch
+
+        mutation must not commit or roll back. done(outcome, error), if
+        given, runs on the writer thread after the batch has committed (or
+        failed) and its return value (or exception) becomes the result.
+        """
+        self._ensure_thread()
+        item = _Mutation(mutation, args, done)
+        self._queue.put(item)
+        return item.future
+
+    def call(self, func, *args):
+        """Run func(*args) on the writer thread, between batches"""
+        self._ensure_thread()
+        item = _Mutation(func, args, exclusive=True)
+        self._queue.put(item)
+        return item.future
+
+    def close(self, wait=True):
+        """Commit what is queued, then stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            items = self._queue
+        if thread is not None and self._pid == os.getpid():
+            items.put(_STOP)
+            if wait:
+                thread.join()
+
+    # ---- writer thread ----
+
+    def _run(self, items):
+        pending = None
+        last_size = 1
+        while True:
+            item = pending if pending is not None else items.get()
+            pending = None
+            if item is _STOP:
+                return
+            if item.exclusive:
+                self._run_exclusive(item)
+                continue
+
+            batch = [item]
+            # Wait (at most the window) for as many mutations as the last
+            # batch had: callers whose previous mutation just committed
+            # are about to send their next one. A lone writer never waits.
+            deadline = item.queued_at + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic() if len(batch) < last_size else 0
+                try:
+                    item = items.get(timeout=timeout) if timeout > 0 else items.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP or item.exclusive:
+                    pending = item
+                    break
+                batch.append(item)
+            last_size = len(batch)
+            self._commit(batch)
+
+    def _run_exclusive(self, item):
+        try:
+            outcome = item.mutation(*item.args)
+        except BaseException as e:
+            item.future.set_exception(e)
+        else:
+            item.future.set_result(outcome)
+
+    def _commit(self, batch):
+        outcomes = [None] * len(batch)
+        errors = [None] * len(batch)
+        try:
+            self._write_batch(batch, outcomes, errors)
+        except Exception as e:
+            # BEGIN or COMMIT failed: nothing in the batch was written
+            logger.exception("Write batch of %d mutations failed", len(batch))
+            outcomes = [None] * len(batch)
+            errors = [e] * len(batch)
+        WRITE_BATCH_SIZE.observe(len(batch))
+        for item, outcome, error in zip(batch, outcomes, errors):
+            item.finish(outcome, error)
+
+    @instrumented(rows=None)
+    def _write_batch(self, batch, outcomes, errors):
+        """One transaction for the batch, one savepoint per mutation"""
+        with connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for index, item in enumerate(batch):
+                    conn.execute("SAVEPOINT mutation")
+                    try:
+                        outcomes[index] = item.mutation(conn, *item.args)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO mutation")
+                        errors[index] = e
+                    conn.execute("RELEASE mutation")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+
+# Process-wide writer
+writer = GroupCommitWriter()
+
+
+# ============= STUDENT MUTATIONS =============
+# Batched versions of the student_operations writes; each returns a
+# Future with the same result as the synchronous function and drops the
+# student's cache entries once the batch is done
+
+def add_student(usn, name, age, picture_data=None):
+    """Queue student_operations.add_student (None for a duplicate USN)"""
+    def done(outcome, error):
+        student_cache.invalidate(usn)
+        if isinstance(error, sqlite3.IntegrityError):
+            logger.info("Student with USN %s already exists", usn)
+            return None
+        if error is not None:
+            raise error
+        student_operations.student_added(usn, *outcome)
+        return outcome[0]
+
+    return writer.submit(student_operations.insert_student, usn, name, age, picture_data,
+                         done=done)
+
+
+def update_student(usn, name=None, age=None, picture_data=None):
+    """Queue student_operations.update_student"""
+    def done(outcome, error):
+        student_cache.invalidate(usn)
+        if error is not None:
+            raise error
+        return student_operations.student_updated(usn, outcome)
+
+    return writer.submit(student_operations.apply_student_update, usn, name, age, picture_data,
+                         done=done)
+
+
+def delete_student(usn):
+    """Queue student_operations.delete_student"""
+    def done(outcome, error):
+        student_cache.invalidate(usn)
+        if error is not None:
+            raise error
+        return student_operations.student_removed(usn, outcome)
+
+    return writer.submit(student_operations.remove_student, usn, done=done)
+
+
+# ============= STREAMED PICTURES =============
+# A picture upload written while it arrives: the placeholder row and every
+# chunk are mutations of their own, so other writes keep being committed
+# in between and no transaction waits on the network
+
+def begin_picture(size):
+    """Queue picture_store.begin_picture (the placeholder's rowid)"""
+    return writer.submit(picture_store.begin_picture, size)
+
+
+def write_picture_chunk(rowid, offset, data):
+    """Queue picture_store.write_picture_chunk"""
+    return writer.submit(picture_store.write_picture_chunk, rowid, offset, data)
+
+
+def discard_picture(rowid):
+    """Queue picture_store.discard_picture"""
+    return writer.submit(picture_store.discard_picture, rowid)
+
+
+def attach_picture(usn, rowid, sha256, content_type, size, tail=b""):
+    """Queue student_operations.attach_picture (True if the student exists)"""
+    def done(outcome, error):
+        student_cache.invalidate(usn)
+        if error is not None:
+            raise error
+        return student_operations.picture_attached(usn, outcome, size)
+
+    return writer.submit(student_operations.attach_picture, usn, rowid, sha256, content_type,
+                         size, tail, done=done)
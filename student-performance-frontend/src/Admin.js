@@ -2,6 +2,14 @@ import React, { useState } from "react";
 import "./styles.css";
 
 const ADMIN_API_URL = "http://127.0.0.1:8000/admin/login";
+const SUMMARY_API_URL = "http://127.0.0.1:8000/analytics/summary";
+const CHANGES_API_URL = "http://127.0.0.1:8000/students/changes";
+
+const CHANGE_LABELS = {
+  insert: { icon: "🆕", text: "registered" },
+  update: { icon: "✏️", text: "updated" },
+  delete: { icon: "🗑️", text: "removed" },
+};
 
 export default function Admin() {
   const [loginForm, setLoginForm] = useState({
@@ -13,6 +21,8 @@ export default function Admin() {
   const [message, setMessage] = useState(null);
   const [isLoggedIn, setIsLoggedIn] = useState(false);
   const [adminEmail, setAdminEmail] = useState("");
+  const [studentCount, setStudentCount] = useState(null);
+  const [activity, setActivity] = useState([]);
 
   const handleInputChange = (e) => {
     const { name, value } = e.target;
@@ -80,6 +90,33 @@ export default function Admin() {
     }
   }, []);
 
+  // Follow student changes while logged in: the server pushes them
+  // (Server-Sent Events), so the dashboard never re-fetches the roster.
+  // EventSource reconnects by itself and resumes after the last event.
+  React.useEffect(() => {
+    if (!isLoggedIn) return undefined;
+
+    const loadCount = () => {
+      fetch(SUMMARY_API_URL)
+        .then((res) => res.json())
+        .then((data) => setStudentCount(data.summary.students))
+        .catch((err) => console.error(err));
+    };
+    const handleChange = (e) => {
+      const change = JSON.parse(e.data);
+      if (change.op === "insert") setStudentCount((n) => (n === null ? n : n + 1));
+      if (change.op === "delete") setStudentCount((n) => (n === null ? n : n - 1));
+      setActivity((items) => [change, ...items].slice(0, 10));
+    };
+
+    const source = new EventSource(CHANGES_API_URL);
+    // "sync" starts a new stream; "reload" means changes were skipped
+    source.addEventListener("sync", loadCount);
+    source.addEventListener("reload", loadCount);
+    Object.keys(CHANGE_LABELS).forEach((op) => source.addEventListener(op, handleChange));
+    return () => source.close();
+  }, [isLoggedIn]);
+
   if (isLoggedIn) {
     return (
       <div className="app">
@@ -102,7 +139,7 @@ export default function Admin() {
                   <div className="statGrid">
                     <div className="statCard">
                       <div className="statLabel">Total Students</div>
-                      <div className="statValue">--</div>
+                      <div className="statValue">{studentCount ?? "--"}</div>
                     </div>
                     <div className="statCard">
                       <div className="statLabel">Active Records</div>
@@ -127,6 +164,14 @@ export default function Admin() {
                 <div className="adminSection">
                   <h3>📝 Recent Activity</h3>
                   <div className="activityList">
+                    {activity.map((change) => (
+                      <div className="activityItem" key={change.seq}>
+                        <span className="activityIcon">{CHANGE_LABELS[change.op].icon}</span>
+                        <span>
+                          {change.name || change.usn} ({change.usn}) {CHANGE_LABELS[change.op].text}
+                        </span>
+                      </div>
+                    ))}
                     <div className="activityItem">
                       <span className="activityIcon">✅</span>
                       <span>System operational - All services running</span>